@@ -32,4 +32,7 @@ def swagger_ui():
 
 if __name__ == '__main__':
     print(f"Running in {os.getenv('FLASK_ENV', 'dev')} mode")
+    # Only the reloader's child serves requests; the watching parent never needs workers
+    if app.config['JOB_AUTOSTART'] and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        app.extensions['job_queue'].start()
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -10,6 +10,11 @@ from flask_caching import Cache
 from flask_swagger_ui import get_swaggerui_blueprint
 from datetime import timedelta
 from config import config
+from app.utils import ratelimit  # registers the batched+ storage schemes
+from app.utils.fieldsets import InvalidFieldset
+from app.utils.identity import IdentityCache, load_identity, parse_user_id
+from app.utils.passwords import HashingBusy, PasswordHasher
+from app.utils.sql import enable_foreign_keys
 
 # Suppress SQLAlchemy warnings
 warnings.filterwarnings('ignore', category=sa_exc.SAWarning)
@@ -35,8 +40,8 @@ swaggerui_blueprint = get_swaggerui_blueprint(
     }
 )
 
-def create_app(config_name='development'):
-    """Application factory function"""
+def create_app(config_name='development', overrides=None):
+    """Application factory function; `overrides` replaces config keys before extensions start"""
     app = Flask(__name__)
     
     # Load configuration
@@ -44,6 +49,7 @@ def create_app(config_name='development'):
         app.config.from_object('config.TestingConfig')
     else:
         app.config.from_object('config.DevelopmentConfig')
+    app.config.update(overrides or {})
     
     # JWT Configuration
     app.config['JWT_SECRET_KEY'] = 'dev-secret-key'  # Change in production
@@ -57,8 +63,15 @@ def create_app(config_name='development'):
     jwt.init_app(app)
     cache.init_app(app)
     limiter.init_app(app)
+    app.extensions['identity_cache'] = IdentityCache(app.config['IDENTITY_CACHE_TIMEOUT'])
+    app.extensions['password_hasher'] = PasswordHasher(
+        app.config['PASSWORD_HASH_METHOD'],
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        max_queue=app.config['PASSWORD_HASH_MAX_QUEUE']
+    )
     
     with app.app_context():
+        enable_foreign_keys(db.engine)
         # Create database tables
         db.create_all()
     
@@ -75,14 +88,10 @@ def create_app(config_name='development'):
 
     @jwt.user_lookup_loader
     def user_lookup_callback(_jwt_header, jwt_data):
+        # current_user is an Identity(id, is_admin), served from cache on
+        # most requests; load the User row explicitly where it is needed
         try:
-            identity = jwt_data["sub"]
-            if isinstance(identity, dict):
-                user_id = int(identity['id'])
-            else:
-                user_id = int(identity)
-            from app.models import User
-            return db.session.get(User, user_id)
+            return load_identity(parse_user_id(jwt_data["sub"]))
         except (ValueError, TypeError, KeyError):
             return None
 
@@ -93,9 +102,34 @@ def create_app(config_name='development'):
             "error": "Rate limit exceeded",
             "message": str(e.description)
         }), 429
+
+    @app.errorhandler(HashingBusy)
+    def hashing_busy_handler(e):
+        return jsonify({
+            "error": "Service busy",
+            "message": str(e)
+        }), 503, {'Retry-After': '1'}
+
+    @app.errorhandler(InvalidFieldset)
+    def invalid_fieldset_handler(e):
+        return jsonify({
+            "error": "Invalid fieldset",
+            "message": str(e)
+        }), 400
     
     # Register blueprints
     register_blueprints(app)
+
+    # Background jobs; handlers are registered by the blueprints above. Workers
+    # are started by the process that serves them (manage.py run_jobs, app.py)
+    from app.utils.jobs import JobQueue
+    app.extensions['job_queue'] = JobQueue(
+        app,
+        workers=app.config['JOB_WORKERS'],
+        poll_interval=app.config['JOB_POLL_INTERVAL'],
+        retry_backoff=app.config['JOB_RETRY_BACKOFF'],
+        stale_after=app.config['JOB_STALE_AFTER']
+    )
     
     return app
 
@@ -104,9 +138,11 @@ def register_blueprints(app):
     from app.components.blueprints.mechanics import mechanic_bp
     from app.components.blueprints.service_tickets import service_ticket_bp
     from app.components.blueprints.inventory import inventory_bp 
+    from app.components.blueprints.jobs import job_bp
     
     app.register_blueprint(user_bp, url_prefix='/users')
     app.register_blueprint(mechanic_bp, url_prefix='/mechanics')
     app.register_blueprint(service_ticket_bp, url_prefix='/service-tickets')
     app.register_blueprint(inventory_bp, url_prefix='/inventory')
+    app.register_blueprint(job_bp, url_prefix='/jobs')
     app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
\ No newline at end of file
@@ -1,10 +1,22 @@
-from flask import Blueprint, jsonify, request
+import csv
+import io
+import json
+import sys
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from app.models import db, Part, User
+from app.models import db, Part, PartReservation, ServiceTicket, User
 from sqlalchemy.exc import IntegrityError
 from . import inventory_bp
-from sqlalchemy import select
+from sqlalchemy import func, select
 from flask_sqlalchemy import SQLAlchemy
+from app.utils.conditional import conditional_view, freshness
+from app.utils.fieldsets import InvalidFieldset, filter_fields
+from app.utils.pagination import InvalidCursor, cursor_args, cursor_requested, paginate_by_cursor
+from app.utils.sql import chunked, upsert
+from app.utils.caching import invalidate_tickets
+from app.utils.stock import InsufficientStock, adjust_stock
+from app.utils.totals import refresh_parts_totals, refresh_totals_for_parts
+from app import limiter
 
 # Add some debug logging
 import logging
@@ -61,7 +73,160 @@ def create_part():
             'error': str(e)
         }), 500
 
+def _read_bulk_rows():
+    """Rows from a JSON array or an NDJSON body; bad NDJSON lines become row errors"""
+    if request.mimetype == 'application/x-ndjson':
+        rows = []
+        for line in request.get_data(as_text=True).splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError as e:
+                rows.append(e)
+        return rows
+
+    data = request.get_json(silent=True)
+    return data if isinstance(data, list) else None
+
+def _validate_part_row(row):
+    """Normalised column values for one bulk row, or a dict of field errors"""
+    if not isinstance(row, dict):
+        return None, {'row': 'Expected a JSON object'}
+
+    errors = {field: 'Missing required field'
+              for field in ('name', 'part_number', 'price', 'quantity') if field not in row}
+    if errors:
+        return None, errors
+
+    values = {
+        'name': str(row['name']).strip(),
+        'part_number': str(row['part_number']).strip()
+    }
+    for field, cast in (('price', float), ('quantity', int)):
+        try:
+            values[field] = cast(row[field])
+        except (ValueError, TypeError):
+            errors[field] = f'Invalid {field} format'
+            continue
+        if values[field] < 0:
+            errors[field] = f'{field.capitalize()} cannot be negative'
+    if not values['name']:
+        errors['name'] = 'Name cannot be empty'
+    if not values['part_number']:
+        errors['part_number'] = 'Part number cannot be empty'
+    # Caught here so one long value is a row error rather than a failed batch
+    for field in ('name', 'part_number'):
+        length = Part.__table__.c[field].type.length
+        if len(values[field]) > length:
+            errors[field] = f'At most {length} characters'
+    return (None, errors) if errors else (values, None)
+
+@inventory_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+@limiter.limit("10 per minute")
+def bulk_upsert_parts():
+    """Create or update many parts at once, keyed on part_number"""
+    rows = _read_bulk_rows()
+    if not rows:
+        return jsonify({'message': 'Expected a non-empty JSON array or NDJSON body'}), 400
+    if len(rows) > current_app.config['BULK_MAX_ROWS']:
+        return jsonify({
+            'message': f"At most {current_app.config['BULK_MAX_ROWS']} rows per request"
+        }), 413
+
+    # Validate everything first; later rows win for duplicate part numbers
+    valid = {}
+    errors = []
+    for index, row in enumerate(rows):
+        if isinstance(row, Exception):
+            errors.append({'index': index, 'errors': {'row': f'Invalid JSON: {row}'}})
+            continue
+        values, row_errors = _validate_part_row(row)
+        if row_errors:
+            errors.append({'index': index, 'errors': row_errors})
+        else:
+            valid[values['part_number']] = values
+
+    created = updated = 0
+    affected = []
+    try:
+        statement = upsert(
+            db.session, Part.__table__, 'part_number', ['name', 'price', 'quantity', 'updated_at']
+        )
+        for chunk in chunked(list(valid.values()), current_app.config['BULK_CHUNK_SIZE']):
+            part_numbers = [values['part_number'] for values in chunk]
+            existing = db.session.execute(
+                select(Part.part_number).where(Part.part_number.in_(part_numbers))
+            ).scalars().all()
+            db.session.execute(statement, chunk)
+            if existing:
+                affected += refresh_totals_for_parts(
+                    db.session, select(Part.id).where(Part.part_number.in_(existing))
+                )
+            updated += len(existing)
+            created += len(chunk) - len(existing)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Bulk upsert failed: {str(e)}")
+        return jsonify({
+            'message': 'Bulk upsert failed',
+            'error': str(e)
+        }), 500
+
+    invalidate_tickets(affected)
+    return jsonify({
+        'created': created,
+        'updated': updated,
+        'errors': errors
+    }), 200
+
+PART_EXPORT_COLUMNS = ('id', 'name', 'part_number', 'price', 'quantity')
+
+def _export_format():
+    """'ndjson' or 'csv' when the client asked for a streamed export"""
+    requested = request.args.get('format')
+    if requested in ('ndjson', 'csv'):
+        return requested
+    best = request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson', 'text/csv'])
+    return {'application/x-ndjson': 'ndjson', 'text/csv': 'csv'}.get(best)
+
+def _iter_part_batches():
+    """Plain row tuples fetched 1000 at a time, so no ORM objects pile up"""
+    columns = [getattr(Part, name) for name in PART_EXPORT_COLUMNS]
+    result = db.session.execute(
+        select(*columns).order_by(Part.id).execution_options(yield_per=1000)
+    )
+    yield from result.partitions()
+
+def _stream_parts(export_format):
+    """Streamed response whose memory use does not grow with the catalog"""
+    if export_format == 'csv':
+        def generate():
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(PART_EXPORT_COLUMNS)
+            for batch in _iter_part_batches():
+                writer.writerows(batch)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue()
+        mimetype = 'text/csv'
+    else:
+        def generate():
+            for batch in _iter_part_batches():
+                yield ''.join(
+                    json.dumps(dict(zip(PART_EXPORT_COLUMNS, row), price=float(row.price))) + '\n'
+                    for row in batch
+                )
+        mimetype = 'application/x-ndjson'
+
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
 @inventory_bp.route('', methods=['GET'])
+@conditional_view(lambda **kwargs: [freshness(Part)], vary_on_identity=False)
 def get_parts():
     """Get all parts - supports both paginated and non-paginated responses"""
     try:
@@ -69,7 +234,19 @@ def get_parts():
         page = request.args.get('page', type=int)
         per_page = request.args.get('per_page', type=int)
 
-        if page is not None and per_page is not None:
+        if cursor_requested():
+            # Keyset response - seeks on id, no OFFSET scan and no COUNT query
+            try:
+                cursor_page = paginate_by_cursor(Part.query, [(Part.id, False)], *cursor_args())
+            except InvalidCursor as e:
+                return jsonify({'message': str(e)}), 400
+            return jsonify({
+                'items': [filter_fields(part.to_dict(), 'part') for part in cursor_page.items],
+                'limit': cursor_page.limit,
+                'next_cursor': cursor_page.next_cursor,
+                'has_next': cursor_page.has_next
+            }), 200
+        elif page is not None and per_page is not None:
             # Paginated response
             pagination = Part.query.paginate(
                 page=page,
@@ -77,17 +254,22 @@ def get_parts():
                 error_out=False
             )
             return jsonify({
-                'items': [part.to_dict() for part in pagination.items],
+                'items': [filter_fields(part.to_dict(), 'part') for part in pagination.items],
                 'page': page,
                 'pages': pagination.pages,
                 'per_page': per_page,
                 'total': pagination.total
             }), 200
+        elif _export_format():
+            # Streamed export - rows are written as they are read
+            return _stream_parts(_export_format())
         else:
             # Non-paginated response - return all parts as array
             parts = Part.query.all()
-            return jsonify([part.to_dict() for part in parts]), 200
+            return jsonify([filter_fields(part.to_dict(), 'part') for part in parts]), 200
 
+    except InvalidFieldset as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         logger.error(f"Error retrieving parts: {str(e)}")
         return jsonify({
@@ -95,7 +277,60 @@ def get_parts():
             'error': str(e)
         }), 500
 
+SEARCH_DEFAULT_LIMIT = 10
+SEARCH_MAX_LIMIT = 50
+
+# Dialects whose lower() folds only ASCII, so a non-ASCII prefix cannot use the lower() indexes
+ASCII_LOWER_DIALECTS = {'sqlite'}
+
+def _prefix_upper_bound(prefix):
+    """Smallest string sorting after every string that starts with `prefix`; None when unbounded"""
+    stem = prefix.rstrip(chr(sys.maxunicode))
+    if not stem:
+        return None  # Only strings starting with `prefix` sort at or after it
+    successor = ord(stem[-1]) + 1
+    if 0xD800 <= successor <= 0xDFFF:
+        successor = 0xE000  # Surrogates cannot be encoded, and no text contains them
+    return stem[:-1] + chr(successor)
+
+def _prefix_matches(column, prefix, limit):
+    """Parts whose lower(column) starts with `prefix`, as an index range scan.
+
+    LIKE 'abc%' only uses an index under specific collation settings, so
+    the prefix is turned into lower(column) >= 'abc' AND < 'abd' instead.
+    """
+    key = func.lower(column)
+    query = select(Part).where(key >= prefix)
+    upper = _prefix_upper_bound(prefix)
+    if upper is not None:
+        query = query.where(key < upper)
+    return db.session.scalars(query.order_by(key).limit(limit)).all()
+
+@inventory_bp.route('/search', methods=['GET'])
+def search_parts():
+    """Typeahead lookup: parts whose part number or name starts with ?prefix="""
+    prefix = request.args.get('prefix', '').strip().lower()
+    if not prefix:
+        return jsonify({'message': 'Query parameter prefix is required'}), 400
+    if not prefix.isascii() and db.session.get_bind().dialect.name in ASCII_LOWER_DIALECTS:
+        return jsonify({'message': 'Query parameter prefix must be ASCII'}), 400
+    limit = request.args.get('limit', SEARCH_DEFAULT_LIMIT, type=int)
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+
+    try:
+        # Part number hits first, then name hits; at most `limit` rows each
+        matches = {}
+        for part in _prefix_matches(Part.part_number, prefix, limit) + _prefix_matches(Part.name, prefix, limit):
+            matches.setdefault(part.id, part)
+        return jsonify([filter_fields(part.to_dict(), 'part') for part in list(matches.values())[:limit]]), 200
+    except InvalidFieldset as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error searching parts: {str(e)}")
+        return jsonify({'message': 'Error searching parts', 'error': str(e)}), 500
+
 @inventory_bp.route('/<int:part_id>', methods=['GET'])
+@conditional_view(lambda part_id: [freshness(Part, Part.id == part_id)], vary_on_identity=False, last_modified=True)
 def get_part(part_id):
     """Get a specific part"""
     try:
@@ -103,7 +338,9 @@ def get_part(part_id):
         part = db.session.get(Part, part_id)
         if not part:
             return jsonify({'message': 'Part not found'}), 404
-        return jsonify(part.to_dict()), 200
+        return jsonify(filter_fields(part.to_dict(), 'part')), 200
+    except InvalidFieldset as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': 'Error retrieving part', 'error': str(e)}), 500
 
@@ -133,6 +370,19 @@ def update_part(part_id):
                     return jsonify({'message': 'Price cannot be negative'}), 400
             except (ValueError, TypeError):
                 return jsonify({'message': 'Invalid price format'}), 400
+        if 'quantity' in data and 'quantity_delta' in data:
+            return jsonify({'message': 'Send either quantity or quantity_delta, not both'}), 400
+        if 'quantity_delta' in data:
+            # Atomic increment/decrement, safe under concurrent stock traffic
+            try:
+                delta = int(data['quantity_delta'])
+            except (ValueError, TypeError):
+                return jsonify({'message': 'Invalid quantity_delta format'}), 400
+            try:
+                adjust_stock(db.session, part_id, delta)
+            except InsufficientStock as e:
+                db.session.rollback()
+                return jsonify({'message': str(e)}), 409
         if 'quantity' in data:
             try:
                 new_quantity = int(data['quantity'])
@@ -143,7 +393,14 @@ def update_part(part_id):
             except (ValueError, TypeError):
                 return jsonify({'message': 'Invalid quantity format'}), 400
 
+        # Tickets reserving this part carry its price in their totals
+        affected = []
+        if 'price' in data:
+            db.session.flush()
+            affected = refresh_totals_for_parts(db.session, [part_id])
+
         db.session.commit()
+        invalidate_tickets(affected)
         
         # Return the updated part data directly instead of nested in a response
         return jsonify(part.to_dict()), 200
@@ -163,7 +420,17 @@ def delete_part(part_id):
     part = db.session.get(Part, part_id)
     if not part:
         return jsonify({'message': 'Part not found'}), 404
-        
+
+    # Its reservations go by ON DELETE CASCADE; re-total the tickets that held it
+    affected = db.session.execute(
+        select(ServiceTicket.id, ServiceTicket.user_id)
+        .join(PartReservation, PartReservation.ticket_id == ServiceTicket.id)
+        .where(PartReservation.part_id == part_id)
+    ).all()
     db.session.delete(part)
+    db.session.flush()
+    if affected:
+        refresh_parts_totals(db.session, [ticket_id for ticket_id, _ in affected])
     db.session.commit()
+    invalidate_tickets(affected)
     return jsonify({'message': 'Part deleted successfully'})
\ No newline at end of file
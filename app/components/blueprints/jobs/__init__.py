@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+job_bp = Blueprint('job_bp', __name__)
+
+from . import routes
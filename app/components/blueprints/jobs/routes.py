@@ -0,0 +1,43 @@
+from flask import jsonify, request, url_for
+from flask_jwt_extended import jwt_required, current_user
+from . import job_bp, tasks  # tasks registers the job handlers
+from app.models import Job, db
+from app.components.schemas.job import job_schema
+from app import limiter
+from app.utils.jobs import enqueue
+
+def _accepted(queued):
+    """202 pointing at the job's status URL"""
+    status_url = url_for('job_bp.get_job', job_id=queued.id)
+    return jsonify({'job': job_schema.dump(queued), 'status_url': status_url}), 202, {'Location': status_url}
+
+@job_bp.post('/assign-pending')
+@jwt_required()
+@limiter.limit("5 per minute")
+def enqueue_assign_pending():
+    """Queue auto-assignment of every open, unassigned ticket"""
+    if not current_user.is_admin:
+        return jsonify({'message': 'Admin access required'}), 403
+    limit = request.args.get('limit', type=int)
+    return _accepted(enqueue('assign-pending', {'limit': limit}, user_id=current_user.id))
+
+@job_bp.post('/ticket-report')
+@jwt_required()
+@limiter.limit("10 per minute")
+def enqueue_ticket_report():
+    """Queue a ticket report for the caller, or for the whole shop (admins, ?all=true)"""
+    whole_shop = current_user.is_admin and request.args.get('all', '').lower() in ('1', 'true')
+    payload = {'user_id': None if whole_shop else current_user.id}
+    return _accepted(enqueue('ticket-report', payload, user_id=current_user.id))
+
+@job_bp.get('/<int:job_id>')
+@jwt_required()
+def get_job(job_id):
+    """Status, progress and, once finished, the result of a background job"""
+    queued = db.session.get(Job, job_id)
+    if queued is None:
+        return jsonify({'message': 'Job not found'}), 404
+    # Jobs are visible to whoever queued them, and to admins
+    if queued.user_id != current_user.id and not current_user.is_admin:
+        return jsonify({'message': 'Unauthorized'}), 403
+    return jsonify(job_schema.dump(queued)), 200
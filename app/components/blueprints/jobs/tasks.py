@@ -0,0 +1,76 @@
+from collections import Counter
+from sqlalchemy import func, select
+from app.models import ServiceTicket, db
+from app.utils.caching import invalidate_tickets
+from app.utils.jobs import job
+from app.utils.scheduler import MechanicLoads, pending_tickets, save_assignments, schedule
+from app.utils.sql import chunked
+
+
+@job('assign-pending', concurrency=1)
+def assign_pending(progress, limit=None, chunk_size=1000):
+    """Assign every open, unassigned ticket, committed chunk by chunk with progress.
+
+    A retry starts over from the tickets that are still unassigned, and
+    tickets another process assigns in the meantime are skipped, so no ticket
+    is ever assigned twice.
+    """
+    tickets = pending_tickets(db.session, limit)
+    users = {ticket_id: user_id for ticket_id, user_id, _ in tickets}
+    assignments, unmatched = schedule(MechanicLoads(db.session), tickets)
+
+    items = list(assignments.items())
+    assigned = {}
+    for done, chunk in enumerate(chunked(items, chunk_size), 1):
+        saved = save_assignments(db.session, dict(chunk))
+        progress(min(done * chunk_size, len(items)), len(items))
+        invalidate_tickets(
+            [(ticket_id, users[ticket_id]) for ticket_id in saved],
+            mechanic_ids=set(saved.values())
+        )
+        assigned.update(saved)
+    return {
+        'assigned': len(assigned),
+        'unmatched': len(unmatched),
+        'by_mechanic': Counter(assigned.values())
+    }
+
+
+@job('ticket-report')
+def ticket_report(progress, user_id=None):
+    """Ticket counts and parts totals for one customer, or the whole shop when user_id is None"""
+    query = select(
+        ServiceTicket.status,
+        ServiceTicket.priority,
+        func.count(ServiceTicket.id),
+        func.sum(ServiceTicket.parts_total),
+        func.min(ServiceTicket.created_at),
+        func.max(ServiceTicket.created_at)
+    ).group_by(ServiceTicket.status, ServiceTicket.priority)
+    if user_id is not None:
+        query = query.where(ServiceTicket.user_id == user_id)
+
+    # Heartbeat before the aggregate, so a slow report is not taken for a dead one
+    progress(0)
+    groups = db.session.execute(query).all()
+
+    by_status, by_priority = Counter(), Counter()
+    parts_total = 0.0
+    first = last = None
+    for done, (status, priority, count, total, earliest, latest) in enumerate(groups, 1):
+        progress(done, len(groups))
+        by_status[status] += count
+        by_priority[priority] += count
+        parts_total += total or 0.0
+        first = earliest if first is None or earliest < first else first
+        last = latest if last is None or latest > last else last
+    return {
+        'user_id': user_id,
+        'tickets': sum(by_status.values()),
+        'open_tickets': sum(n for status, n in by_status.items() if status not in ServiceTicket.CLOSED_STATUSES),
+        'by_status': by_status,
+        'by_priority': by_priority,
+        'parts_total': round(parts_total, 2),
+        'first_ticket_at': first.isoformat() if first else None,
+        'last_ticket_at': last.isoformat() if last else None
+    }
@@ -1,11 +1,19 @@
-from flask import jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request, get_jwt
+from flask import current_app, jsonify, request
+from flask_jwt_extended import jwt_required, current_user, verify_jwt_in_request, get_jwt
 from marshmallow import ValidationError
+from sqlalchemy import func, select, update
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from datetime import datetime
 from . import mechanic_bp
-from app.models import Mechanic, ServiceTicket, User, db
-from app.components.schemas.mechanic import mechanic_schema, mechanics_schema
-from app import limiter, cache
+from app.models import Mechanic, ServiceTicket, User, db, mechanic_service_tickets
+from app.components.schemas.mechanic import mechanic_assignments_schema, mechanic_schema, mechanics_schema
+from app import limiter
+from app.utils.caching import cached_view, invalidate_tags, invalidate_ticket, invalidate_tickets, mechanic_tag
+from app.utils.conditional import conditional_view, freshness
+from app.utils.fieldsets import InvalidFieldset, filter_fields, projected_schema
+from app.utils.loading import query_options
+from app.utils.pagination import InvalidCursor, cursor_args, cursor_requested, paginate_by_cursor
+from app.utils.sql import insert_ignore
 
 # Create mechanic
 @mechanic_bp.route('', methods=['POST'])
@@ -26,6 +34,7 @@ def create_mechanic():
         
         db.session.add(mechanic)
         db.session.commit()
+        invalidate_tags('mechanics')
         
         return jsonify(mechanic.to_dict()), 201
 
@@ -38,20 +47,36 @@ def create_mechanic():
 # Get all mechanics with pagination
 @mechanic_bp.route('', methods=['GET'])
 @jwt_required()
-@cache.cached(timeout=300)
+@conditional_view(lambda **kwargs: [freshness(Mechanic)], vary_on_identity=False)
+@cached_view(timeout=300, tags=lambda identity, **kwargs: ['mechanics'], vary_on_identity=False)
 def get_mechanics():
     """Get paginated list of mechanics"""
+    schema = projected_schema(mechanics_schema)
+    query = Mechanic.query.options(*query_options(schema, Mechanic, Mechanic.id))
+
+    if cursor_requested():
+        try:
+            cursor_page = paginate_by_cursor(query, [(Mechanic.id, False)], *cursor_args())
+        except InvalidCursor as e:
+            return jsonify({'message': str(e)}), 400
+        return jsonify({
+            'mechanics': schema.dump(cursor_page.items),
+            'limit': cursor_page.limit,
+            'next_cursor': cursor_page.next_cursor,
+            'has_next': cursor_page.has_next
+        })
+
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
     
-    pagination = Mechanic.query.paginate(
+    pagination = query.paginate(
         page=page,
         per_page=per_page,
         error_out=False
     )
     
     return jsonify({
-        'mechanics': mechanics_schema.dump(pagination.items),
+        'mechanics': schema.dump(pagination.items),
         'total': pagination.total,
         'pages': pagination.pages,
         'current_page': page,
@@ -60,9 +85,57 @@ def get_mechanics():
         'has_prev': pagination.has_prev
     })
 
+# Open and total ticket counts per mechanic, for dispatchers
+@mechanic_bp.get('/workload')
+@jwt_required()
+@cached_view(timeout=30, tags=lambda identity, **kwargs: ['tickets', 'mechanics'], vary_on_identity=False)
+def get_workload():
+    """Ticket counts per mechanic and status from one GROUP BY"""
+    rows = db.session.execute(
+        select(Mechanic.id, Mechanic.name, Mechanic.specialty, ServiceTicket.status, func.count(ServiceTicket.id))
+        .outerjoin(mechanic_service_tickets, mechanic_service_tickets.c.mechanic_id == Mechanic.id)
+        .outerjoin(ServiceTicket, ServiceTicket.id == mechanic_service_tickets.c.ticket_id)
+        .group_by(Mechanic.id, Mechanic.name, Mechanic.specialty, ServiceTicket.status)
+        .order_by(Mechanic.id)
+    )
+
+    workload = {}
+    for mechanic_id, name, specialty, status, count in rows:
+        entry = workload.setdefault(mechanic_id, {
+            'id': mechanic_id,
+            'name': name,
+            'specialty': specialty,
+            'open_tickets': 0,
+            'total_tickets': 0,
+            'by_status': {}
+        })
+        # Mechanics without tickets come back as one row with a NULL status
+        if status is None:
+            continue
+        entry['by_status'][status] = count
+        entry['total_tickets'] += count
+        if status not in ServiceTicket.CLOSED_STATUSES:
+            entry['open_tickets'] += count
+
+    return jsonify({'mechanics': list(workload.values())}), 200
+
 # Get single mechanic
 @mechanic_bp.get('/<int:id>')
-@cache.memoize(300)
+@conditional_view(
+    lambda id: [
+        freshness(Mechanic, Mechanic.id == id),
+        # The detail lists assigned ticket ids
+        freshness(ServiceTicket).join(mechanic_service_tickets).where(
+            mechanic_service_tickets.c.mechanic_id == id
+        )
+    ],
+    vary_on_identity=False
+)
+@cached_view(
+    timeout=300,
+    tags=lambda identity, id: ['mechanics', mechanic_tag(id)],
+    vary_on_identity=False
+)
 def get_mechanic(id):
     """Get mechanic by ID"""
     try:
@@ -74,8 +147,10 @@ def get_mechanic(id):
         result = mechanic.to_dict()
         result['tickets'] = [t.id for t in mechanic.service_tickets]
         
-        return jsonify(result), 200
+        return jsonify(filter_fields(result, 'mechanic')), 200
         
+    except InvalidFieldset as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': 'Error retrieving mechanic', 'error': str(e)}), 500
 
@@ -94,6 +169,7 @@ def update_mechanic(id):
             setattr(mechanic, key, value)
         
         db.session.commit()
+        invalidate_tags('mechanics')
         return jsonify(mechanic_schema.dump(mechanic))
     except Exception as e:
         db.session.rollback()
@@ -109,6 +185,7 @@ def delete_mechanic(id):
         mechanic = Mechanic.query.get_or_404(id)
         db.session.delete(mechanic)
         db.session.commit()
+        invalidate_tags('mechanics')
         return jsonify({'message': 'Mechanic deleted successfully'})
     except Exception as e:
         db.session.rollback()
@@ -120,8 +197,7 @@ def delete_mechanic(id):
 def get_assigned_tickets():  # Removed mechanic_id parameter
     """Get tickets assigned to mechanic"""
     try:
-        current_user_id = get_jwt_identity()
-        mechanic = Mechanic.query.filter_by(user_id=current_user_id).first()
+        mechanic = Mechanic.query.filter_by(user_id=current_user.id).first()
         
         if not mechanic:
             return jsonify({'message': 'Mechanic not found'}), 404
@@ -158,7 +234,9 @@ def assign_mechanic_to_ticket(mechanic_id, ticket_id):
 
         # Assign ticket to mechanic
         mechanic.service_tickets.append(ticket)
+        ticket.updated_at = datetime.utcnow()
         db.session.commit()
+        invalidate_ticket(ticket.user_id, ticket.id, [mechanic_id])
 
         return jsonify({
             'message': 'Mechanic assigned successfully',
@@ -170,4 +248,74 @@ def assign_mechanic_to_ticket(mechanic_id, ticket_id):
         return jsonify({
             'message': 'Failed to assign mechanic',
             'error': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+# Assign many mechanics to many tickets in one request
+@mechanic_bp.post('/assignments')
+@jwt_required()
+@limiter.limit("10 per minute")
+def assign_mechanics_in_bulk():
+    """Add (mechanic_id, ticket_id) pairs; pairs that already exist are skipped.
+
+    Admins may pair any tickets, everyone else only their own.
+    """
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('assignments')
+    if not isinstance(data, list) or not data:
+        return jsonify({'message': 'Expected a non-empty list of assignments'}), 400
+    if len(data) > current_app.config['ASSIGNMENT_MAX_PAIRS']:
+        return jsonify({
+            'message': f"At most {current_app.config['ASSIGNMENT_MAX_PAIRS']} assignments per request"
+        }), 413
+
+    try:
+        pairs = {(item['mechanic_id'], item['ticket_id']) for item in mechanic_assignments_schema.load(data)}
+    except ValidationError as e:
+        return jsonify({
+            'error': 'Validation error',
+            'message': e.messages
+        }), 400
+
+    mechanic_ids = {mechanic_id for mechanic_id, _ in pairs}
+    ticket_ids = {ticket_id for _, ticket_id in pairs}
+    try:
+        # All or nothing: any unknown id rejects the whole batch. Other users'
+        # tickets count as unknown, so customers cannot probe which ids exist
+        known_mechanics = set(db.session.scalars(select(Mechanic.id).where(Mechanic.id.in_(mechanic_ids))))
+        visible = select(ServiceTicket.id, ServiceTicket.user_id).where(ServiceTicket.id.in_(ticket_ids))
+        if not current_user.is_admin:
+            visible = visible.where(ServiceTicket.user_id == current_user.id)
+        tickets = db.session.execute(visible).all()
+        missing_mechanics = sorted(mechanic_ids - known_mechanics)
+        missing_tickets = sorted(ticket_ids - {ticket_id for ticket_id, _ in tickets})
+        if missing_mechanics or missing_tickets:
+            return jsonify({
+                'message': 'Unknown mechanics or tickets',
+                'mechanic_ids': missing_mechanics,
+                'ticket_ids': missing_tickets
+            }), 404
+
+        result = db.session.execute(
+            insert_ignore(db.session, mechanic_service_tickets).values([
+                {'mechanic_id': mechanic_id, 'ticket_id': ticket_id} for mechanic_id, ticket_id in sorted(pairs)
+            ])
+        )
+        # Assignments live in the junction table; bump the tickets' validators
+        db.session.execute(
+            update(ServiceTicket)
+            .where(ServiceTicket.id.in_(ticket_ids))
+            .values(updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify({'message': 'Database error', 'error': str(e)}), 500
+
+    invalidate_tickets(tickets, mechanic_ids=mechanic_ids)
+    return jsonify({
+        'requested': len(pairs),
+        'created': result.rowcount,
+        'existing': len(pairs) - result.rowcount
+    }), 200
@@ -1,9 +1,22 @@
-from flask import jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import ServiceTicket, Mechanic, Inventory, Part, db  # Added Part to imports
-from app.components.schemas.service_ticket import service_ticket_schema, service_tickets_schema
+from flask import current_app, jsonify, request
+from flask_jwt_extended import jwt_required, current_user
+from app.models import ServiceTicket, Mechanic, Inventory, Part, db, mechanic_service_tickets  # Added Part to imports
+from app.components.schemas.service_ticket import part_reservations_schema, service_ticket_schema, service_tickets_schema
 from . import service_ticket_bp
-from app import cache, limiter
+from app import limiter
+from app.utils.caching import cached_view, invalidate_ticket, ticket_tag, user_tag
+from app.utils.conditional import conditional_view, freshness
+from app.utils.fieldsets import projected_schema
+from app.utils.loading import query_options
+from app.utils.pagination import MAX_LIMIT, InvalidCursor, cursor_args, cursor_requested, paginate_by_cursor
+from app.utils.scheduler import least_loaded_mechanic
+from app.utils.search import ranked_search
+from app.utils.sql import insert_ignore
+from app.utils.stock import InsufficientStock, release_parts, reserve_parts
+from app.utils.totals import (
+    attach_totals, refresh_parts_totals, ticket_totals, total_columns, totals_materialized
+)
+from sqlalchemy import delete, literal, select, update
 from datetime import datetime
 from sqlalchemy.exc import IntegrityError
 from marshmallow import ValidationError
@@ -19,7 +32,7 @@ def create_ticket():
         if not data:
             return jsonify({'message': 'No input data provided'}), 400
 
-        user_id = get_jwt_identity()
+        user_id = current_user.id
 
         # Set defaults for required fields
         data.setdefault('title', f"Service Ticket - {datetime.now().strftime('%Y-%m-%d')}")
@@ -32,6 +45,7 @@ def create_ticket():
             description=data['description'],
             status=data['status'],
             priority=data['priority'],
+            specialty=data.get('specialty'),
             user_id=user_id  # Use the user_id from token
         )
 
@@ -44,13 +58,32 @@ def create_ticket():
             for mechanic in mechanics:
                 ticket.mechanics.append(mechanic)
 
+        # Hand unassigned tickets to the least-loaded mechanic that fits
+        if not ticket.mechanics and data.get('auto_assign', current_app.config['AUTO_ASSIGN_TICKETS']):
+            mechanic_id = least_loaded_mechanic(db.session, ticket.specialty)
+            if mechanic_id is not None:
+                ticket.mechanics.append(db.session.get(Mechanic, mechanic_id))
+
         # Handle parts if provided
         if 'part_ids' in data:
             parts = Inventory.query.filter(Inventory.id.in_(data['part_ids'])).all()  # Changed from Part to Inventory
             for part in parts:
                 ticket.parts.append(part)
+
+        # Take catalog parts out of stock; any shortfall aborts the whole ticket
+        if 'reserved_parts' in data:
+            quantities = {}
+            for item in part_reservations_schema.load(data['reserved_parts']):
+                quantities[item['part_id']] = quantities.get(item['part_id'], 0) + item['quantity']
+            reserve_parts(db.session, ticket.id, quantities)
+
+        if 'part_ids' in data or 'reserved_parts' in data:
+            db.session.flush()
+            refresh_parts_totals(db.session, [ticket.id])
         
         db.session.commit()
+        invalidate_ticket(user_id, ticket.id, [m.id for m in ticket.mechanics])
+        attach_totals(db.session, [ticket], service_ticket_schema)
         result = service_ticket_schema.dump(ticket)
         return jsonify(result), 201
 
@@ -60,6 +93,12 @@ def create_ticket():
             'error': 'Validation error',
             'message': str(e.messages)
         }), 400
+    except InsufficientStock as e:
+        db.session.rollback()
+        return jsonify({
+            'error': 'Insufficient stock' if e.available is not None else 'Unknown part',
+            'message': str(e)
+        }), 409 if e.available is not None else 400
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -67,24 +106,117 @@ def create_ticket():
             'message': str(e)
         }), 400
 
+def ticket_list_tags(identity, **kwargs):
+    """Ticket lists depend on the owner's tickets and on mechanic details"""
+    return [user_tag(identity), 'mechanics']
+
+def ticket_detail_tags(identity, ticket_id, **kwargs):
+    return [user_tag(identity), ticket_tag(ticket_id), 'mechanics']
+
+def ticket_list_state(**kwargs):
+    """The owner's tickets plus the mechanics embedded in them"""
+    return [freshness(ServiceTicket, ServiceTicket.user_id == current_user.id), freshness(Mechanic)]
+
+def ticket_detail_state(ticket_id, **kwargs):
+    return [
+        freshness(ServiceTicket, ServiceTicket.id == ticket_id),
+        freshness(Mechanic).join(mechanic_service_tickets).where(
+            mechanic_service_tickets.c.ticket_id == ticket_id
+        )
+    ]
+
+# Keyset used by cursor pagination: creation order, id as the tie-breaker
+TICKET_KEYSET = [(ServiceTicket.created_at, False), (ServiceTicket.id, False)]
+
+# Columns accepted by ?sort=; prefix with '-' for descending. Each has a
+# (user_id, column, id) index so a sorted page is an index range scan.
+# Priority sorts by urgency (ServiceTicket.PRIORITIES), not alphabetically
+TICKET_SORTS = {
+    'created_at': ServiceTicket.created_at,
+    'priority': ServiceTicket.priority_rank,
+    'status': ServiceTicket.status,
+    'id': ServiceTicket.id
+}
+
+def _ticket_keyset():
+    """Keyset for ?sort=, always ending in id so the order is total"""
+    sort = request.args.get('sort')
+    if not sort:
+        return TICKET_KEYSET
+    descending = sort.startswith('-')
+    column = TICKET_SORTS.get(sort.lstrip('-'))
+    if column is None:
+        raise ValueError(f"Cannot sort by '{sort.lstrip('-')}'; use one of {sorted(TICKET_SORTS)}")
+    if column is ServiceTicket.id:
+        return [(column, descending)]
+    return [(column, descending), (ServiceTicket.id, descending)]
+
+def _ticket_filters(query):
+    """Apply ?status=, ?priority=, ?created_after=, ?created_before= and ?mechanic_id="""
+    for name, column in (('status', ServiceTicket.status), ('priority', ServiceTicket.priority)):
+        if request.args.get(name):
+            query = query.filter(column.in_(request.args[name].split(',')))
+
+    for name, compare in (('created_after', ServiceTicket.created_at.__ge__),
+                          ('created_before', ServiceTicket.created_at.__lt__)):
+        if request.args.get(name):
+            try:
+                query = query.filter(compare(datetime.fromisoformat(request.args[name])))
+            except ValueError:
+                raise ValueError(f'{name} must be an ISO 8601 date or datetime')
+
+    if 'mechanic_id' in request.args:
+        mechanic_id = request.args.get('mechanic_id', type=int)
+        if mechanic_id is None:
+            raise ValueError('mechanic_id must be an integer')
+        # Enters through the junction table's (mechanic_id, ticket_id) key
+        query = query.join(mechanic_service_tickets).filter(
+            mechanic_service_tickets.c.mechanic_id == mechanic_id
+        )
+    return query
+
 # Get all tickets (paginated)
 @service_ticket_bp.get('')
 @jwt_required()
-@cache.cached(timeout=300)
+@conditional_view(ticket_list_state)
+@cached_view(timeout=3600, tags=ticket_list_tags)
 def get_tickets():
-    """Get paginated list of service tickets"""
-    user_id = get_jwt_identity()
+    """Get paginated list of service tickets, optionally filtered and sorted"""
+    user_id = current_user.id
+    schema = projected_schema(service_tickets_schema)
+    try:
+        keyset = _ticket_keyset()
+        query = _ticket_filters(ServiceTicket.query.options(
+            *query_options(schema, ServiceTicket, *(column for column, _ in keyset), *total_columns())
+        ).filter_by(user_id=user_id))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    if cursor_requested():
+        try:
+            cursor_page = paginate_by_cursor(query, keyset, *cursor_args())
+        except InvalidCursor as e:
+            return jsonify({'message': str(e)}), 400
+        return jsonify({
+            'tickets': schema.dump(attach_totals(db.session, cursor_page.items, schema)),
+            'limit': cursor_page.limit,
+            'next_cursor': cursor_page.next_cursor,
+            'has_next': cursor_page.has_next
+        })
+
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
     
-    pagination = ServiceTicket.query.filter_by(user_id=user_id).paginate(
+    pagination = query.order_by(
+        *(column.desc() if descending else column.asc() for column, descending in keyset)
+    ).paginate(
         page=page,
         per_page=per_page,
         error_out=False
     )
     
     return jsonify({
-        'tickets': service_tickets_schema.dump(pagination.items),
+        'tickets': schema.dump(attach_totals(db.session, pagination.items, schema)),
         'total': pagination.total,
         'pages': pagination.pages,
         'current_page': page,
@@ -93,26 +225,56 @@ def get_tickets():
         'has_prev': pagination.has_prev
     })
 
+# Full-text search
+@service_ticket_bp.get('/search')
+@jwt_required()
+@cached_view(timeout=300, tags=lambda identity, **kwargs: ['tickets', 'mechanics'])
+def search_tickets():
+    """Search ticket titles and descriptions, best match first"""
+    terms = request.args.get('q', '').strip()
+    if not terms:
+        return jsonify({'message': 'Query parameter q is required'}), 400
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = max(1, min(request.args.get('per_page', 10, type=int), MAX_LIMIT))
+
+    schema = projected_schema(service_tickets_schema)
+    query = ServiceTicket.query.options(*query_options(schema, ServiceTicket, ServiceTicket.id, *total_columns()))
+    # Admins search the whole shop, customers their own tickets
+    if not current_user.is_admin:
+        query = query.filter(ServiceTicket.user_id == current_user.id)
+
+    # One extra row tells us whether there is a next page, no COUNT needed
+    rows = ranked_search(query, ServiceTicket, terms, ['title', 'description']) \
+        .offset((page - 1) * per_page).limit(per_page + 1).all()
+    return jsonify({
+        'tickets': schema.dump(attach_totals(db.session, rows[:per_page], schema)),
+        'page': page,
+        'per_page': per_page,
+        'has_next': len(rows) > per_page
+    })
+
 # Get single ticket
 @service_ticket_bp.get('/<int:ticket_id>')
 @jwt_required()
+@conditional_view(ticket_detail_state)
+@cached_view(timeout=3600, tags=ticket_detail_tags)
 def get_ticket(ticket_id):
     """Get a specific service ticket"""
+    schema = projected_schema(service_ticket_schema)
     try:
-        user_id = get_jwt_identity()
-        
-        # Convert user_id to int if it's a string
-        if isinstance(user_id, str):
-            user_id = int(user_id)
+        user_id = current_user.id
             
-        ticket = ServiceTicket.query.get_or_404(ticket_id)
+        ticket = ServiceTicket.query.options(
+            *query_options(schema, ServiceTicket, ServiceTicket.user_id, *total_columns())
+        ).get_or_404(ticket_id)
         
         # Verify ownership
         if ticket.user_id != user_id:
             return jsonify({'message': 'Unauthorized'}), 403
             
         # Return single ticket with relationships
-        result = service_ticket_schema.dump(ticket)
+        attach_totals(db.session, [ticket], schema)
+        result = schema.dump(ticket)
         return jsonify(result), 200
         
     except Exception as e:
@@ -121,32 +283,50 @@ def get_ticket(ticket_id):
             'message': str(e)
         }), 400
 
+# Ticket cost
+@service_ticket_bp.get('/<int:ticket_id>/total')
+@jwt_required()
+@conditional_view(ticket_detail_state)
+@cached_view(timeout=3600, tags=ticket_detail_tags)
+def get_ticket_total(ticket_id):
+    """Sum of the prices of a ticket's attached and reserved parts"""
+    ticket = db.session.execute(
+        select(ServiceTicket.user_id, ServiceTicket.parts_total).where(ServiceTicket.id == ticket_id)
+    ).first()
+    if ticket is None:
+        return jsonify({'message': 'Ticket not found'}), 404
+    if ticket.user_id != current_user.id:
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    if totals_materialized():
+        total = ticket.parts_total
+    else:
+        total = ticket_totals(db.session, [ticket_id])[ticket_id]
+    return jsonify({'ticket_id': ticket_id, 'total': total}), 200
+
 # Update ticket
 @service_ticket_bp.route('/<int:id>', methods=['PUT'])
 @jwt_required()
 def update_ticket(id):
     """Update a service ticket"""
     try:
-        current_user_id = get_jwt_identity()
         ticket = ServiceTicket.query.get_or_404(id)
         
-        # Check if the token is an integer or string
-        if isinstance(current_user_id, str):
-            current_user_id = int(current_user_id)
-        
         # Verify ownership
-        if ticket.user_id != current_user_id:
+        if ticket.user_id != current_user.id:
             return jsonify({'message': 'Unauthorized'}), 403
             
         data = request.get_json()
         
         # Update fields
-        for field in ['status', 'priority', 'title', 'description']:
+        for field in ['status', 'priority', 'title', 'description', 'specialty']:
             if field in data:
                 setattr(ticket, field, data[field])
             
         db.session.commit()
+        invalidate_ticket(ticket.user_id, ticket.id)
         
+        attach_totals(db.session, [ticket], service_ticket_schema)
         return jsonify(service_ticket_schema.dump(ticket)), 200
         
     except Exception as e:
@@ -162,23 +342,23 @@ def update_ticket(id):
 def delete_ticket(id):
     """Delete a service ticket"""
     try:
-        user_id = get_jwt_identity()
+        user_id = current_user.id
         ticket = ServiceTicket.query.get_or_404(id)
         
-        # Convert user_id to int if needed
-        if isinstance(user_id, str):
-            user_id = int(user_id)
-        
         # Verify ownership
         if ticket.user_id != user_id:
             return jsonify({'message': 'Unauthorized'}), 403
         
-        # Remove relationships first
-        ticket.mechanics = []
-        ticket.parts = []
+        mechanic_ids = db.session.scalars(
+            select(mechanic_service_tickets.c.mechanic_id).where(mechanic_service_tickets.c.ticket_id == id)
+        ).all()
+
+        # Put reserved stock back; junction rows go by ON DELETE CASCADE
+        release_parts(db.session, [id])
         
         db.session.delete(ticket)
         db.session.commit()
+        invalidate_ticket(user_id, id, mechanic_ids)
         
         # Return 204 No Content status code
         return '', 204
@@ -196,45 +376,79 @@ def delete_ticket(id):
 @limiter.limit("30 per minute")
 def update_ticket_mechanics(ticket_id):
     """Update mechanics assigned to a service ticket"""
-    user_id = get_jwt_identity()
-    ticket = ServiceTicket.query.get_or_404(ticket_id)
+    ticket = db.session.execute(
+        select(ServiceTicket.id, ServiceTicket.user_id).where(ServiceTicket.id == ticket_id)
+    ).first()
+    if ticket is None:
+        return jsonify({'message': 'Service ticket not found'}), 404
     
     # Verify ticket belongs to authenticated customer
-    if ticket.user_id != user_id:
+    if ticket.user_id != current_user.id:
         return jsonify({'message': 'Unauthorized'}), 403
     
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     remove_ids = data.get('remove_ids', [])
     add_ids = data.get('add_ids', [])
-    
-    # Remove mechanics
-    mechanics_to_remove = Mechanic.query.filter(Mechanic.id.in_(remove_ids)).all()
-    for mechanic in mechanics_to_remove:
-        if mechanic in ticket.mechanics:
-            ticket.mechanics.remove(mechanic)
-    
-    # Add mechanics
-    mechanics_to_add = Mechanic.query.filter(Mechanic.id.in_(add_ids)).all()
-    for mechanic in mechanics_to_add:
-        if mechanic not in ticket.mechanics:
-            ticket.mechanics.append(mechanic)
-    
-    db.session.commit()
-    
+    if not all(isinstance(ids, list) and all(type(i) is int for i in ids) for ids in (remove_ids, add_ids)):
+        return jsonify({'message': 'remove_ids and add_ids must be lists of mechanic ids'}), 400
+    # An id in both lists ends up assigned, as removals apply first
+    remove_ids = set(remove_ids) - set(add_ids)
+    add_ids = set(add_ids)
+
+    junction = mechanic_service_tickets
+    try:
+        if remove_ids:
+            db.session.execute(
+                delete(junction).where(junction.c.ticket_id == ticket_id, junction.c.mechanic_id.in_(remove_ids))
+            )
+        # Unknown mechanics and existing assignments are skipped by the statement itself
+        if add_ids:
+            db.session.execute(
+                insert_ignore(db.session, junction).from_select(
+                    ['mechanic_id', 'ticket_id'],
+                    select(Mechanic.id, literal(ticket_id)).where(Mechanic.id.in_(add_ids))
+                )
+            )
+        # Assignments live in the junction table; bump the ticket's validators
+        db.session.execute(
+            update(ServiceTicket)
+            .where(ServiceTicket.id == ticket_id)
+            .values(updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'error': 'Failed to update mechanics',
+            'message': str(e)
+        }), 400
+    invalidate_ticket(ticket.user_id, ticket_id, remove_ids | add_ids)
+
+    mechanics = db.session.execute(
+        select(Mechanic.id, Mechanic.name)
+        .join(junction, junction.c.mechanic_id == Mechanic.id)
+        .where(junction.c.ticket_id == ticket_id)
+        .order_by(Mechanic.id)
+    )
     return jsonify({
         'message': 'Mechanics updated successfully',
-        'mechanics': [{'id': m.id, 'name': m.name} for m in ticket.mechanics]
+        'mechanics': [{'id': mechanic_id, 'name': name} for mechanic_id, name in mechanics]
     })
 
 @service_ticket_bp.route('/my-tickets')
 @jwt_required()
-@cache.cached(timeout=300)
+@conditional_view(ticket_list_state)
+@cached_view(timeout=3600, tags=ticket_list_tags)
 def get_my_tickets():
     """Get all service tickets for the authenticated user"""
+    schema = projected_schema(service_tickets_schema)
     try:
-        user_id = get_jwt_identity()
-        tickets = ServiceTicket.query.filter_by(user_id=user_id).all()
-        result = service_tickets_schema.dump(tickets)
+        user_id = current_user.id
+        tickets = ServiceTicket.query.options(
+            *query_options(schema, ServiceTicket, *total_columns())
+        ).filter_by(user_id=user_id).all()
+        result = schema.dump(attach_totals(db.session, tickets, schema))
         return jsonify(result), 200
         
     except Exception as e:
@@ -1,18 +1,25 @@
 from flask import jsonify, request, current_app as app, Blueprint
 from marshmallow import ValidationError
 from . import user_bp
-from app.models import User, ServiceTicket, db
-from app.components.schemas.user import user_schema, users_schema, login_schema
+from app.models import User, ServiceTicket, Mechanic, db, mechanic_service_tickets
+from app.components.schemas.user import (
+    user_schema, login_schema,
+    user_summaries_schema, user_summaries_with_tickets_schema
+)
 from app.components.schemas.service_ticket import service_tickets_schema
-from app import limiter, cache
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from app import limiter
+from app.utils.caching import cached_view, invalidate_tags, mechanic_tag, user_tag
+from app.utils.identity import invalidate_identity
+from app.utils.passwords import HashingBusy
+from app.utils.stock import release_parts
+from app.utils.totals import attach_totals, total_columns
+from app.utils.conditional import conditional_view, freshness
+from app.utils.fieldsets import projected_schema, requested_fields, requested_includes
+from app.utils.loading import nested_schema, query_options
+from app.utils.pagination import InvalidCursor, cursor_args, cursor_requested, paginate_by_cursor
+from flask_jwt_extended import create_access_token, jwt_required, current_user
 from functools import wraps
-
-def make_cache_key(*args, **kwargs):
-    """Generate a cache key based on the route and query parameters"""
-    path = request.path
-    args = str(hash(frozenset(request.args.items())))
-    return f'view/{path}:{args}'
+from sqlalchemy import case, func, select
 
 # Remove the duplicate Blueprint creation
 # user_bp = Blueprint('user', __name__)  # Remove this line
@@ -31,12 +38,17 @@ def login():
                 'error': 'Invalid credentials',
                 'message': 'Invalid email or password!'
             }), 401
+
+        # Transparently move old hashes to the configured algorithm and cost
+        if user.password_needs_rehash():
+            user.set_password(validated_data['password'])
+            db.session.commit()
         
         access_token = create_access_token(identity=user.id)
         
         return jsonify({
             'message': 'Login successful',
-            'user': user_schema.dump(user),
+            'user': user_schema.dump(_attach_nested_totals([user], user_schema)[0]),
             'token': access_token
         }), 200
         
@@ -80,12 +92,15 @@ def register():
         
         db.session.add(user)
         db.session.commit()
+        invalidate_tags('users')
         
         return jsonify({
             'message': 'User registered successfully',
             'user': user_schema.dump(user)
         }), 201
         
+    except HashingBusy:
+        raise  # Answered with 503 by the app-level handler
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -93,23 +108,83 @@ def register():
             'message': str(e)
         }), 400
 
+SUMMARY_FIELDS = ('ticket_count', 'open_ticket_count', 'last_ticket_at')
+
+def _user_list_schema():
+    """Summary schema for user lists; tickets only when explicitly requested"""
+    requested = (requested_includes() or []) + (requested_fields('user') or [])
+    if 'service_tickets' in requested:
+        return projected_schema(user_summaries_with_tickets_schema)
+    return projected_schema(user_summaries_schema)
+
+def _attach_ticket_summaries(users, schema):
+    """Set the ticket aggregates on a page of users with one GROUP BY query"""
+    if not users or not any(name in schema.dump_fields for name in SUMMARY_FIELDS):
+        return users
+    rows = db.session.execute(
+        select(
+            ServiceTicket.user_id,
+            func.count(ServiceTicket.id),
+            func.count(case((ServiceTicket.status.not_in(ServiceTicket.CLOSED_STATUSES), 1))),
+            func.max(ServiceTicket.created_at)
+        )
+        .where(ServiceTicket.user_id.in_([user.id for user in users]))
+        .group_by(ServiceTicket.user_id)
+    )
+    summaries = {user_id: summary for user_id, *summary in rows}
+    for user in users:
+        user.ticket_count, user.open_ticket_count, user.last_ticket_at = \
+            summaries.get(user.id, (0, 0, None))
+    return users
+
+def _attach_nested_totals(users, schema):
+    """Set `total` on the tickets embedded in `users`, as ticket endpoints return it"""
+    field = schema.dump_fields.get('service_tickets')
+    if users and field is not None:
+        tickets = [ticket for user in users for ticket in user.service_tickets]
+        attach_totals(db.session, tickets, nested_schema(field))
+    return users
+
+def _attach_details(users, schema):
+    """Ticket aggregates and embedded ticket totals for a page of users"""
+    return _attach_nested_totals(_attach_ticket_summaries(users, schema), schema)
+
 @user_bp.get('')  # This route is at '/users' (since blueprint has a prefix)
 @jwt_required()
-@cache.cached(timeout=300, key_prefix=make_cache_key)
+@cached_view(
+    timeout=300,
+    tags=lambda identity, **kwargs: ['users', 'tickets', 'mechanics'],
+    vary_on_identity=False
+)
 def get_users():
     """Get list of users - accessible to any authenticated user"""
+    schema = _user_list_schema()
     try:
+        query = User.query.options(*query_options(schema, User, User.id))
+
+        if cursor_requested():
+            try:
+                cursor_page = paginate_by_cursor(query, [(User.id, False)], *cursor_args())
+            except InvalidCursor as e:
+                return jsonify({'message': str(e)}), 400
+            return jsonify({
+                'items': schema.dump(_attach_details(cursor_page.items, schema)),
+                'limit': cursor_page.limit,
+                'next_cursor': cursor_page.next_cursor,
+                'has_next': cursor_page.has_next
+            }), 200
+
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         
-        pagination = User.query.paginate(
+        pagination = query.paginate(
             page=page,
             per_page=per_page,
             error_out=False
         )
         
         return jsonify({
-            'items': users_schema.dump(pagination.items),
+            'items': schema.dump(_attach_details(pagination.items, schema)),
             'page': page,
             'pages': pagination.pages,
             'per_page': per_page,
@@ -124,13 +199,19 @@ def get_users():
 @user_bp.route('/my-tickets')
 @jwt_required()
 @limiter.limit("30 per minute")
-@cache.memoize(300)
+@conditional_view(lambda **kwargs: [
+    freshness(ServiceTicket, ServiceTicket.user_id == current_user.id), freshness(Mechanic)
+])
+@cached_view(timeout=3600, tags=lambda identity, **kwargs: [user_tag(identity), 'mechanics'])
 def get_my_tickets():
     """Get all service tickets for the authenticated user"""
+    schema = projected_schema(service_tickets_schema)
     try:
-        user_id = get_jwt_identity()
-        tickets = ServiceTicket.query.filter_by(user_id=user_id).all()
-        return jsonify(service_tickets_schema.dump(tickets)), 200
+        user_id = current_user.id
+        tickets = ServiceTicket.query.options(
+            *query_options(schema, ServiceTicket, *total_columns())
+        ).filter_by(user_id=user_id).all()
+        return jsonify(schema.dump(attach_totals(db.session, tickets, schema))), 200
     except Exception as e:
         return jsonify({
             'error': 'Failed to retrieve tickets',
@@ -142,10 +223,7 @@ def get_my_tickets():
 def update_user(id):
     """Update user details - only owner can update their profile"""
     try:
-        current_user_id = get_jwt_identity()
-        
-        # Convert both IDs to strings for comparison
-        if str(current_user_id) != str(id):
+        if current_user.id != id:
             return jsonify({'message': 'Can only update your own profile'}), 403
             
         user = User.query.get_or_404(id)
@@ -164,13 +242,17 @@ def update_user(id):
             user.set_password(data['password'])
             
         db.session.commit()
-        cache.delete(make_cache_key())
+        invalidate_identity(user.id)
+        invalidate_tags('users', user_tag(user.id))
         
         return jsonify({
             'message': 'Profile updated successfully',
-            'user': user_schema.dump(user)
+            'user': user_schema.dump(_attach_nested_totals([user], user_schema)[0])
         }), 200
         
+    except HashingBusy:
+        db.session.rollback()
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
@@ -181,11 +263,21 @@ def delete_user(id):
     """Delete user account"""
     try:
         user = User.query.get_or_404(id)
+        user_tickets = select(ServiceTicket.id).where(ServiceTicket.user_id == id)
+        # Mechanic views list these tickets; collect them before the cascade
+        mechanic_ids = db.session.scalars(
+            select(mechanic_service_tickets.c.mechanic_id.distinct())
+            .where(mechanic_service_tickets.c.ticket_id.in_(user_tickets))
+        ).all()
+        # Tickets and their junction rows go by ON DELETE CASCADE; only the
+        # reserved stock needs putting back first
+        release_parts(db.session, user_tickets)
         db.session.delete(user)
         db.session.commit()
         
         # Clear cached data
-        cache.delete(make_cache_key())
+        invalidate_identity(id)
+        invalidate_tags('users', 'tickets', user_tag(id), *(mechanic_tag(m) for m in mechanic_ids))
         
         return jsonify({
             'message': 'User deleted successfully'
@@ -199,14 +291,15 @@ def delete_user(id):
 @jwt_required()
 def get_user(id):
     """Get user details - accessible to any authenticated user"""
+    schema = projected_schema(user_schema)
     try:
-        user = User.query.get(id)
+        user = db.session.get(User, id, options=query_options(schema, User))
         if not user:
             return jsonify({
                 'message': 'User not found',
                 'user_id': id
             }), 404
-        return jsonify(user_schema.dump(user)), 200
+        return jsonify(schema.dump(_attach_nested_totals([user], schema)[0])), 200
     except Exception as e:
         return jsonify({
             'error': 'Database error',
@@ -0,0 +1,3 @@
+# Import every schema module so nested schemas referenced by name
+# (e.g. 'InventorySchema') are always in marshmallow's class registry
+from . import inventory, mechanic, service_ticket, user
@@ -1,6 +1,7 @@
 from marshmallow import Schema, fields
 
 class InventorySchema(Schema):
+    resource_type = 'part'  # Name used in ?fields[part]=
     id = fields.Int(dump_only=True)
     name = fields.Str(required=True)
     price = fields.Float(required=True)
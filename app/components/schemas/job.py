@@ -0,0 +1,18 @@
+import json
+from marshmallow import Schema, fields
+
+class JobSchema(Schema):
+    """Status of a background job; `result` is set once it succeeds"""
+    id = fields.Int(dump_only=True)
+    kind = fields.Str(dump_only=True)
+    status = fields.Str(dump_only=True)
+    progress = fields.Int(dump_only=True)
+    attempts = fields.Int(dump_only=True)
+    max_attempts = fields.Int(dump_only=True)
+    error = fields.Str(dump_only=True)
+    result = fields.Function(lambda job: json.loads(job.result) if job.result else None)
+    created_at = fields.DateTime(dump_only=True)
+    started_at = fields.DateTime(dump_only=True)
+    finished_at = fields.DateTime(dump_only=True)
+
+job_schema = JobSchema()
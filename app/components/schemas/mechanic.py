@@ -1,6 +1,8 @@
 from marshmallow import Schema, fields, EXCLUDE, validate
 
 class MechanicSchema(Schema):
+    resource_type = 'mechanic'  # Name used in ?fields[mechanic]=
+
     class Meta:
         unknown = EXCLUDE
 
@@ -10,5 +12,14 @@ class MechanicSchema(Schema):
     phone = fields.Str(required=True)
     specialty = fields.Str(required=True)
 
+class MechanicAssignmentSchema(Schema):
+    """One (mechanic, ticket) pair for POST /mechanics/assignments"""
+    mechanic_id = fields.Int(required=True, strict=True)
+    ticket_id = fields.Int(required=True, strict=True)
+
+    class Meta:
+        unknown = EXCLUDE
+
 mechanic_schema = MechanicSchema()
-mechanics_schema = MechanicSchema(many=True)
\ No newline at end of file
+mechanics_schema = MechanicSchema(many=True)
+mechanic_assignments_schema = MechanicAssignmentSchema(many=True)
\ No newline at end of file
@@ -1,27 +1,41 @@
-from marshmallow import Schema, fields, validates, ValidationError, EXCLUDE
+from marshmallow import Schema, fields, validate, validates, ValidationError, EXCLUDE
+
+class PartReservationSchema(Schema):
+    """Catalog part and quantity taken out of stock for a ticket"""
+    part_id = fields.Int(required=True, strict=True)
+    quantity = fields.Int(required=True, strict=True, validate=validate.Range(min=1))
+
+    class Meta:
+        unknown = EXCLUDE
 
 class ServiceTicketSchema(Schema):
     """Schema for serializing/deserializing service tickets"""
+    resource_type = 'ticket'  # Name used in ?fields[ticket]=
     id = fields.Int(dump_only=True)
     title = fields.Str(required=True)
     description = fields.Str(required=True)
     status = fields.Str(required=True)
     priority = fields.Str(required=True)
+    specialty = fields.Str(allow_none=True)
     user_id = fields.Int(dump_only=True)
     created_at = fields.DateTime(dump_only=True)
     updated_at = fields.DateTime(dump_only=True)
+    total = fields.Float(dump_only=True)  # Set by app.utils.totals.attach_totals
     
     # Relationships
     user = fields.Nested('UserSchema', exclude=('service_tickets', 'password'), dump_only=True)
     mechanics = fields.List(fields.Nested('MechanicSchema', only=('id', 'name')), dump_only=True)
     parts = fields.List(fields.Nested('InventorySchema', only=('id', 'name', 'price')), dump_only=True)
+    reserved_parts = fields.List(fields.Nested(PartReservationSchema), dump_only=True)
     
     # Request-only fields
     mechanic_ids = fields.List(fields.Int(), load_only=True, required=False)
     part_ids = fields.List(fields.Int(), load_only=True, required=False)
+    auto_assign = fields.Bool(load_only=True, required=False)
 
     class Meta:
         unknown = EXCLUDE
 
 service_ticket_schema = ServiceTicketSchema()
-service_tickets_schema = ServiceTicketSchema(many=True)
\ No newline at end of file
+service_tickets_schema = ServiceTicketSchema(many=True)
+part_reservations_schema = PartReservationSchema(many=True)
\ No newline at end of file
@@ -2,6 +2,7 @@ from marshmallow import Schema, fields, validates, ValidationError, EXCLUDE  # A
 
 class UserSchema(Schema):
     """Schema for serializing/deserializing users"""
+    resource_type = 'user'  # Name used in ?fields[user]=
     id = fields.Int(dump_only=True)
     name = fields.Str(required=True)
     email = fields.Str(required=True)
@@ -14,6 +15,12 @@ class UserSchema(Schema):
     class Meta:
         unknown = EXCLUDE
 
+class UserSummarySchema(UserSchema):
+    """User list entry with ticket aggregates instead of the full ticket list"""
+    ticket_count = fields.Int(dump_only=True)
+    open_ticket_count = fields.Int(dump_only=True)
+    last_ticket_at = fields.DateTime(dump_only=True)
+
 class LoginSchema(Schema):
     """Schema for login validation"""
     email = fields.Str(required=True)
@@ -24,4 +31,6 @@ class LoginSchema(Schema):
 
 user_schema = UserSchema()
 users_schema = UserSchema(many=True)
+user_summaries_schema = UserSummarySchema(many=True, exclude=('service_tickets',))
+user_summaries_with_tickets_schema = UserSummarySchema(many=True)
 login_schema = LoginSchema()
\ No newline at end of file
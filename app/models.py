@@ -1,9 +1,10 @@
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey, Table, Float
+from sqlalchemy.orm import Mapped, column_property, mapped_column, relationship
+from sqlalchemy import ForeignKey, Table, Float, Integer, case, literal_column
 from datetime import date, datetime
-from typing import List
-from werkzeug.security import generate_password_hash, check_password_hash
+from typing import List, Optional
+from flask import current_app
 from . import db
+from app.utils.search import attach_search_index
 from flask_jwt_extended import create_access_token
 
 class User(db.Model):
@@ -16,17 +17,23 @@ class User(db.Model):
     phone = db.Column(db.String(20), nullable=False)  # Remove unique constraint
     is_admin = db.Column(db.Boolean, default=False)
 
-    # Update relationship to include cascade
+    # Tickets go with the user; the database cascades the DELETE, so the
+    # collection is never loaded just to be deleted
     service_tickets: Mapped[List["ServiceTicket"]] = relationship(
         back_populates="user",
-        cascade="all, delete-orphan"  # This ensures tickets are deleted with the user
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = current_app.extensions['password_hasher'].hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return current_app.extensions['password_hasher'].verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """True if the stored hash predates the configured algorithm or cost"""
+        return current_app.extensions['password_hasher'].needs_rehash(self.password_hash)
 
     def get_token(self):
         """Generate JWT token for user"""
@@ -52,8 +59,10 @@ class User(db.Model):
 mechanic_service_tickets = Table(
     'mechanic_service_tickets',
     db.Model.metadata,
-    db.Column('mechanic_id', db.Integer, ForeignKey('mechanics.id'), primary_key=True),
-    db.Column('ticket_id', db.Integer, ForeignKey('service_tickets.id'), primary_key=True)
+    db.Column('mechanic_id', db.Integer, ForeignKey('mechanics.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('ticket_id', db.Integer, ForeignKey('service_tickets.id', ondelete='CASCADE'), primary_key=True),
+    # The primary key serves mechanic -> tickets; this serves ticket -> mechanics
+    db.Index('ix_mechanic_service_tickets_ticket_mechanic', 'ticket_id', 'mechanic_id')
 )
 
 class Mechanic(db.Model):
@@ -63,10 +72,11 @@ class Mechanic(db.Model):
     name: Mapped[str] = mapped_column(db.String(100), nullable=False)
     specialty: Mapped[str] = mapped_column(db.String(100))
     phone: Mapped[str] = mapped_column(db.String(20), nullable=False)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     service_tickets = relationship('ServiceTicket', secondary='mechanic_service_tickets',
-                                 back_populates='mechanics')
+                                 back_populates='mechanics', passive_deletes=True)
 
     def to_dict(self):
         return {
@@ -83,8 +93,9 @@ class Mechanic(db.Model):
 ticket_parts = Table(
     'ticket_parts',
     db.Model.metadata,
-    db.Column('ticket_id', db.Integer, ForeignKey('service_tickets.id'), primary_key=True),
-    db.Column('part_id', db.Integer, ForeignKey('inventory.id'), primary_key=True)
+    db.Column('ticket_id', db.Integer, ForeignKey('service_tickets.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('part_id', db.Integer, ForeignKey('inventory.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_ticket_parts_part_ticket', 'part_id', 'ticket_id')
 )
 
 class Inventory(db.Model):
@@ -98,7 +109,8 @@ class Inventory(db.Model):
     # Relationships
     service_tickets: Mapped[List["ServiceTicket"]] = relationship(
         secondary=ticket_parts,
-        back_populates="parts"
+        back_populates="parts",
+        passive_deletes=True
     )
 
     def __repr__(self):
@@ -106,20 +118,90 @@ class Inventory(db.Model):
 
 class ServiceTicket(db.Model):
     __tablename__ = 'service_tickets'
+
+    __table_args__ = (
+        # Per-user lists in keyset order
+        db.Index('ix_service_tickets_user_created', 'user_id', 'created_at', 'id'),
+        db.Index('ix_service_tickets_user_status', 'user_id', 'status', 'id'),
+        db.Index('ix_service_tickets_user_priority', 'user_id', 'priority', 'id'),
+        db.Index('ix_service_tickets_status_created', 'status', 'created_at'),
+        db.Index('ix_service_tickets_priority_created', 'priority', 'created_at'),
+        db.Index('ix_service_tickets_created_at', 'created_at'),
+    )
+
+    # Statuses that no longer count as open work
+    CLOSED_STATUSES = ('closed', 'completed', 'cancelled')
+    # Priorities from least to most urgent; ?sort=priority follows this order
+    PRIORITIES = ('low', 'normal', 'high', 'urgent')
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=False)
     status = db.Column(db.String(20), nullable=False)
     priority = db.Column(db.String(20), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # Position of priority in PRIORITIES, 0 if unrecognised. Values are inlined
+    # rather than bound so queries can use the expression index below
+    priority_rank = column_property(case(
+        {literal_column(f"'{name}'"): literal_column(str(rank), Integer)
+         for rank, name in enumerate(PRIORITIES, 1)},
+        value=priority, else_=literal_column('0', Integer)
+    ))
+    # Mechanic.specialty the work needs; the auto-assigner matches on it
+    specialty = db.Column(db.String(100))
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Denormalized sum of attached and reserved part prices, kept by app.utils.totals
+    parts_total = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
 
     # Relationships
     user = relationship("User", back_populates="service_tickets")
-    mechanics = relationship("Mechanic", secondary=mechanic_service_tickets, back_populates="service_tickets")
-    parts = relationship("Inventory", secondary=ticket_parts, back_populates="service_tickets")
+    mechanics = relationship("Mechanic", secondary=mechanic_service_tickets, back_populates="service_tickets",
+                             passive_deletes=True)
+    parts = relationship("Inventory", secondary=ticket_parts, back_populates="service_tickets", passive_deletes=True)
+    reserved_parts = relationship("PartReservation", viewonly=True)
+
+# Per-user lists in ?sort=priority order
+db.Index('ix_service_tickets_user_priority_rank',
+         ServiceTicket.user_id, ServiceTicket.priority_rank.expression, ServiceTicket.id)
+
+class PartReservation(db.Model):
+    """Catalog stock held by a ticket; returned to the part when the ticket is deleted"""
+    __tablename__ = 'ticket_part_reservations'
+
+    ticket_id = db.Column(db.Integer, db.ForeignKey('service_tickets.id', ondelete='CASCADE'), primary_key=True)
+    part_id = db.Column(db.Integer, db.ForeignKey('parts.id', ondelete='CASCADE'), primary_key=True, index=True)
+    quantity = db.Column(db.Integer, nullable=False)
+
+class Job(db.Model):
+    """Background work queued by the API and run by app.utils.jobs.JobQueue"""
+    __tablename__ = 'jobs'
+
+    __table_args__ = (
+        # Workers claim the oldest due job of a status
+        db.Index('ix_jobs_status_run_after', 'status', 'run_after', 'id'),
+    )
+
+    STATUSES = ('queued', 'running', 'succeeded', 'failed')
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    payload = db.Column(db.Text)  # JSON keyword arguments for the handler
+    result = db.Column(db.Text)  # JSON return value of the handler
+    error = db.Column(db.Text)
+    progress = db.Column(db.Integer, nullable=False, default=0)  # Percent
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+# SQLite FTS5 / Postgres tsvector index behind GET /service-tickets/search
+attach_search_index(ServiceTicket.__table__, ['title', 'description'])
 
 class Part(db.Model):
     __tablename__ = 'parts'
@@ -129,6 +211,13 @@ class Part(db.Model):
     part_number = db.Column(db.String(50), unique=True, nullable=False)
     price = db.Column(db.Float, nullable=False)
     quantity = db.Column(db.Integer, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Case-insensitive prefix lookups are range scans on these
+        db.Index('ix_parts_lower_name', db.func.lower(name)),
+        db.Index('ix_parts_lower_part_number', db.func.lower(part_number)),
+    )
     
     def to_dict(self):
         return {
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import uuid
+from functools import wraps
+from flask import current_app, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from app import cache
+
+
+def user_tag(user_id):
+    return f'user:{user_id}'
+
+
+def ticket_tag(ticket_id):
+    return f'ticket:{ticket_id}'
+
+
+def mechanic_tag(mechanic_id):
+    return f'mechanic:{mechanic_id}'
+
+
+def normalize_args(args):
+    """Sorted, de-duplicated (name, value) pairs for a query string.
+
+    Parameter order and repeated identical pairs do not change the meaning
+    of a request, so they must not change its cache key either.
+    """
+    pairs = {(str(name).strip(), str(value).strip()) for name, value in args.items(multi=True)}
+    return sorted(pairs)
+
+
+def build_cache_key(namespace, identity=None, args=None, view_args=None, extra=()):
+    """Deterministic cache key shared by every worker and across restarts.
+
+    Uses sha256 rather than hash(), which is salted per process. The key is
+    prefixed with API_VERSION so a deploy that changes a response shape
+    starts from a clean keyspace instead of serving the old shape.
+    """
+    payload = json.dumps(
+        [
+            None if identity is None else str(identity),
+            normalize_args(args) if args is not None else [],
+            sorted((str(k), str(v)) for k, v in (view_args or {}).items()),
+            list(extra)
+        ],
+        separators=(',', ':')
+    )
+    digest = hashlib.sha256(payload.encode()).hexdigest()
+    api_version = current_app.config.get('API_VERSION', 'v1')
+    return f'{api_version}:{namespace}:{digest}'
+
+
+def cached_view(timeout=None, tags=None, vary_on_identity=True):
+    """Cache a view per JWT identity and query string.
+
+    `tags` is a callable receiving the identity and the view kwargs and
+    returning the tag names the entry depends on. Each tag has a version token
+    stored in the cache; it is part of the entry key, so invalidate_tags()
+    orphans every entry built against the old token without having to know
+    their keys. Views that vary on identity must be decorated with
+    @jwt_required() first. Only 200 responses are cached.
+    """
+    def decorator(f):
+        namespace = f'view:{f.__module__}.{f.__name__}'
+
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            identity = get_jwt_identity() if vary_on_identity else None
+            tag_names = tags(identity, **kwargs) if tags else []
+            key = build_cache_key(
+                namespace,
+                identity=identity,
+                args=request.args,
+                view_args=kwargs,
+                extra=_tag_versions(tag_names)
+            )
+
+            cached = cache.get(key)
+            if cached is not None:
+                data, status, mimetype = cached
+                return current_app.response_class(data, status=status, mimetype=mimetype)
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                cache.set(
+                    key,
+                    (response.get_data(), response.status_code, response.mimetype),
+                    timeout=timeout
+                )
+            return response
+        return decorated
+    return decorator
+
+
+def invalidate_tags(*tag_names):
+    """Expire every cached entry that depends on any of `tag_names`"""
+    if tag_names:
+        cache.set_many({_tag_key(name): uuid.uuid4().hex for name in tag_names}, timeout=0)
+
+
+def invalidate_ticket(user_id, ticket_id=None, mechanic_ids=()):
+    """Expire the views that show a ticket after it was written"""
+    names = [user_tag(user_id), 'tickets']
+    if ticket_id is not None:
+        names.append(ticket_tag(ticket_id))
+    names.extend(mechanic_tag(mechanic_id) for mechanic_id in mechanic_ids)
+    invalidate_tags(*names)
+
+
+def invalidate_tickets(tickets, mechanic_ids=()):
+    """invalidate_ticket() for many (ticket_id, user_id) pairs in one cache write"""
+    names = {'tickets'}
+    for ticket_id, user_id in tickets:
+        names.update((user_tag(user_id), ticket_tag(ticket_id)))
+    names.update(mechanic_tag(mechanic_id) for mechanic_id in mechanic_ids)
+    if tickets:
+        invalidate_tags(*names)
+
+
+def _tag_versions(tag_names):
+    if not tag_names:
+        return []
+    keys = [_tag_key(name) for name in tag_names]
+    versions = list(cache.get_many(*keys))
+
+    # A missing tag gets a fresh random token rather than a counter reset, so
+    # entries built before the tag was evicted can never match again
+    missing = {key: uuid.uuid4().hex for key, version in zip(keys, versions) if version is None}
+    if missing:
+        cache.set_many(missing, timeout=0)
+        versions = [version or missing[key] for key, version in zip(keys, versions)]
+    return versions
+
+
+def _tag_key(name):
+    return f'tag:{name}'
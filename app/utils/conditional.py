@@ -0,0 +1,83 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+from flask import current_app, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import func, select, union_all
+from app import db
+from app.utils.caching import build_cache_key
+
+
+def freshness(model, *criteria):
+    """SELECT count(*), max(updated_at) over the rows a response is built from.
+
+    Edits move max(updated_at) and deletes change the count, so together they
+    identify a version of the rows without reading them.
+    """
+    return select(func.count(), func.max(model.updated_at)).select_from(model).where(*criteria)
+
+
+def conditional_view(state, vary_on_identity=True, last_modified=False):
+    """Answer If-None-Match / If-Modified-Since without running the view.
+
+    `state` receives the view kwargs and returns freshness() statements; they
+    run as one UNION ALL query. The weak ETag hashes their results together
+    with the identity and query string. With `last_modified`, the newest
+    updated_at among them is also sent as Last-Modified and If-Modified-Since
+    is honoured; only turn it on when `state` covers single rows, because a
+    row leaving a collection lowers the count but never moves the date.
+    If-Modified-Since is ignored whenever If-None-Match is sent (RFC 9110
+    13.1.3). Views that vary on identity must be decorated with
+    @jwt_required() first.
+    """
+    def decorator(f):
+        namespace = f'etag:{f.__module__}.{f.__name__}'
+
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            statements = state(**kwargs)
+            rows = db.session.execute(union_all(*statements)).all()
+            modified = _last_modified(rows) if last_modified else None
+
+            key = build_cache_key(
+                namespace,
+                identity=get_jwt_identity() if vary_on_identity else None,
+                args=request.args,
+                view_args=kwargs,
+                extra=[[count, updated and updated.isoformat()] for count, updated in rows]
+            )
+            etag = hashlib.sha256(key.encode()).hexdigest()[:32]
+
+            if _not_modified(etag, modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            if modified is not None:
+                response.last_modified = modified
+            return response
+        return decorated
+    return decorator
+
+
+def _last_modified(rows):
+    """Newest updated_at, truncated to the whole second HTTP dates carry.
+
+    None while that second may still see writes: a later edit in the same
+    second would truncate to the same date and revalidate as unchanged.
+    """
+    newest = max((updated for _, updated in rows if updated), default=None)
+    if newest is None or datetime.utcnow() - newest < timedelta(seconds=1):
+        return None
+    return newest.replace(microsecond=0, tzinfo=timezone.utc)
+
+
+def _not_modified(etag, last_modified):
+    if 'If-None-Match' in request.headers:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified is not None:
+        return last_modified <= request.if_modified_since
+    return False
@@ -0,0 +1,90 @@
+from functools import lru_cache
+from flask import request
+from app.utils.loading import nested_schema
+
+
+class InvalidFieldset(ValueError):
+    """Raised for unknown names in ?fields[<type>]= or ?include="""
+
+
+def requested_fields(resource_type):
+    """Field names from ?fields[<resource_type>]=a,b, or None if not given"""
+    return _split(request.args.get(f'fields[{resource_type}]'))
+
+
+def requested_includes():
+    """Relationship names from ?include=a,b, or None if not given"""
+    return _split(request.args.get('include'))
+
+
+def projected_schema(schema):
+    """`schema` restricted to the fields and relationships the client asked for.
+
+    Without ?fields[...] or ?include= the schema is returned unchanged.
+    ?fields[<type>]= selects the fields of the top-level resource (its
+    relationships count as fields), ?include= selects which relationships are
+    embedded, and ?fields[<type>]= for an included resource's type narrows the
+    embedded objects. Schemas name their type in a `resource_type` attribute.
+    """
+    only = _only_for(schema)
+    if only is None:
+        return schema
+    try:
+        return _build(type(schema), schema.many, only, tuple(sorted(schema.exclude)))
+    except ValueError as e:
+        raise InvalidFieldset(str(e))
+
+
+def filter_fields(data, resource_type):
+    """Apply ?fields[<resource_type>]= to an already serialized dict"""
+    wanted = requested_fields(resource_type)
+    if wanted is None:
+        return data
+    unknown = set(wanted) - set(data)
+    if unknown:
+        raise InvalidFieldset(f"Invalid fields for {resource_type}: {sorted(unknown)}")
+    return {name: data[name] for name in wanted}
+
+
+def _only_for(schema):
+    wanted = requested_fields(schema.resource_type)
+    includes = requested_includes()
+    if wanted is None and includes is None:
+        return None
+
+    relationships = {
+        name: nested for name, nested in
+        ((name, nested_schema(field)) for name, field in schema.dump_fields.items())
+        if nested is not None
+    }
+    if includes is not None:
+        unknown = set(includes) - set(relationships)
+        if unknown:
+            raise InvalidFieldset(f"Invalid include for {schema.resource_type}: {sorted(unknown)}")
+
+    if wanted is None:
+        scalars = [name for name in schema.dump_fields if name not in relationships]
+        embedded = includes if includes is not None else list(relationships)
+    else:
+        scalars = [name for name in wanted if name not in relationships]
+        embedded = [name for name in wanted if name in relationships] + (includes or [])
+
+    only = list(scalars)
+    for name in dict.fromkeys(embedded):
+        nested_fields = requested_fields(getattr(relationships[name], 'resource_type', None))
+        if nested_fields is None:
+            only.append(name)
+        else:
+            only.extend(f'{name}.{field}' for field in nested_fields)
+    return tuple(sorted(set(only)))
+
+
+@lru_cache(maxsize=256)
+def _build(schema_class, many, only, exclude):
+    return schema_class(many=many, only=only, exclude=exclude)
+
+
+def _split(value):
+    if value is None:
+        return None
+    return [name.strip() for name in value.split(',') if name.strip()]
@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import namedtuple
+from flask import current_app, g
+from sqlalchemy import select
+
+# What authenticated routes need to know about the caller; cheap to cache,
+# unlike the full User row
+Identity = namedtuple('Identity', ['id', 'is_admin'])
+
+
+class IdentityCache:
+    """Short-TTL, process-level cache of user id -> Identity"""
+
+    def __init__(self, timeout=30, maxsize=10000):
+        self.timeout = timeout
+        self.maxsize = maxsize
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, identity = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            return identity
+
+    def set(self, identity):
+        if self.timeout <= 0:
+            return
+        with self._lock:
+            if len(self._entries) >= self.maxsize:
+                self._entries.clear()
+            self._entries[identity.id] = (time.monotonic() + self.timeout, identity)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+def parse_user_id(subject):
+    """User id from a JWT subject, which may be a string or a legacy dict"""
+    if isinstance(subject, dict):
+        subject = subject['id']
+    return int(subject)
+
+
+def load_identity(user_id):
+    """Identity for `user_id`, or None if the user no longer exists.
+
+    Looked up in the request (flask.g), then the process-level cache, and
+    only then with a two-column query.
+    """
+    request_cache = g.setdefault('_identities', {})
+    if user_id in request_cache:
+        return request_cache[user_id]
+
+    identity_cache = current_app.extensions['identity_cache']
+    identity = identity_cache.get(user_id)
+    if identity is None:
+        from app import db
+        from app.models import User
+        row = db.session.execute(
+            select(User.id, User.is_admin).where(User.id == user_id)
+        ).first()
+        if row is not None:
+            identity = Identity(row.id, bool(row.is_admin))
+            identity_cache.set(identity)
+
+    request_cache[user_id] = identity
+    return identity
+
+
+def invalidate_identity(user_id):
+    """Forget a cached identity after the user was changed or deleted.
+
+    Only this process's cache is cleared; other workers pick the change up
+    within IDENTITY_CACHE_TIMEOUT seconds.
+    """
+    current_app.extensions['identity_cache'].invalidate(user_id)
+    g.pop('_identities', None)
@@ -0,0 +1,206 @@
+import json
+import logging
+import threading
+from collections import Counter, namedtuple
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, or_, select, update
+from app.models import Job, db
+
+logger = logging.getLogger(__name__)
+
+JobSpec = namedtuple('JobSpec', ['handler', 'max_attempts', 'concurrency'])
+
+# kind -> JobSpec, filled by @job
+HANDLERS = {}
+
+
+class UnknownJob(ValueError):
+    """Raised when enqueueing a kind no handler is registered for"""
+
+
+def job(kind, max_attempts=3, concurrency=None):
+    """Register `f(progress, **payload)` as the handler for jobs of `kind`.
+
+    The handler runs in an app context with its own db.session and returns a
+    JSON-serializable result. It may be retried after a failure, so it must be
+    safe to run again. `concurrency` caps how many jobs of this kind run at
+    once in one process.
+    """
+    def decorator(f):
+        HANDLERS[kind] = JobSpec(f, max_attempts, concurrency)
+        return f
+    return decorator
+
+
+def enqueue(kind, payload=None, user_id=None):
+    """Store a queued job, commit, and wake this process's workers"""
+    if kind not in HANDLERS:
+        raise UnknownJob(f'Unknown job type: {kind}')
+    queued = Job(
+        kind=kind,
+        payload=json.dumps(payload or {}),
+        user_id=user_id,
+        max_attempts=HANDLERS[kind].max_attempts
+    )
+    db.session.add(queued)
+    db.session.commit()
+    current_app.extensions['job_queue'].wake()
+    return queued
+
+
+class JobQueue:
+    """Runs queued jobs on a pool of daemon threads, using the jobs table as the queue.
+
+    No broker is involved. Workers claim a job with a conditional UPDATE, so
+    pools in several processes (web workers, `manage.py run_jobs`) can share
+    one table without ever running a job twice. Failed jobs are retried with
+    exponential backoff until max_attempts. A running job whose row has not
+    been touched for `stale_after` seconds is assumed to belong to a dead
+    process and is claimed again, or failed if that was its last attempt;
+    progress updates keep the row fresh.
+    """
+
+    def __init__(self, app, workers=2, poll_interval=1.0, retry_backoff=5, stale_after=600):
+        self.app = app
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.retry_backoff = retry_backoff
+        self.stale_after = stale_after
+        self._running = Counter()  # kind -> jobs running in this process
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def wake(self):
+        self._wake.set()
+
+    def run_next(self):
+        """Claim and run one due job in the calling thread; False when none was due"""
+        with self.app.app_context():
+            claimed = self._claim()
+            if claimed is None:
+                return False
+            job_id, kind = claimed
+            try:
+                self._run(job_id, HANDLERS[kind])
+            finally:
+                with self._lock:
+                    self._running[kind] -= 1
+            return True
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                if self.run_next():
+                    continue
+            except Exception:
+                logger.exception('Job worker error')
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def _stale(self, now):
+        return and_(Job.status == 'running', Job.updated_at < now - timedelta(seconds=self.stale_after))
+
+    def _claimable(self, now):
+        return or_(
+            and_(Job.status == 'queued', Job.run_after <= now),
+            and_(self._stale(now), Job.attempts < Job.max_attempts)
+        )
+
+    def _reap(self, now):
+        """Fail stale jobs that died on their last attempt; nothing would ever claim them again"""
+        db.session.execute(
+            update(Job)
+            .where(self._stale(now), Job.attempts >= Job.max_attempts)
+            .values(status='failed', error='Worker stopped responding on the last attempt',
+                    finished_at=now, updated_at=now)
+        )
+
+    def _claim(self):
+        with self._lock:
+            saturated = [
+                kind for kind, spec in HANDLERS.items()
+                if spec.concurrency is not None and self._running[kind] >= spec.concurrency
+            ]
+            now = datetime.utcnow()
+            self._reap(now)
+            candidates = db.session.execute(
+                select(Job.id, Job.kind)
+                .where(self._claimable(now), Job.kind.in_(HANDLERS), Job.kind.not_in(saturated))
+                .order_by(Job.run_after, Job.id)
+                .limit(self.workers)
+            ).all()
+            # Another worker may win any candidate; the re-checked WHERE decides
+            for job_id, kind in candidates:
+                result = db.session.execute(
+                    update(Job)
+                    .where(Job.id == job_id, self._claimable(now))
+                    .values(status='running', attempts=Job.attempts + 1, started_at=now, updated_at=now)
+                )
+                db.session.commit()
+                if result.rowcount == 1:
+                    self._running[kind] += 1
+                    return job_id, kind
+            db.session.commit()
+            return None
+
+    def _run(self, job_id, spec):
+        row = db.session.get(Job, job_id)
+        try:
+            result = spec.handler(lambda done, total=None: self._progress(job_id, done, total),
+                                  **json.loads(row.payload or '{}'))
+        except Exception as e:
+            logger.exception(f'Job {job_id} ({row.kind}) failed')
+            db.session.rollback()
+            row = db.session.get(Job, job_id)
+            row.error = f'{type(e).__name__}: {e}'
+            if row.attempts < row.max_attempts:
+                row.status = 'queued'
+                row.run_after = datetime.utcnow() + timedelta(seconds=self.retry_backoff * 2 ** (row.attempts - 1))
+            else:
+                row.status = 'failed'
+                row.finished_at = datetime.utcnow()
+            db.session.commit()
+            return
+
+        row = db.session.get(Job, job_id)
+        row.status = 'succeeded'
+        row.result = json.dumps(result)
+        row.error = None
+        row.progress = 100
+        row.finished_at = datetime.utcnow()
+        db.session.commit()
+
+    def _progress(self, job_id, done, total=None):
+        """Record progress as a percent (or `done` itself without a total).
+
+        Commits the handler's session, so work done so far is kept and the
+        row's updated_at doubles as a heartbeat.
+        """
+        percent = int(done * 100 / total) if total else int(done)
+        db.session.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(progress=min(max(percent, 0), 100), updated_at=datetime.utcnow())
+        )
+        db.session.commit()
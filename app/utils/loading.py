@@ -0,0 +1,68 @@
+from functools import lru_cache
+from marshmallow import fields
+from sqlalchemy.orm import ColumnProperty, RelationshipProperty, joinedload, load_only, selectinload
+
+
+def query_options(schema, model, *required):
+    """eager_options() plus load_only() when the schema is a projection.
+
+    `required` lists columns the view itself reads (ownership checks,
+    keyset columns) so they are never deferred.
+    """
+    options = eager_options(schema, model)
+    columns = _columns(schema, model) + list(required)
+    if schema.only is not None and columns:
+        options.append(load_only(*columns))
+    return options
+
+
+def eager_options(schema, model):
+    """Loader options for exactly the relationships `schema` will dump.
+
+    Walks the schema's dump fields (so `only`/`exclude` are respected) and
+    recurses into nested schemas. Collections are loaded with one SELECT ... IN
+    per relationship, many-to-one references are joined into the parent query,
+    so dumping a page costs a fixed number of queries whatever its size.
+    """
+    return list(_eager_options(schema, model))
+
+
+@lru_cache(maxsize=256)
+def _eager_options(schema, model):
+    options = []
+    for name, field in schema.dump_fields.items():
+        nested = nested_schema(field)
+        if nested is None:
+            continue
+
+        attr = getattr(model, field.attribute or name, None)
+        relationship = getattr(attr, 'property', None)
+        if not isinstance(relationship, RelationshipProperty):
+            continue
+
+        target = relationship.mapper.class_
+        loader = selectinload(attr) if relationship.uselist else joinedload(attr)
+        columns = _columns(nested, target)
+        if nested.only is not None and columns:
+            loader = loader.load_only(*columns)
+        children = _eager_options(nested, target)
+        options.append(loader.options(*children) if children else loader)
+    return tuple(options)
+
+
+def _columns(schema, model):
+    """Mapped columns behind the schema's dump fields"""
+    columns = []
+    for name, field in schema.dump_fields.items():
+        attr = getattr(model, field.attribute or name, None)
+        if isinstance(getattr(attr, 'property', None), ColumnProperty):
+            columns.append(attr)
+    return columns
+
+
+def nested_schema(field):
+    if isinstance(field, fields.List):
+        field = field.inner
+    if isinstance(field, fields.Nested):
+        return field.schema
+    return None
@@ -0,0 +1,124 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from flask import request
+from sqlalchemy import and_, or_
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor that we did not issue"""
+
+
+class CursorPage:
+    """One page of a keyset-paginated query"""
+
+    def __init__(self, items, next_cursor, limit):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.limit = limit
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def cursor_requested():
+    """Cursor mode is opt-in: any request carrying ?cursor= or ?limit= uses it"""
+    return 'cursor' in request.args or 'limit' in request.args
+
+
+def cursor_args():
+    """Read (cursor, limit) from the query string, clamping the limit"""
+    limit = request.args.get('limit', DEFAULT_LIMIT, type=int)
+    limit = max(1, min(limit, MAX_LIMIT))
+    return request.args.get('cursor') or None, limit
+
+
+def encode_cursor(keyset, values):
+    """Turn the keyset values of the last row into an opaque token.
+
+    The token also names the keyset (its columns and directions, i.e. the
+    ?sort= in effect), so it is only accepted by the listing that issued it.
+    """
+    payload = [_signature(keyset)] + [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token, keyset):
+    """Inverse of encode_cursor, validated against the keyset it is used with"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise InvalidCursor('Malformed cursor')
+
+    if not isinstance(payload, list) or payload[:1] != [_signature(keyset)] or len(payload) != len(keyset) + 1:
+        raise InvalidCursor('Cursor does not match this listing')
+    return [_decode_value(column, value) for (column, _descending), value in zip(keyset, payload[1:])]
+
+
+def paginate_by_cursor(query, keyset, cursor=None, limit=DEFAULT_LIMIT):
+    """Seek past `cursor` instead of using OFFSET, and skip the COUNT query.
+
+    `keyset` is a list of (column, descending) pairs whose combination is
+    unique, e.g. [(ServiceTicket.created_at, False), (ServiceTicket.id, False)].
+    One extra row is fetched to find out whether another page exists.
+    """
+    if cursor:
+        query = query.filter(_seek_predicate(keyset, decode_cursor(cursor, keyset)))
+
+    order = [column.desc() if descending else column.asc() for column, descending in keyset]
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(keyset, [getattr(last, column.key) for column, _ in keyset])
+    return CursorPage(rows, next_cursor, limit)
+
+
+def _seek_predicate(keyset, values):
+    """Expand (a, b) > (x, y) so each column may sort in its own direction"""
+    clauses = []
+    for i, (column, descending) in enumerate(keyset):
+        equal_prefix = [keyset[j][0] == values[j] for j in range(i)]
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal_prefix, step))
+    return or_(*clauses)
+
+
+def _signature(keyset):
+    return ','.join(('-' if descending else '') + column.key for column, descending in keyset)
+
+
+def _decode_value(column, value):
+    """Check a cursor value against its column's type before it reaches SQL"""
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        python_type = None
+
+    if python_type is datetime:
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise InvalidCursor('Malformed cursor')
+    if python_type is int:
+        valid = isinstance(value, int) and not isinstance(value, bool)
+    elif python_type is float:
+        valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+    elif python_type is str:
+        valid = isinstance(value, str)
+    else:
+        valid = isinstance(value, (str, int, float)) and not isinstance(value, bool)
+    if not valid:
+        raise InvalidCursor('Malformed cursor')
+    return value
@@ -0,0 +1,46 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing queue is full; the caller should retry later"""
+
+
+class PasswordHasher:
+    """Runs password hashing on a small bounded thread pool.
+
+    hashlib releases the GIL while hashing, so `workers` caps how many cores a
+    login burst can take from the rest of the app. At most `max_queue`
+    requests wait for a worker; beyond that HashingBusy is raised right away
+    instead of tying up another request thread.
+    """
+
+    def __init__(self, method, workers=2, max_queue=16):
+        self.method = method
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        # werkzeug fills in default parameters, so learn the exact prefix
+        # a hash made with `method` carries
+        self._prefix = generate_password_hash('', method).split('$', 1)[0]
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True if the hash was made with another algorithm or cost"""
+        return password_hash.split('$', 1)[0] != self._prefix
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy('Too many password checks in progress')
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
@@ -0,0 +1,227 @@
+import logging
+import math
+import threading
+import time
+from limits.storage import MovingWindowSupport, Storage, storage_from_string
+
+logger = logging.getLogger(__name__)
+
+
+class _Slot:
+    """Per-key local state: the current window and units reserved from it"""
+
+    __slots__ = ('lock', 'window', 'expiry', 'reserved', 'reserved_at', 'previous', 'hits')
+
+    def __init__(self, window, expiry):
+        self.lock = threading.Lock()
+        self.window = window
+        self.expiry = expiry
+        self.reserved = 0
+        self.reserved_at = 0.0
+        self.previous = None
+        self.hits = 0
+
+
+class BatchedStorage(Storage, MovingWindowSupport):
+    """Shared rate-limit counts with locally batched hits.
+
+    Wraps another limits storage (``batched+redis://host`` wraps
+    ``redis://host``) and implements the moving window strategy as a sliding
+    window counter: the previous fixed window's count, weighted by how much
+    of it still overlaps the sliding window, plus the current window's count.
+
+    Hot keys reserve a block of units from the shared counter in one INCRBY
+    and serve the following hits from that block without a round trip.
+    Reserved units already count against the shared limit, so workers can
+    never admit more than the limit between them. The error goes the other
+    way: units a worker holds but has not used are denied to the others until
+    a background timer hands them back, within about `sync_interval` seconds
+    (or at once when the window rolls over). A block is at most a tenth of the
+    limit, so that early denial is bounded by workers x limit / 10 for at most
+    `sync_interval`; limits under 10 and a key's first hit reserve nothing,
+    which keeps small limits exact at one round trip per hit.
+    """
+
+    STORAGE_SCHEME = ['batched+memory', 'batched+redis', 'batched+rediss']
+
+    # Idle keys (one per client address and limit) are dropped past this size
+    MAX_SLOTS = 10000
+
+    # A reserved block never exceeds limit // LIMIT_FRACTION
+    LIMIT_FRACTION = 10
+
+    # Seconds between repeated reports of a failing background sync
+    ERROR_LOG_INTERVAL = 60
+
+    def __init__(self, uri, wrap_exceptions=False, batch_size=10, sync_interval=1.0,
+                 inner=None, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.inner = inner or storage_from_string(uri.split('+', 1)[1], **options)
+        self.batch_size = int(batch_size)
+        self.sync_interval = float(sync_interval)
+        self._slots = {}
+        self._syncer = None
+
+    @property
+    def base_exceptions(self):
+        return self.inner.base_exceptions
+
+    def acquire_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+
+        now = time.time()
+        slot = self._slot(key, expiry)
+        with slot.lock:
+            self._sync_slot(key, slot, now)
+            slot.hits += amount
+
+            if slot.reserved >= amount:
+                slot.reserved -= amount
+                return True
+
+            # Out of local units: top the reservation up with a block sized
+            # to how hot this key has been since the last reservation. A
+            # key's first hit is cold and small limits are never batched
+            block = 0
+            if self.batch_size > 1 and slot.hits > amount:
+                block = min(self.batch_size, slot.hits, limit // self.LIMIT_FRACTION)
+            wanted = amount + block - slot.reserved
+            window_key = self._window_key(key, slot.window)
+            total = self.inner.incr(window_key, expiry * 2, amount=wanted)
+            estimate = self._weighted_previous(key, slot, now, expiry) + total
+            granted = amount + block
+
+            if estimate > limit:
+                over = min(wanted, math.ceil(estimate - limit))
+                granted -= over
+                if granted < amount:
+                    over += granted
+                    granted = 0
+                self.inner.incr(window_key, expiry * 2, amount=-over)
+
+            if granted < amount:
+                slot.reserved = 0
+                return False
+
+            slot.reserved = granted - amount
+            if slot.reserved:
+                slot.reserved_at = now
+                slot.hits = 0
+                self._start_syncer()
+            return True
+
+    def get_moving_window(self, key, limit, expiry):
+        now = time.time()
+        slot = self._slot(key, expiry)
+        with slot.lock:
+            self._sync_slot(key, slot, now)
+            used = self.inner.get(self._window_key(key, slot.window)) - slot.reserved
+            count = math.ceil(self._weighted_previous(key, slot, now, expiry) + used)
+        return slot.window * expiry, min(max(count, 0), limit)
+
+    def sync(self):
+        """Hand every unused local reservation back to the shared counters"""
+        with self.lock:
+            slots = list(self._slots.items())
+        for key, slot in slots:
+            with slot.lock:
+                self._release(key, slot)
+
+    def _start_syncer(self):
+        # Idle workers never touch a key again, so the lazy release in
+        # _sync_slot alone could hold their reservations indefinitely
+        with self.lock:
+            if self._syncer is None:
+                self._syncer = threading.Thread(target=self._sync_loop, name='ratelimit-sync', daemon=True)
+                self._syncer.start()
+
+    def _sync_loop(self):
+        logged_at = None
+        while True:
+            time.sleep(self.sync_interval)
+            try:
+                self._sync_idle()
+            except Exception:
+                # Retried next tick; reported once per interval so an outage does not flood the log
+                now = time.monotonic()
+                if logged_at is None or now - logged_at >= self.ERROR_LOG_INTERVAL:
+                    logger.exception('Rate limit sync failed; reserved units are not being handed back')
+                    logged_at = now
+
+    def _sync_idle(self):
+        """Hand back reservations older than sync_interval"""
+        now = time.time()
+        with self.lock:
+            slots = [(key, slot) for key, slot in self._slots.items() if slot.reserved]
+        for key, slot in slots:
+            with slot.lock:
+                self._sync_slot(key, slot, now)
+
+    def incr(self, key, expiry, elastic_expiry=False, amount=1):
+        return self.inner.incr(key, expiry, elastic_expiry=elastic_expiry, amount=amount)
+
+    def get(self, key):
+        return self.inner.get(key)
+
+    def get_expiry(self, key):
+        return self.inner.get_expiry(key)
+
+    def check(self):
+        return self.inner.check()
+
+    def reset(self):
+        with self.lock:
+            self._slots.clear()
+        return self.inner.reset()
+
+    def clear(self, key):
+        with self.lock:
+            slot = self._slots.pop(key, None)
+        if slot is not None:
+            self.inner.clear(self._window_key(key, slot.window))
+            self.inner.clear(self._window_key(key, slot.window - 1))
+        self.inner.clear(key)
+
+    def _slot(self, key, expiry):
+        # The storage-wide lock only guards the dict; round trips to the
+        # shared store happen under the per-key lock
+        with self.lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                if len(self._slots) >= self.MAX_SLOTS:
+                    self._prune()
+                slot = self._slots[key] = _Slot(int(time.time() // expiry), expiry)
+            return slot
+
+    def _prune(self):
+        now = time.time()
+        for key, slot in list(self._slots.items()):
+            if not slot.reserved and slot.window < int(now // slot.expiry):
+                del self._slots[key]
+
+    def _sync_slot(self, key, slot, now):
+        window = int(now // slot.expiry)
+        if slot.window != window:
+            self._release(key, slot)
+            slot.previous = None
+            slot.window = window
+        elif slot.reserved and now - slot.reserved_at > self.sync_interval:
+            self._release(key, slot)
+
+    def _release(self, key, slot):
+        if slot.reserved:
+            window_key = self._window_key(key, slot.window)
+            self.inner.incr(window_key, slot.expiry * 2, amount=-slot.reserved)
+            slot.reserved = 0
+
+    def _weighted_previous(self, key, slot, now, expiry):
+        # The previous window is closed, so one read per window is enough
+        if slot.previous is None:
+            slot.previous = self.inner.get(self._window_key(key, slot.window - 1))
+        overlap = 1 - (now % expiry) / expiry
+        return slot.previous * overlap
+
+    @staticmethod
+    def _window_key(key, window):
+        return f'{key}/{window}'
@@ -0,0 +1,140 @@
+import heapq
+from datetime import datetime
+from sqlalchemy import and_, bindparam, exists, func, insert, select, update
+from app.models import Mechanic, ServiceTicket, mechanic_service_tickets
+from app.utils.sql import chunked
+
+# Heap key for mechanics that take any ticket, including ones without a specialty
+ANY_SPECIALTY = None
+
+
+def specialty_key(specialty):
+    """Case- and whitespace-insensitive specialty, None when blank"""
+    return (specialty.strip().lower() or None) if specialty else None
+
+
+def _open_ticket_counts(*columns):
+    """SELECT `columns` of every mechanic plus how many open tickets they hold"""
+    open_ticket = and_(
+        ServiceTicket.id == mechanic_service_tickets.c.ticket_id,
+        ServiceTicket.status.not_in(ServiceTicket.CLOSED_STATUSES)
+    )
+    return (
+        select(*columns, func.count(ServiceTicket.id))
+        .outerjoin(mechanic_service_tickets, mechanic_service_tickets.c.mechanic_id == Mechanic.id)
+        .outerjoin(ServiceTicket, open_ticket)
+        .group_by(*columns)
+    )
+
+
+def least_loaded_mechanic(session, specialty=None):
+    """Id of the fitting mechanic with the fewest open tickets, lowest id on ties; None when nobody fits.
+
+    One grouped query with LIMIT 1 for assigning a single ticket; batches
+    should seed MechanicLoads once instead.
+    """
+    query = _open_ticket_counts(Mechanic.id).order_by(func.count(ServiceTicket.id), Mechanic.id).limit(1)
+    key = specialty_key(specialty)
+    if key is not None:
+        query = query.where(func.lower(func.trim(Mechanic.specialty)) == key)
+    return session.scalar(query)
+
+
+class MechanicLoads:
+    """Least-loaded mechanic per specialty, kept in memory for one scheduling run.
+
+    Seeded from one aggregate query counting each mechanic's open tickets.
+    Every mechanic sits in the heap for its specialty and in the catch-all heap
+    used for tickets that do not ask for one. Assigning bumps the mechanic's
+    load and pushes a fresh heap entry; the old entry is skipped lazily when
+    it surfaces, so each pick costs O(log n) with no rescans or queries.
+    """
+
+    def __init__(self, session):
+        rows = session.execute(_open_ticket_counts(Mechanic.id, Mechanic.specialty))
+        self.loads = {}
+        self._heaps = {ANY_SPECIALTY: []}
+        self._memberships = {}
+        for mechanic_id, specialty, load in rows:
+            self.loads[mechanic_id] = load
+            self._memberships[mechanic_id] = {ANY_SPECIALTY, specialty_key(specialty)}
+            for key in self._memberships[mechanic_id]:
+                self._heaps.setdefault(key, []).append((load, mechanic_id))
+        for heap in self._heaps.values():
+            heapq.heapify(heap)
+
+    def pick(self, specialty=None):
+        """Assign one ticket to the least-loaded fitting mechanic; None when nobody fits"""
+        heap = self._heaps.get(specialty_key(specialty))
+        while heap and heap[0][0] != self.loads[heap[0][1]]:
+            heapq.heappop(heap)  # Superseded by a later assignment
+        if not heap:
+            return None
+
+        load, mechanic_id = heap[0]
+        self.loads[mechanic_id] = load + 1
+        for key in self._memberships[mechanic_id]:
+            heapq.heappush(self._heaps[key], (load + 1, mechanic_id))
+        return mechanic_id
+
+
+def pending_tickets(session, limit=None):
+    """(id, user_id, specialty) of open tickets nobody is assigned to, oldest first"""
+    assigned = exists().where(mechanic_service_tickets.c.ticket_id == ServiceTicket.id)
+    query = (
+        select(ServiceTicket.id, ServiceTicket.user_id, ServiceTicket.specialty)
+        .where(~assigned, ServiceTicket.status.not_in(ServiceTicket.CLOSED_STATUSES))
+        .order_by(ServiceTicket.created_at, ServiceTicket.id)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return session.execute(query).all()
+
+
+def schedule(loads, tickets):
+    """Pair (id, user_id, specialty) tickets with mechanics in memory.
+
+    Returns ({ticket_id: mechanic_id}, [unmatched ticket ids]); nothing is
+    written, so the caller decides when to persist with save_assignments().
+    """
+    assignments = {}
+    unmatched = []
+    for ticket_id, _, specialty in tickets:
+        mechanic_id = loads.pick(specialty)
+        if mechanic_id is None:
+            unmatched.append(ticket_id)
+        else:
+            assignments[ticket_id] = mechanic_id
+    return assignments, unmatched
+
+
+def save_assignments(session, assignments, chunk_size=1000):
+    """Write {ticket_id: mechanic_id} for the tickets that are still unassigned.
+
+    Another process may have assigned some of the tickets since they were
+    read; those are skipped rather than given a second mechanic. Touching the
+    tickets first takes their row locks, so a concurrent writer waits and then
+    sees this one's rows. Returns the {ticket_id: mechanic_id} actually saved.
+    """
+    ticket_id, mechanic_id = bindparam('ticket_id'), bindparam('mechanic_id')
+    unassigned = ~exists().where(mechanic_service_tickets.c.ticket_id == ticket_id)
+    assign = insert(mechanic_service_tickets).from_select(
+        ['ticket_id', 'mechanic_id'], select(ticket_id, mechanic_id).where(unassigned)
+    )
+    now = datetime.utcnow()
+    saved = {}
+    for chunk in chunked(list(assignments.items()), chunk_size):
+        ticket_ids = [ticket for ticket, _ in chunk]
+        session.execute(
+            update(ServiceTicket)
+            .where(ServiceTicket.id.in_(ticket_ids))
+            .values(updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        session.execute(assign, [{'ticket_id': ticket, 'mechanic_id': mechanic} for ticket, mechanic in chunk])
+        rows = session.execute(
+            select(mechanic_service_tickets.c.ticket_id, mechanic_service_tickets.c.mechanic_id)
+            .where(mechanic_service_tickets.c.ticket_id.in_(ticket_ids))
+        )
+        saved.update(row for row in rows if assignments[row[0]] == row[1])
+    return saved
@@ -0,0 +1,92 @@
+import re
+from sqlalchemy import DDL, column, event, false, func, literal_column, or_, table
+
+# Postgres column holding the weighted document for a searchable table
+SEARCH_VECTOR = 'search_vector'
+
+
+def attach_search_index(target, columns):
+    """Full-text index the `target` table whenever it is created.
+
+    SQLite gets an external-content FTS5 table `<table>_fts` (porter stemming,
+    so "squealing" finds "squeal") kept in sync by triggers. Postgres gets a
+    generated tsvector column with a GIN index. Both are dropped with the
+    table. Migrations create the same objects for existing databases.
+    """
+    name = target.name
+    fts = f'{name}_fts'
+    document = " || ' ' || ".join(f"coalesce({c}, '')" for c in columns)
+
+    sqlite = [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({', '.join(columns)}, content='{name}', "
+        f"content_rowid='id', tokenize='porter unicode61')",
+        *sqlite_sync_triggers(name, columns),
+    ]
+    postgresql = [
+        f"ALTER TABLE {name} ADD COLUMN {SEARCH_VECTOR} tsvector "
+        f"GENERATED ALWAYS AS (to_tsvector('english', {document})) STORED",
+        f"CREATE INDEX ix_{name}_{SEARCH_VECTOR} ON {name} USING gin ({SEARCH_VECTOR})",
+    ]
+
+    for statement in sqlite:
+        event.listen(target, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+    for statement in postgresql:
+        event.listen(target, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+    event.listen(target, 'after_drop', DDL(f'DROP TABLE IF EXISTS {fts}').execute_if(dialect='sqlite'))
+
+
+def sqlite_sync_triggers(name, columns):
+    """CREATE TRIGGER statements keeping `<name>_fts` in step with table `name`.
+
+    SQLite drops a table's triggers with it, so migrations that rebuild the
+    table (batch mode) run these again and then rebuild the index.
+    """
+    fts = f'{name}_fts'
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f'new.{c}' for c in columns)
+    old_values = ', '.join(f'old.{c}' for c in columns)
+    return [
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {name} BEGIN "
+        f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {column_list} ON {name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+    ]
+
+
+def ranked_search(query, model, terms, columns):
+    """Restrict `query` to rows of `model` matching `terms`, best match first.
+
+    Every word of `terms` must match. Words are quoted before they reach FTS5
+    so user input such as "P0420" or "AC-compressor" is never parsed as query
+    syntax. Dialects without an index fall back to LIKE on `columns`.
+    """
+    words = _words(terms)
+    if not words:
+        return query.filter(false())
+
+    dialect = query.session.get_bind().dialect.name
+    name = model.__table__.name
+    if dialect == 'sqlite':
+        fts = table(f'{name}_fts', column('rowid'))
+        document = literal_column(f'{name}_fts')
+        match = ' '.join(f'"{word}"' for word in words)
+        return (
+            query.join(fts, fts.c.rowid == model.id)
+            .filter(document.op('MATCH')(match))
+            .order_by(func.bm25(document), model.id)
+        )
+    if dialect == 'postgresql':
+        tsquery = func.plainto_tsquery('english', ' '.join(words))
+        vector = literal_column(f'{name}.{SEARCH_VECTOR}')
+        return query.filter(vector.op('@@')(tsquery)).order_by(func.ts_rank(vector, tsquery).desc(), model.id)
+
+    for word in words:
+        query = query.filter(or_(*(getattr(model, c).ilike(f'%{word}%') for c in columns)))
+    return query.order_by(model.id.desc())
+
+
+def _words(terms):
+    return re.findall(r'\w+', terms or '')
@@ -0,0 +1,55 @@
+from sqlalchemy import event, insert
+
+
+def enable_foreign_keys(engine):
+    """Have SQLite enforce foreign keys, and so ON DELETE CASCADE, on every connection"""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragma(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
+
+def dialect_insert(session, table):
+    """INSERT construct for the session's dialect, so ON CONFLICT works"""
+    name = session.get_bind().dialect.name
+    if name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_specific
+    elif name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_specific
+    elif name == 'mysql':
+        from sqlalchemy.dialects.mysql import insert as dialect_specific
+    else:
+        return insert(table)
+    return dialect_specific(table)
+
+
+def upsert(session, table, key, update_columns):
+    """INSERT ... ON CONFLICT (key) DO UPDATE for executemany-style use"""
+    stmt = dialect_insert(session, table)
+    if hasattr(stmt, 'on_conflict_do_update'):
+        return stmt.on_conflict_do_update(
+            index_elements=[key],
+            set_={column: stmt.excluded[column] for column in update_columns}
+        )
+    if hasattr(stmt, 'on_duplicate_key_update'):
+        return stmt.on_duplicate_key_update({column: stmt.inserted[column] for column in update_columns})
+    raise NotImplementedError(f'No upsert support for {session.get_bind().dialect.name}')
+
+
+def insert_ignore(session, table):
+    """INSERT that skips rows colliding with an existing primary or unique key"""
+    stmt = dialect_insert(session, table)
+    if hasattr(stmt, 'on_conflict_do_nothing'):
+        return stmt.on_conflict_do_nothing()
+    if hasattr(stmt, 'on_duplicate_key_update'):
+        return stmt.prefix_with('IGNORE')
+    raise NotImplementedError(f'No insert-ignore support for {session.get_bind().dialect.name}')
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
@@ -0,0 +1,70 @@
+from sqlalchemy import delete, func, insert, select, update
+from app.models import Part, PartReservation
+
+
+class InsufficientStock(Exception):
+    """Raised when a part cannot cover a reservation; `available` is None for unknown parts"""
+
+    def __init__(self, part_id, requested, available):
+        self.part_id = part_id
+        self.requested = requested
+        self.available = available
+        if available is None:
+            message = f'Part {part_id} does not exist'
+        else:
+            message = f'Part {part_id}: requested {requested}, {available} in stock'
+        super().__init__(message)
+
+
+def adjust_stock(session, part_id, delta):
+    """Add `delta` (possibly negative) to a part's quantity in one UPDATE.
+
+    The WHERE clause only matches while the result stays non-negative, so
+    concurrent callers can never oversell: the database serializes the row
+    update and the loser sees rowcount 0 instead of a stale read.
+    """
+    statement = update(Part).where(Part.id == part_id)
+    if delta < 0:
+        statement = statement.where(Part.quantity >= -delta)
+    result = session.execute(
+        statement.values(quantity=Part.quantity + delta).execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        available = session.scalar(select(Part.quantity).where(Part.id == part_id))
+        raise InsufficientStock(part_id, -delta, available)
+
+
+def reserve_parts(session, ticket_id, quantities):
+    """Take `quantities` ({part_id: n}) out of stock for a ticket.
+
+    Parts are decremented in id order so two tickets reserving the same parts
+    always lock rows in the same order. The first shortfall raises and the
+    caller rolls back, which returns anything already taken.
+    """
+    if not quantities:
+        return
+    for part_id, quantity in sorted(quantities.items()):
+        adjust_stock(session, part_id, -quantity)
+    session.execute(insert(PartReservation), [
+        {'ticket_id': ticket_id, 'part_id': part_id, 'quantity': quantity}
+        for part_id, quantity in sorted(quantities.items())
+    ])
+
+
+def release_parts(session, ticket_ids):
+    """Return the parts reserved by `ticket_ids` (a list or a SELECT of ids) to stock and drop the reservations"""
+    if isinstance(ticket_ids, (list, tuple, set)) and not ticket_ids:
+        return
+    held = PartReservation.ticket_id.in_(ticket_ids)
+    reserved = (
+        select(func.sum(PartReservation.quantity))
+        .where(held, PartReservation.part_id == Part.id)
+        .scalar_subquery()
+    )
+    session.execute(
+        update(Part)
+        .where(Part.id.in_(select(PartReservation.part_id).where(held)))
+        .values(quantity=Part.quantity + reserved)
+        .execution_options(synchronize_session=False)
+    )
+    session.execute(delete(PartReservation).where(held))
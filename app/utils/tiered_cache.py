@@ -0,0 +1,255 @@
+import logging
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from flask_caching.backends.base import BaseCache
+from flask_caching.backends.rediscache import RedisCache
+from flask_caching.backends.simplecache import SimpleCache
+
+logger = logging.getLogger(__name__)
+
+CLEAR_ALL = '*'
+
+
+class LocalLRU:
+    """Small bounded in-process cache with a short TTL per entry"""
+
+    def __init__(self, maxsize=1024, timeout=5):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return (found, value); expired entries count as misses"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, timeout=None):
+        # A shared-tier timeout of 0 means "never expires"; locally we still
+        # only trust the value for the short local TTL
+        ttl = self.timeout if not timeout else min(timeout, self.timeout)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class MemoryBus:
+    """Invalidation fan-out between caches living in the same process.
+
+    Stand-in for RedisBus in development and tests: every TieredCache
+    subscribed to the same bus behaves like a separate worker.
+    """
+
+    def __init__(self):
+        self._subscribers = weakref.WeakSet()
+
+    def subscribe(self, tiered):
+        self._subscribers.add(tiered)
+
+    def publish(self, origin, *keys):
+        for tiered in list(self._subscribers):
+            if tiered.origin != origin:
+                for key in keys:
+                    tiered.evict_local(key)
+
+
+class RedisBus:
+    """Invalidation fan-out between workers over Redis pub/sub"""
+
+    def __init__(self, client, channel='cache-invalidate'):
+        self.client = client
+        self.channel = channel
+        self._thread = None
+
+    def subscribe(self, tiered):
+        ref = weakref.ref(tiered)
+
+        def handler(message):
+            target = ref()
+            if target is None:
+                return
+            data = message['data']
+            if isinstance(data, bytes):
+                data = data.decode()
+            origin, _, keys = data.partition(':')
+            if origin != target.origin:
+                for key in keys.split('\n'):
+                    target.evict_local(key)
+
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{self.channel: handler})
+        self._thread = pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def publish(self, origin, *keys):
+        # One message per write, however many keys it touched
+        try:
+            self.client.publish(self.channel, origin + ':' + '\n'.join(keys))
+        except Exception as e:
+            # Peers fall back to their short local TTL
+            logger.warning(f"Cache invalidation publish failed: {str(e)}")
+
+
+class TieredCache(BaseCache):
+    """In-process LRU in front of a shared cache shared by every worker.
+
+    Reads check the local tier first and fill it from the shared tier on a
+    miss. Writes go to both tiers and are broadcast on the bus, so other
+    workers drop their local copy instead of serving it until it expires.
+    """
+
+    def __init__(self, shared, bus, local_maxsize=1024, local_timeout=5, default_timeout=300):
+        super().__init__(default_timeout=default_timeout)
+        self.shared = shared
+        self.local = LocalLRU(maxsize=local_maxsize, timeout=local_timeout)
+        self.bus = bus
+        self.origin = uuid.uuid4().hex
+        self._stats = dict.fromkeys(('local_hits', 'local_misses', 'shared_hits', 'shared_misses'), 0)
+        self._stats_lock = threading.Lock()
+        bus.subscribe(self)
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        """Redis shared tier when CACHE_REDIS_URL is set, in-memory stand-in otherwise"""
+        if config.get('CACHE_REDIS_URL'):
+            shared = RedisCache.factory(app, config, args, dict(kwargs))
+            bus = RedisBus(shared._write_client, channel=f"{config.get('CACHE_KEY_PREFIX') or ''}cache-invalidate")
+        else:
+            shared = SimpleCache.factory(app, config, args, dict(kwargs))
+            bus = MemoryBus()
+
+        return cls(
+            shared,
+            bus,
+            local_maxsize=config.get('CACHE_LOCAL_MAXSIZE', 1024),
+            local_timeout=config.get('CACHE_LOCAL_TIMEOUT', 5),
+            default_timeout=kwargs.get('default_timeout', 300)
+        )
+
+    def stats(self):
+        """Hit/miss counters for each tier"""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def evict_local(self, key):
+        if key == CLEAR_ALL:
+            self.local.clear()
+        else:
+            self.local.delete(key)
+
+    def get(self, key):
+        found, value = self.local.get(key)
+        if found:
+            self._count('local_hits')
+            return value
+        self._count('local_misses')
+
+        value = self.shared.get(key)
+        if value is None:
+            self._count('shared_misses')
+            return None
+        self._count('shared_hits')
+        self.local.set(key, value)
+        return value
+
+    def get_many(self, *keys):
+        values = {}
+        missing = []
+        for key in keys:
+            found, value = self.local.get(key)
+            if found:
+                values[key] = value
+            else:
+                missing.append(key)
+        self._count('local_hits', len(keys) - len(missing))
+        self._count('local_misses', len(missing))
+
+        if missing:
+            for key, value in zip(missing, self.shared.get_many(*missing)):
+                values[key] = value
+                if value is None:
+                    self._count('shared_misses')
+                else:
+                    self._count('shared_hits')
+                    self.local.set(key, value)
+        return [values[key] for key in keys]
+
+    def has(self, key):
+        found, _ = self.local.get(key)
+        return found or self.shared.has(key)
+
+    def set(self, key, value, timeout=None):
+        timeout = self._normalize_timeout(timeout)
+        result = self.shared.set(key, value, timeout=timeout)
+        self.local.set(key, value, timeout)
+        self.bus.publish(self.origin, key)
+        return result
+
+    def add(self, key, value, timeout=None):
+        timeout = self._normalize_timeout(timeout)
+        added = self.shared.add(key, value, timeout=timeout)
+        if added:
+            self.local.set(key, value, timeout)
+        return added
+
+    def set_many(self, mapping, timeout=None):
+        timeout = self._normalize_timeout(timeout)
+        result = self.shared.set_many(mapping, timeout=timeout)
+        for key, value in mapping.items():
+            self.local.set(key, value, timeout)
+        self.bus.publish(self.origin, *mapping)
+        return result
+
+    def delete(self, key):
+        self.local.delete(key)
+        self.bus.publish(self.origin, key)
+        return self.shared.delete(key)
+
+    def delete_many(self, *keys):
+        for key in keys:
+            self.local.delete(key)
+        self.bus.publish(self.origin, *keys)
+        return self.shared.delete_many(*keys)
+
+    def inc(self, key, delta=1):
+        self.local.delete(key)
+        self.bus.publish(self.origin, key)
+        return self.shared.inc(key, delta=delta)
+
+    def dec(self, key, delta=1):
+        self.local.delete(key)
+        self.bus.publish(self.origin, key)
+        return self.shared.dec(key, delta=delta)
+
+    def clear(self):
+        self.local.clear()
+        self.bus.publish(self.origin, CLEAR_ALL)
+        return self.shared.clear()
+
+    def _count(self, name, amount=1):
+        if amount:
+            with self._stats_lock:
+                self._stats[name] += amount
@@ -0,0 +1,102 @@
+from flask import current_app
+from sqlalchemy import func, select, union_all, update
+from app.models import Inventory, Part, PartReservation, ServiceTicket, ticket_parts
+
+
+def _line_amounts(ticket_ids):
+    """(ticket_id, amount) for every attached part and every reserved catalog line"""
+    attached = (
+        select(ticket_parts.c.ticket_id.label('ticket_id'), Inventory.price.label('amount'))
+        .join(Inventory, Inventory.id == ticket_parts.c.part_id)
+        .where(ticket_parts.c.ticket_id.in_(ticket_ids))
+    )
+    reserved = (
+        select(PartReservation.ticket_id.label('ticket_id'),
+               (Part.price * PartReservation.quantity).label('amount'))
+        .join(Part, Part.id == PartReservation.part_id)
+        .where(PartReservation.ticket_id.in_(ticket_ids))
+    )
+    return union_all(attached, reserved).subquery()
+
+
+def ticket_totals(session, ticket_ids):
+    """{ticket_id: total} for `ticket_ids` from one grouped aggregate; 0.0 when nothing is attached"""
+    if not ticket_ids:
+        return {}
+    lines = _line_amounts(ticket_ids)
+    rows = session.execute(
+        select(lines.c.ticket_id, func.sum(lines.c.amount)).group_by(lines.c.ticket_id)
+    )
+    totals = dict.fromkeys(ticket_ids, 0.0)
+    totals.update((ticket_id, float(total)) for ticket_id, total in rows)
+    return totals
+
+
+def totals_materialized():
+    return current_app.config.get('TICKET_TOTALS_MATERIALIZED', False)
+
+
+def total_columns():
+    """Columns list views must load for attach_totals() in the configured mode"""
+    return [ServiceTicket.parts_total] if totals_materialized() else []
+
+
+def attach_totals(session, tickets, schema):
+    """Set `total` on a page of tickets when the schema dumps it.
+
+    Reads the denormalized parts_total column when TICKET_TOTALS_MATERIALIZED
+    is on, otherwise sums the page's lines in one grouped query.
+    """
+    if not tickets or 'total' not in schema.dump_fields:
+        return tickets
+    if totals_materialized():
+        for ticket in tickets:
+            ticket.total = ticket.parts_total
+        return tickets
+    totals = ticket_totals(session, [ticket.id for ticket in tickets])
+    for ticket in tickets:
+        ticket.total = totals[ticket.id]
+    return tickets
+
+
+def refresh_parts_totals(session, ticket_ids):
+    """Recompute parts_total for `ticket_ids` (a list or a SELECT of ids) in one UPDATE.
+
+    Runs whether or not totals are read from the column, so switching
+    TICKET_TOTALS_MATERIALIZED on never serves stale values. The UPDATE also
+    moves updated_at, which keeps ETags honest when a price changes.
+    """
+    attached = (
+        select(func.coalesce(func.sum(Inventory.price), 0))
+        .join(ticket_parts, Inventory.id == ticket_parts.c.part_id)
+        .where(ticket_parts.c.ticket_id == ServiceTicket.id)
+        .scalar_subquery()
+    )
+    reserved = (
+        select(func.coalesce(func.sum(Part.price * PartReservation.quantity), 0))
+        .join(PartReservation, Part.id == PartReservation.part_id)
+        .where(PartReservation.ticket_id == ServiceTicket.id)
+        .scalar_subquery()
+    )
+    session.execute(
+        update(ServiceTicket)
+        .where(ServiceTicket.id.in_(ticket_ids))
+        .values(parts_total=attached + reserved)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def refresh_totals_for_parts(session, part_ids):
+    """Refresh every ticket reserving `part_ids` after their prices changed.
+
+    Returns the affected (ticket_id, user_id) pairs so the caller can expire
+    their cached views once the transaction commits.
+    """
+    affected = session.execute(
+        select(ServiceTicket.id, ServiceTicket.user_id).where(ServiceTicket.id.in_(
+            select(PartReservation.ticket_id).where(PartReservation.part_id.in_(part_ids))
+        ))
+    ).all()
+    if affected:
+        refresh_parts_totals(session, [ticket_id for ticket_id, _ in affected])
+    return affected
@@ -0,0 +1,68 @@
+"""Scheduling time of the assign-pending job (POST /jobs/assign-pending) for a large backlog.
+
+Seeds the shared data set plus a backlog of unassigned tickets into a
+temporary SQLite file, then times each phase of one batch run separately:
+the load and pending-ticket queries, the in-memory heap scheduling, and the
+junction-table writes. The target is well under a second of scheduling for
+10k pending tickets.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_auto_assign --pending 10000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from sqlalchemy import insert
+from app import create_app, db
+from app.models import ServiceTicket
+from app.utils.scheduler import MechanicLoads, pending_tickets, save_assignments, schedule
+from benchmarks.dataset import SPECIALTIES, seed
+
+
+def timed(label, f, *args):
+    start = time.perf_counter()
+    result = f(*args)
+    print(f'  {label:<22} {(time.perf_counter() - start) * 1000:8.1f} ms')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pending', type=int, default=10000, help='unassigned tickets to schedule')
+    parser.add_argument('--mechanics', type=int, default=50, help='mechanics to spread them over')
+    args = parser.parse_args()
+
+    handle, path = tempfile.mkstemp(suffix='.db')
+    os.close(handle)
+    app = create_app('testing', {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+    try:
+        with app.app_context():
+            db.create_all()
+            seed(mechanics=args.mechanics)
+            rng = random.Random(7)
+            # A few tickets ask for a specialty nobody has, so some stay unmatched
+            specialties = SPECIALTIES + (None, 'Paint')
+            db.session.execute(insert(ServiceTicket), [
+                {'title': 'Backlog', 'description': 'Needs a mechanic', 'status': 'pending',
+                 'priority': 'normal', 'specialty': rng.choice(specialties), 'user_id': 1}
+                for _ in range(args.pending)
+            ])
+            db.session.commit()
+
+            print(f'{args.pending} new pending tickets, {args.mechanics} mechanics')
+            loads = timed('seed loads', MechanicLoads, db.session)
+            tickets = timed('pending tickets query', pending_tickets, db.session)
+            assignments, unmatched = timed('schedule (heap)', schedule, loads, tickets)
+            timed('save assignments', save_assignments, db.session, assignments)
+            timed('commit', db.session.commit)
+            print(f'  {len(assignments)} assigned, {len(unmatched)} unmatched, '
+                  f'load spread {min(loads.loads.values())}..{max(loads.loads.values())}')
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Login throughput under a burst, and what it does to other endpoints.
+
+Fires concurrent logins at an in-memory app while another thread keeps
+calling a cheap endpoint, then reports logins/second, how many logins were
+shed with 503, and the latency of the cheap endpoint during the burst.
+
+Run from the repository root, e.g. with production-strength hashing:
+
+    python -m benchmarks.bench_login --method scrypt:32768:8:1 --threads 16
+"""
+import argparse
+import statistics
+import threading
+import time
+from app import create_app, db
+from app.models import User
+from app.utils.passwords import PasswordHasher
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--method', default='scrypt:32768:8:1', help='werkzeug hash method')
+    parser.add_argument('--threads', type=int, default=8, help='concurrent login clients')
+    parser.add_argument('--logins', type=int, default=20, help='logins per client')
+    parser.add_argument('--workers', type=int, default=2, help='PASSWORD_HASH_WORKERS')
+    parser.add_argument('--max-queue', type=int, default=16, help='PASSWORD_HASH_MAX_QUEUE')
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    app.extensions['password_hasher'] = PasswordHasher(
+        args.method, workers=args.workers, max_queue=args.max_queue
+    )
+    with app.app_context():
+        user = User(name='Bench', email='bench@example.com', phone='0')
+        user.set_password('BenchPass123!')
+        db.session.add(user)
+        db.session.commit()
+
+    statuses = []
+    probe_latencies = []
+    done = threading.Event()
+
+    def login_client():
+        client = app.test_client()
+        for _ in range(args.logins):
+            response = client.post('/users/login', json={
+                'email': 'bench@example.com', 'password': 'BenchPass123!'
+            })
+            statuses.append(response.status_code)
+
+    def probe_client():
+        client = app.test_client()
+        while not done.is_set():
+            start = time.perf_counter()
+            client.get('/inventory/1')
+            probe_latencies.append((time.perf_counter() - start) * 1000)
+
+    probe = threading.Thread(target=probe_client)
+    clients = [threading.Thread(target=login_client) for _ in range(args.threads)]
+    start = time.perf_counter()
+    probe.start()
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    probe.join()
+
+    ok = statuses.count(200)
+    print(f'{args.method}, {args.threads} clients, {args.workers} hash workers, queue {args.max_queue}')
+    print(f'  logins:           {ok / elapsed:8.1f} /s ({ok} ok, {statuses.count(503)} shed with 503)')
+    print(f'  other endpoint:   p50 {statistics.median(probe_latencies):6.2f} ms, '
+          f'max {max(probe_latencies):6.2f} ms over {len(probe_latencies)} calls')
+
+
+if __name__ == '__main__':
+    main()
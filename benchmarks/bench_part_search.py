@@ -0,0 +1,63 @@
+"""Typeahead latency of GET /inventory/search on a large parts catalog.
+
+Seeds a catalog into a temporary SQLite file, then times lookups with short
+and long prefixes, by part number and by name. The target is p50 under 5 ms
+for 500k parts.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_part_search --parts 500000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from sqlalchemy import insert
+from app import create_app, db
+from app.models import Part
+from app.utils.sql import chunked
+from benchmarks.dataset import WORDS
+
+PREFIXES = ['b', 'br', 'brake', 'P0', 'P01', 'p012345', 'filter s', 'zzz']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--parts', type=int, default=500000, help='catalog size')
+    parser.add_argument('--repeat', type=int, default=200, help='calls per prefix')
+    args = parser.parse_args()
+
+    handle, path = tempfile.mkstemp(suffix='.db')
+    os.close(handle)
+    app = create_app('testing', {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+    try:
+        with app.app_context():
+            db.create_all()
+            rng = random.Random(42)
+            rows = [
+                {'name': f'{rng.choice(WORDS).title()} {rng.choice(WORDS)} {i}', 'part_number': f'P{i:07}',
+                 'price': round(rng.uniform(5, 500), 2), 'quantity': rng.randint(0, 50)}
+                for i in range(args.parts)
+            ]
+            for chunk in chunked(rows, 50000):
+                db.session.execute(insert(Part), chunk)
+            db.session.commit()
+
+        client = app.test_client()
+        print(f'{args.parts} parts, {args.repeat} calls per prefix')
+        for prefix in PREFIXES:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                response = client.get('/inventory/search', query_string={'prefix': prefix})
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f'  p50 {statistics.median(timings):6.2f} ms  p99 {sorted(timings)[int(len(timings) * .99)]:6.2f} ms'
+                  f'  {len(response.json):2} hits  {prefix!r}')
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
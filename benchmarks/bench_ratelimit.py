@@ -0,0 +1,73 @@
+"""Per-request overhead of the rate-limit storages.
+
+Simulates a remote store by adding a fixed round-trip delay to every call on
+an in-memory storage, then measures the average cost of one limiter hit for:
+
+- memory://             per-process counts (what we had; no round trip, but
+                        every worker enforces its own copy of the limit)
+- naive remote          one shared round trip per hit (batch_size=0)
+- batched remote        BatchedStorage reserving blocks for hot keys
+
+Run from the repository root:
+
+    python -m benchmarks.bench_ratelimit
+"""
+import argparse
+import time
+from limits import parse
+from limits.storage import MemoryStorage
+from limits.strategies import MovingWindowRateLimiter
+from app.utils.ratelimit import BatchedStorage
+
+
+class RemoteStorage:
+    """In-memory storage that pays a network round trip on every call"""
+
+    def __init__(self, rtt):
+        self.store = MemoryStorage()
+        self.base_exceptions = self.store.base_exceptions
+        self.rtt = rtt
+        self.calls = 0
+
+    def incr(self, *args, **kwargs):
+        return self._remote(self.store.incr, *args, **kwargs)
+
+    def get(self, key):
+        return self._remote(self.store.get, key)
+
+    def _remote(self, fn, *args, **kwargs):
+        self.calls += 1
+        time.sleep(self.rtt)
+        return fn(*args, **kwargs)
+
+
+def run(limiter, item, hits, clients):
+    start = time.perf_counter()
+    for i in range(hits):
+        limiter.hit(item, f'client-{i % clients}')
+    return (time.perf_counter() - start) / hits * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hits', type=int, default=2000)
+    parser.add_argument('--clients', type=int, default=5, help='distinct rate-limit keys')
+    parser.add_argument('--rtt-ms', type=float, default=0.5, help='simulated round trip')
+    args = parser.parse_args()
+
+    item = parse('100000 per minute')
+    rtt = args.rtt_ms / 1000
+
+    print(f'{args.hits} hits over {args.clients} keys, simulated RTT {args.rtt_ms} ms')
+    local = MovingWindowRateLimiter(MemoryStorage())
+    print(f'  memory:// (per worker)    {run(local, item, args.hits, args.clients):8.1f} us/hit')
+
+    for label, batch_size in (('naive remote', 0), ('batched remote', 10)):
+        remote = RemoteStorage(rtt)
+        storage = BatchedStorage('batched+memory://', inner=remote, batch_size=batch_size)
+        cost = run(MovingWindowRateLimiter(storage), item, args.hits, args.clients)
+        print(f'  {label:<25} {cost:8.1f} us/hit  ({remote.calls / args.hits:.2f} round trips/hit)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Latency of filtered and sorted ticket listings for a fleet customer.
+
+Seeds benchmarks.dataset into an in-memory database, logs in as the largest
+fleet customer and times GET /service-tickets with each filter and sort,
+in page and cursor mode. Responses are not cached (TestingConfig uses
+NullCache), so every call hits the database.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_ticket_filters --fleet-tickets 20000
+"""
+import argparse
+import statistics
+import time
+from app import create_app, db
+from benchmarks.dataset import BENCH_PASSWORD, seed
+
+URLS = [
+    '/service-tickets?per_page=20',
+    '/service-tickets?limit=20',
+    '/service-tickets?limit=20&status=open',
+    '/service-tickets?limit=20&status=open,pending&sort=-created_at',
+    '/service-tickets?limit=20&priority=urgent&sort=priority',
+    '/service-tickets?limit=20&sort=-priority',
+    '/service-tickets?limit=20&sort=status',
+    '/service-tickets?limit=20&created_after=2024-01-01&created_before=2024-02-01',
+    '/service-tickets?limit=20&mechanic_id=7',
+    '/service-tickets?limit=20&mechanic_id=7&status=closed&sort=-created_at',
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fleet-tickets', type=int, default=5000, help='tickets per fleet customer')
+    parser.add_argument('--repeat', type=int, default=20, help='calls per URL')
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        email = seed(fleet_tickets=args.fleet_tickets)
+
+    client = app.test_client()
+    token = client.post('/users/login', json={'email': email, 'password': BENCH_PASSWORD}).json['token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    print(f'{args.fleet_tickets} tickets for {email}, {args.repeat} calls per URL')
+    for url in URLS:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            response = client.get(url, headers=headers)
+            timings.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200, response.json
+        print(f'  p50 {statistics.median(timings):7.2f} ms  max {max(timings):7.2f} ms  {url}')
+
+
+if __name__ == '__main__':
+    main()
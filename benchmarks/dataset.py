@@ -0,0 +1,83 @@
+"""Shared benchmark data set.
+
+Seeds a realistic skew: most customers have a handful of tickets, a few
+fleet customers have thousands, and tickets carry mechanics and parts so the
+junction tables are populated in both directions. Rows go in through Core
+executemany so seeding 100k tickets takes seconds, not minutes.
+
+Used by the bench_* scripts; call seed() inside an app context.
+"""
+import random
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import insert
+from app import db
+from app.models import Inventory, Mechanic, Part, ServiceTicket, User, mechanic_service_tickets, ticket_parts
+
+BENCH_PASSWORD = 'BenchPass123!'
+STATUSES = ('pending', 'open', 'in_progress', 'closed', 'completed')
+PRIORITIES = ('low', 'normal', 'high', 'urgent')
+SPECIALTIES = ('Brakes', 'Engine', 'Electrical', 'Transmission', 'Tires')
+WORDS = ('brake', 'pad', 'noise', 'engine', 'oil', 'leak', 'battery', 'dead',
+         'tire', 'rotation', 'coolant', 'overheating', 'alignment', 'squeal',
+         'transmission', 'slipping', 'check', 'light', 'filter', 'belt')
+
+
+def seed(users=1000, fleet_users=5, fleet_tickets=5000, tickets_per_user=5,
+         mechanics=50, parts=2000, random_seed=42):
+    """Insert the data set and return the email of the largest fleet customer"""
+    rng = random.Random(random_seed)
+    password_hash = current_app.extensions['password_hasher'].hash(BENCH_PASSWORD)
+
+    db.session.execute(insert(User), [
+        {'name': f'Customer {i}', 'email': f'customer{i}@example.com', 'phone': str(i),
+         'password_hash': password_hash, 'is_admin': i == 0}
+        for i in range(users)
+    ])
+    db.session.execute(insert(Mechanic), [
+        {'name': f'Mechanic {i}', 'specialty': SPECIALTIES[i % len(SPECIALTIES)], 'phone': str(i)}
+        for i in range(mechanics)
+    ])
+    db.session.execute(insert(Inventory), [
+        {'name': f'{rng.choice(WORDS)} {i}', 'price': round(rng.uniform(5, 500), 2)}
+        for i in range(parts)
+    ])
+    db.session.execute(insert(Part), [
+        {'name': f'{rng.choice(WORDS).title()} {i}', 'part_number': f'P{i:06}',
+         'price': round(rng.uniform(5, 500), 2), 'quantity': rng.randint(0, 50)}
+        for i in range(parts)
+    ])
+
+    user_ids = db.session.scalars(db.select(User.id).order_by(User.id)).all()
+    start = datetime(2023, 1, 1)
+    tickets = []
+    for index, user_id in enumerate(user_ids):
+        count = fleet_tickets if index < fleet_users else tickets_per_user
+        for _ in range(count):
+            created = start + timedelta(minutes=rng.randint(0, 60 * 24 * 600))
+            tickets.append({
+                'title': ' '.join(rng.sample(WORDS, 3)),
+                'description': ' '.join(rng.choices(WORDS, k=12)),
+                'status': rng.choice(STATUSES),
+                'priority': rng.choice(PRIORITIES),
+                'user_id': user_id,
+                'created_at': created,
+                'updated_at': created
+            })
+    db.session.execute(insert(ServiceTicket), tickets)
+
+    ticket_ids = db.session.scalars(db.select(ServiceTicket.id)).all()
+    mechanic_ids = db.session.scalars(db.select(Mechanic.id)).all()
+    inventory_ids = db.session.scalars(db.select(Inventory.id)).all()
+    db.session.execute(insert(mechanic_service_tickets), [
+        {'ticket_id': ticket_id, 'mechanic_id': mechanic_id}
+        for ticket_id in ticket_ids
+        for mechanic_id in rng.sample(mechanic_ids, rng.randint(0, 2))
+    ])
+    db.session.execute(insert(ticket_parts), [
+        {'ticket_id': ticket_id, 'part_id': part_id}
+        for ticket_id in ticket_ids
+        for part_id in rng.sample(inventory_ids, rng.randint(0, 3))
+    ])
+    db.session.commit()
+    return 'customer0@example.com'
@@ -9,14 +9,57 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///app.db')
     JWT_SECRET_KEY = 'jwt-secret-key-for-testing'
     
-    # Rate limiting configuration - using memory storage for simplicity
-    RATELIMIT_STORAGE_URL = "memory://"
+    # Rate limiting configuration - sliding window counts shared by every
+    # worker, e.g. RATELIMIT_STORAGE_URI=batched+redis://localhost:6379
+    RATELIMIT_STORAGE_URI = os.getenv('RATELIMIT_STORAGE_URI', 'batched+memory://')
+    RATELIMIT_STORAGE_OPTIONS = {'batch_size': 10, 'sync_interval': 1.0}
+    RATELIMIT_STRATEGY = "moving-window"
     RATELIMIT_DEFAULT = "200 per day"
     RATELIMIT_HEADERS_ENABLED = True
     
-    # Cache configuration
-    CACHE_TYPE = "SimpleCache"
+    # Password hashing - full werkzeug method string including cost, so
+    # hashes made with older settings are recognised and upgraded on login
+    PASSWORD_HASH_METHOD = 'scrypt:32768:8:1'
+    PASSWORD_HASH_WORKERS = 2
+    PASSWORD_HASH_MAX_QUEUE = 16
+
+    # POST /inventory/bulk - rows per request, and rows per upsert statement
+    BULK_MAX_ROWS = 100000
+    BULK_CHUNK_SIZE = 1000
+
+    # POST /mechanics/assignments - pairs per request, all sent as one INSERT
+    ASSIGNMENT_MAX_PAIRS = 10000
+
+    # Read ticket totals from the denormalized service_tickets.parts_total
+    # column instead of summing part prices per page
+    TICKET_TOTALS_MATERIALIZED = os.getenv('TICKET_TOTALS_MATERIALIZED', '').lower() in ('1', 'true')
+
+    # Assign new tickets to the least-loaded fitting mechanic unless the
+    # request says otherwise with "auto_assign": false
+    AUTO_ASSIGN_TICKETS = os.getenv('AUTO_ASSIGN_TICKETS', '').lower() in ('1', 'true')
+
+    # Background jobs - worker threads started by `python manage.py run_jobs`,
+    # or inside the `python app.py` server when JOB_AUTOSTART is on. Never by
+    # create_app, which also backs db_init, migrations and the reloader parent
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+    JOB_AUTOSTART = os.getenv('JOB_AUTOSTART', 'false').lower() in ('1', 'true')
+    JOB_POLL_INTERVAL = 1.0
+    JOB_RETRY_BACKOFF = 5  # Seconds before the first retry, doubled per attempt
+    JOB_STALE_AFTER = 600  # Seconds without progress before a running job is reclaimed
+
+    # Seconds a worker trusts its cached (id, is_admin) for a JWT subject
+    IDENTITY_CACHE_TIMEOUT = 30
+
+    # Part of every cache key; bump it when a response shape changes
+    API_VERSION = 'v1'
+
+    # Cache configuration - per-process LRU in front of a shared tier (Redis
+    # when CACHE_REDIS_URL is set, an in-memory stand-in otherwise)
+    CACHE_TYPE = "app.utils.tiered_cache.TieredCache"
     CACHE_DEFAULT_TIMEOUT = 300
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL')
+    CACHE_LOCAL_MAXSIZE = 1024
+    CACHE_LOCAL_TIMEOUT = 5
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -38,6 +81,7 @@ class TestingConfig(Config):  # Changed from TestConfig to TestingConfig
     JWT_ACCESS_TOKEN_EXPIRES = False
     CACHE_TYPE = 'NullCache'
     RATELIMIT_ENABLED = False
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'  # Fast hashes keep the suite quick
 
 config = {
     'development': DevelopmentConfig,
@@ -1,4 +1,6 @@
+import threading
 from app import create_app, db
+from flask import current_app
 from flask.cli import FlaskGroup
 
 cli = FlaskGroup(create_app=create_app)
@@ -9,5 +11,16 @@ def init_db():
     db.create_all()
     print('Database initialized!')
 
+@cli.command("run_jobs")
+def run_jobs():
+    """Run background job workers until interrupted."""
+    queue = current_app.extensions['job_queue']
+    queue.start()
+    print(f'Running {queue.workers} job workers, Ctrl+C to stop')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        queue.stop()
+
 if __name__ == '__main__':
     cli()
\ No newline at end of file
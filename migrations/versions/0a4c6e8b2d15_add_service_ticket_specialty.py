@@ -0,0 +1,26 @@
+"""Add specialty to service tickets for auto-assignment
+
+Revision ID: 0a4c6e8b2d15
+Revises: f6b2d8e4a913
+Create Date: 2026-10-18 16:05:27.418306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a4c6e8b2d15'
+down_revision = 'f6b2d8e4a913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('service_tickets') as batch_op:
+        batch_op.add_column(sa.Column('specialty', sa.String(length=100), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('service_tickets') as batch_op:
+        batch_op.drop_column('specialty')
@@ -0,0 +1,61 @@
+"""Cascade deletes from users and tickets in the database
+
+Revision ID: 1b5d7f9a3c26
+Revises: 0a4c6e8b2d15
+Create Date: 2026-10-18 17:21:44.906135
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.utils.search import sqlite_sync_triggers
+
+
+# revision identifiers, used by Alembic.
+revision = '1b5d7f9a3c26'
+down_revision = '0a4c6e8b2d15'
+branch_labels = None
+depends_on = None
+
+# (table, column, referred table) for every foreign key that gains ON DELETE CASCADE
+FOREIGN_KEYS = [
+    ('service_tickets', 'user_id', 'users'),
+    ('mechanic_service_tickets', 'mechanic_id', 'mechanics'),
+    ('mechanic_service_tickets', 'ticket_id', 'service_tickets'),
+    ('ticket_parts', 'ticket_id', 'service_tickets'),
+    ('ticket_parts', 'part_id', 'inventory'),
+    ('ticket_part_reservations', 'ticket_id', 'service_tickets'),
+    ('ticket_part_reservations', 'part_id', 'parts'),
+]
+
+# SQLite foreign keys are unnamed; batch mode names them by this convention
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+
+def _replace_foreign_keys(ondelete):
+    inspector = sa.inspect(op.get_bind())
+    for table in dict.fromkeys(table for table, _, _ in FOREIGN_KEYS):
+        existing = {
+            tuple(fk['constrained_columns']): fk['name'] for fk in inspector.get_foreign_keys(table)
+        }
+        # Batch mode recreates the table on SQLite, which cannot ALTER constraints
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            for fk_table, column, referred in FOREIGN_KEYS:
+                if fk_table != table:
+                    continue
+                name = f'fk_{table}_{column}_{referred}'
+                batch_op.drop_constraint(existing.get((column,)) or name, type_='foreignkey')
+                batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete)
+
+    # Rebuilding service_tickets dropped the triggers feeding its FTS5 index
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in sqlite_sync_triggers('service_tickets', ['title', 'description']):
+            op.execute(statement)
+        op.execute("INSERT INTO service_tickets_fts(service_tickets_fts) VALUES ('rebuild')")
+
+
+def upgrade():
+    _replace_foreign_keys('CASCADE')
+
+
+def downgrade():
+    _replace_foreign_keys(None)
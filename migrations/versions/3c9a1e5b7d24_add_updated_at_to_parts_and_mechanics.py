@@ -0,0 +1,31 @@
+"""Add updated_at to parts and mechanics
+
+Revision ID: 3c9a1e5b7d24
+Revises: f1d97dfe7e5d
+Create Date: 2026-10-18 10:12:04.512311
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9a1e5b7d24'
+down_revision = 'f1d97dfe7e5d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Conditional GETs derive validators from max(updated_at); existing rows
+    # start at the migration time so clients revalidate once
+    for table in ('parts', 'mechanics'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.execute(sa.text(f'UPDATE {table} SET updated_at = CURRENT_TIMESTAMP'))
+
+
+def downgrade():
+    for table in ('mechanics', 'parts'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('updated_at')
@@ -0,0 +1,30 @@
+"""Add per-user priority rank index for ?sort=priority
+
+Revision ID: 4d8b2f6a9e17
+Revises: 2c6e8a0b4d37
+Create Date: 2026-10-18 21:14:37.502916
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d8b2f6a9e17'
+down_revision = '2c6e8a0b4d37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Must match ServiceTicket.priority_rank exactly for the planner to use it
+    op.create_index('ix_service_tickets_user_priority_rank', 'service_tickets', [
+        'user_id',
+        sa.text("CASE priority WHEN 'low' THEN 1 WHEN 'normal' THEN 2 WHEN 'high' THEN 3 "
+                "WHEN 'urgent' THEN 4 ELSE 0 END"),
+        'id'
+    ])
+
+
+def downgrade():
+    op.drop_index('ix_service_tickets_user_priority_rank', table_name='service_tickets')
@@ -0,0 +1,35 @@
+"""Add ticket and junction table indexes
+
+Revision ID: 8e2f4a6c1b90
+Revises: 3c9a1e5b7d24
+Create Date: 2026-10-18 11:03:47.208915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e2f4a6c1b90'
+down_revision = '3c9a1e5b7d24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_service_tickets_user_created', 'service_tickets', ['user_id', 'created_at', 'id'])
+    op.create_index('ix_service_tickets_status_created', 'service_tickets', ['status', 'created_at'])
+    op.create_index('ix_service_tickets_priority_created', 'service_tickets', ['priority', 'created_at'])
+    op.create_index('ix_service_tickets_created_at', 'service_tickets', ['created_at'])
+    # Reverse direction of the composite primary keys
+    op.create_index('ix_mechanic_service_tickets_ticket_mechanic', 'mechanic_service_tickets', ['ticket_id', 'mechanic_id'])
+    op.create_index('ix_ticket_parts_part_ticket', 'ticket_parts', ['part_id', 'ticket_id'])
+
+
+def downgrade():
+    op.drop_index('ix_ticket_parts_part_ticket', table_name='ticket_parts')
+    op.drop_index('ix_mechanic_service_tickets_ticket_mechanic', table_name='mechanic_service_tickets')
+    op.drop_index('ix_service_tickets_created_at', table_name='service_tickets')
+    op.drop_index('ix_service_tickets_priority_created', table_name='service_tickets')
+    op.drop_index('ix_service_tickets_status_created', table_name='service_tickets')
+    op.drop_index('ix_service_tickets_user_created', table_name='service_tickets')
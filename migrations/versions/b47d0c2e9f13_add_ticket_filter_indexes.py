@@ -0,0 +1,27 @@
+"""Add per-user status and priority ticket indexes
+
+Revision ID: b47d0c2e9f13
+Revises: 8e2f4a6c1b90
+Create Date: 2026-10-18 11:48:20.930144
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b47d0c2e9f13'
+down_revision = '8e2f4a6c1b90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ?status= / ?priority= filters and sorts within one user's tickets
+    op.create_index('ix_service_tickets_user_status', 'service_tickets', ['user_id', 'status', 'id'])
+    op.create_index('ix_service_tickets_user_priority', 'service_tickets', ['user_id', 'priority', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_service_tickets_user_priority', table_name='service_tickets')
+    op.drop_index('ix_service_tickets_user_status', table_name='service_tickets')
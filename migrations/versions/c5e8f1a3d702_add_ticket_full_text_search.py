@@ -0,0 +1,62 @@
+"""Add full-text search index for service tickets
+
+Revision ID: c5e8f1a3d702
+Revises: b47d0c2e9f13
+Create Date: 2026-10-18 12:31:55.604127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e8f1a3d702'
+down_revision = 'b47d0c2e9f13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE service_tickets_fts USING fts5(title, description, "
+            "content='service_tickets', content_rowid='id', tokenize='porter unicode61')"
+        )
+        op.execute(
+            "CREATE TRIGGER service_tickets_fts_ai AFTER INSERT ON service_tickets BEGIN "
+            "INSERT INTO service_tickets_fts(rowid, title, description) "
+            "VALUES (new.id, new.title, new.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER service_tickets_fts_ad AFTER DELETE ON service_tickets BEGIN "
+            "INSERT INTO service_tickets_fts(service_tickets_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER service_tickets_fts_au AFTER UPDATE OF title, description ON service_tickets BEGIN "
+            "INSERT INTO service_tickets_fts(service_tickets_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); "
+            "INSERT INTO service_tickets_fts(rowid, title, description) "
+            "VALUES (new.id, new.title, new.description); END"
+        )
+        # Index the tickets that already exist
+        op.execute("INSERT INTO service_tickets_fts(service_tickets_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.execute(
+            "ALTER TABLE service_tickets ADD COLUMN search_vector tsvector GENERATED ALWAYS AS "
+            "(to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))) STORED"
+        )
+        op.create_index('ix_service_tickets_search_vector', 'service_tickets', ['search_vector'],
+                        postgresql_using='gin')
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for trigger in ('service_tickets_fts_au', 'service_tickets_fts_ad', 'service_tickets_fts_ai'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS service_tickets_fts')
+    elif dialect == 'postgresql':
+        op.drop_index('ix_service_tickets_search_vector', table_name='service_tickets')
+        op.drop_column('service_tickets', 'search_vector')
@@ -0,0 +1,26 @@
+"""Add lower() indexes for part prefix search
+
+Revision ID: d91b3f7a2c58
+Revises: c5e8f1a3d702
+Create Date: 2026-10-18 13:05:12.118407
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd91b3f7a2c58'
+down_revision = 'c5e8f1a3d702'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_parts_lower_name', 'parts', [sa.text('lower(name)')])
+    op.create_index('ix_parts_lower_part_number', 'parts', [sa.text('lower(part_number)')])
+
+
+def downgrade():
+    op.drop_index('ix_parts_lower_part_number', table_name='parts')
+    op.drop_index('ix_parts_lower_name', table_name='parts')
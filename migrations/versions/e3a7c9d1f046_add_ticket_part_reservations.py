@@ -0,0 +1,33 @@
+"""Add ticket part reservations
+
+Revision ID: e3a7c9d1f046
+Revises: d91b3f7a2c58
+Create Date: 2026-10-18 13:52:38.774310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a7c9d1f046'
+down_revision = 'd91b3f7a2c58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ticket_part_reservations',
+    sa.Column('ticket_id', sa.Integer(), nullable=False),
+    sa.Column('part_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['part_id'], ['parts.id'], ),
+    sa.ForeignKeyConstraint(['ticket_id'], ['service_tickets.id'], ),
+    sa.PrimaryKeyConstraint('ticket_id', 'part_id')
+    )
+    op.create_index('ix_ticket_part_reservations_part_id', 'ticket_part_reservations', ['part_id'])
+
+
+def downgrade():
+    op.drop_index('ix_ticket_part_reservations_part_id', table_name='ticket_part_reservations')
+    op.drop_table('ticket_part_reservations')
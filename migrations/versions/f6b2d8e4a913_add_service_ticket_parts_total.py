@@ -0,0 +1,35 @@
+"""Add materialized parts_total to service tickets
+
+Revision ID: f6b2d8e4a913
+Revises: e3a7c9d1f046
+Create Date: 2026-10-18 14:40:09.352871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6b2d8e4a913'
+down_revision = 'e3a7c9d1f046'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('service_tickets') as batch_op:
+        batch_op.add_column(sa.Column('parts_total', sa.Float(), nullable=False, server_default='0'))
+    op.execute(
+        "UPDATE service_tickets SET parts_total = "
+        "coalesce((SELECT sum(inventory.price) FROM ticket_parts "
+        "JOIN inventory ON inventory.id = ticket_parts.part_id "
+        "WHERE ticket_parts.ticket_id = service_tickets.id), 0) + "
+        "coalesce((SELECT sum(parts.price * ticket_part_reservations.quantity) FROM ticket_part_reservations "
+        "JOIN parts ON parts.id = ticket_part_reservations.part_id "
+        "WHERE ticket_part_reservations.ticket_id = service_tickets.id), 0)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('service_tickets') as batch_op:
+        batch_op.drop_column('parts_total')
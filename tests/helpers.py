@@ -0,0 +1,22 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from app import db
+
+
+@contextmanager
+def record_statements(parameters=False):
+    """Collect the SQL run on db.engine inside the block.
+
+    Yields a list that fills with statements, or (statement, parameters)
+    pairs when `parameters` is set.
+    """
+    recorded = []
+
+    def record(conn, cursor, statement, bound, *args):
+        recorded.append((statement, bound) if parameters else statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield recorded
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
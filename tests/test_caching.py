@@ -0,0 +1,92 @@
+import os
+import subprocess
+import sys
+import unittest
+from flask import request
+from flask_caching.backends.simplecache import SimpleCache
+from app import create_app
+from app.utils.caching import build_cache_key
+from app.utils.tiered_cache import MemoryBus, TieredCache
+
+class TestTieredCache(unittest.TestCase):
+    def setUp(self):
+        """Two 'workers' sharing one backend and one invalidation bus"""
+        self.shared = SimpleCache()
+        self.bus = MemoryBus()
+        self.worker_a = TieredCache(self.shared, self.bus, local_maxsize=2)
+        self.worker_b = TieredCache(self.shared, self.bus, local_maxsize=2)
+
+    def test_shared_tier_fills_local_tier(self):
+        """Test a value written by one worker is served locally by the other"""
+        self.worker_a.set('key', 'value')
+
+        self.assertEqual(self.worker_b.get('key'), 'value')
+        self.assertEqual(self.worker_b.get('key'), 'value')
+        self.assertEqual(self.worker_b.stats(), {
+            'local_hits': 1,
+            'local_misses': 1,
+            'shared_hits': 1,
+            'shared_misses': 0
+        })
+
+    def test_write_invalidates_other_workers(self):
+        """Test a write drops stale local copies in every other worker"""
+        self.worker_a.set('key', 'old')
+        self.assertEqual(self.worker_b.get('key'), 'old')
+
+        self.worker_a.set('key', 'new')
+        self.assertEqual(self.worker_b.get('key'), 'new')
+
+        self.worker_a.delete('key')
+        self.assertIsNone(self.worker_b.get('key'))
+        self.assertEqual(self.worker_b.stats()['shared_misses'], 1)
+
+    def test_local_tier_is_bounded(self):
+        """Test the local LRU evicts its least recently used entry"""
+        self.worker_a.set_many({'a': 1, 'b': 2})
+        self.worker_a.get('a')
+        self.worker_a.set('c', 3)
+
+        self.assertEqual(len(self.worker_a.local), 2)
+        self.assertEqual(self.worker_a.get_many('a', 'b', 'c'), [1, 2, 3])
+        self.assertEqual(self.worker_a.stats()['shared_hits'], 1)
+
+
+class TestCacheKeys(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('testing')
+
+    def key_for(self, url, identity='1'):
+        with self.app.test_request_context(url):
+            return build_cache_key('view:test', identity=identity, args=request.args)
+
+    def test_key_ignores_argument_order(self):
+        """Test equivalent query strings produce the same key"""
+        self.assertEqual(self.key_for('/x?page=2&per_page=5'), self.key_for('/x?per_page=5&page=2'))
+
+    def test_key_is_stable_across_processes(self):
+        """Test the key does not depend on Python's per-process hash seed"""
+        code = (
+            "from flask import request\n"
+            "from app import create_app\n"
+            "from app.utils.caching import build_cache_key\n"
+            "app = create_app('testing')\n"
+            "with app.test_request_context('/x?b=2&a=1'):\n"
+            "    print(build_cache_key('view:test', identity='1', args=request.args))\n"
+        )
+        keys = {
+            subprocess.run(
+                [sys.executable, '-c', code],
+                env=dict(os.environ, PYTHONHASHSEED=seed),
+                capture_output=True, text=True, check=True
+            ).stdout.strip()
+            for seed in ('1', '2')
+        }
+        self.assertEqual(keys, {self.key_for('/x?a=1&b=2')})
+
+    def test_key_varies_on_identity_and_api_version(self):
+        """Test identity and API version are part of the key"""
+        self.assertNotEqual(self.key_for('/x', identity='1'), self.key_for('/x', identity='2'))
+        base = self.key_for('/x')
+        self.app.config['API_VERSION'] = 'v2'
+        self.assertNotEqual(base, self.key_for('/x'))
@@ -1,8 +1,12 @@
+import json
 import unittest
 import warnings
+from datetime import datetime, timedelta, timezone
 from sqlalchemy import select
+from werkzeug.http import http_date
 from app import create_app, db
 from app.models import User, Part
+from app.components.blueprints.inventory.routes import _prefix_upper_bound
 
 # Filter out SQLAlchemy warnings
 warnings.filterwarnings('ignore', category=Warning)
@@ -175,4 +179,204 @@ class TestInventoryRoutes(unittest.TestCase):
         
         # Verify part is deleted
         get_response = self.client.get(f'/inventory/{part_id}')  # Updated endpoint
-        self.assertEqual(get_response.status_code, 404)
\ No newline at end of file
+        self.assertEqual(get_response.status_code, 404)
+
+    def test_get_inventory_cursor_pagination(self):
+        """Test keyset pagination over the parts catalog"""
+        for i in range(3):
+            db.session.add(Part(name=f'Part {i}', part_number=f'CP{i:03}', price=1.0, quantity=1))
+        db.session.commit()
+
+        first = self.client.get('/inventory?limit=2')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(len(first.json['items']), 2)
+        self.assertTrue(first.json['has_next'])
+
+        second = self.client.get(f"/inventory?limit=2&cursor={first.json['next_cursor']}")
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual([p['part_number'] for p in second.json['items']], ['CP002'])
+        self.assertIsNone(second.json['next_cursor'])
+
+
+    def login_admin(self):
+        response = self.client.post('/users/login', json={
+            'email': self.admin_data['email'],
+            'password': self.admin_data['password']
+        })
+        return {'Authorization': f"Bearer {response.json['token']}"}
+
+    def test_bulk_upsert_parts(self):
+        """Test bulk create/update with per-row errors"""
+        headers = self.login_admin()
+        self.client.post('/inventory', json=self.part_data, headers=headers)
+
+        rows = [
+            {'name': 'Renamed', 'part_number': 'TP001', 'price': 5, 'quantity': 1},
+            {'name': 'Filter', 'part_number': 'TP002', 'price': 7.5, 'quantity': 3},
+            {'name': 'Broken', 'part_number': 'TP003', 'price': 'abc'},
+            {'name': 'N' * 101, 'part_number': 'P' * 51, 'price': 1, 'quantity': 1},
+        ]
+        response = self.client.post('/inventory/bulk', json=rows, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['created'], 1)
+        self.assertEqual(response.json['updated'], 1)
+        self.assertEqual([e['index'] for e in response.json['errors']], [2, 3])
+        self.assertIn('quantity', response.json['errors'][0]['errors'])
+        self.assertEqual(response.json['errors'][1]['errors'], {
+            'name': 'At most 100 characters', 'part_number': 'At most 50 characters'
+        })
+
+        parts = {p.part_number: p for p in Part.query.all()}
+        self.assertEqual(parts['TP001'].name, 'Renamed')
+        self.assertEqual(parts['TP002'].quantity, 3)
+        self.assertNotIn('TP003', parts)
+
+    def test_bulk_upsert_ndjson(self):
+        """Test NDJSON bodies load in chunks and report bad lines"""
+        headers = self.login_admin()
+        self.app.config['BULK_CHUNK_SIZE'] = 100
+        lines = [
+            '{"name": "Part %d", "part_number": "NP%05d", "price": 1, "quantity": 1}' % (i, i)
+            for i in range(1000)
+        ]
+        lines.insert(10, '{not json')
+        response = self.client.post(
+            '/inventory/bulk',
+            data='\n'.join(lines),
+            content_type='application/x-ndjson',
+            headers=headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['created'], 1000)
+        self.assertEqual([e['index'] for e in response.json['errors']], [10])
+        self.assertEqual(Part.query.count(), 1000)
+
+
+    def test_stream_inventory_export(self):
+        """Test NDJSON and CSV exports of the whole catalog"""
+        for i in range(3):
+            db.session.add(Part(name=f'Part {i}', part_number=f'SP{i:03}', price=2, quantity=i))
+        db.session.commit()
+
+        response = self.client.get('/inventory', headers={'Accept': 'application/x-ndjson'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([p['part_number'] for p in lines], ['SP000', 'SP001', 'SP002'])
+        self.assertEqual(lines[0]['price'], 2.0)
+
+        response = self.client.get('/inventory?format=csv')
+        self.assertEqual(response.mimetype, 'text/csv')
+        rows = response.get_data(as_text=True).splitlines()
+        self.assertEqual(rows[0], 'id,name,part_number,price,quantity')
+        self.assertEqual(len(rows), 4)
+
+        # Default listing is still a plain JSON array
+        self.assertIsInstance(self.client.get('/inventory').json, list)
+
+    def test_part_sparse_fieldset(self):
+        """Test ?fields[part]= on part listings and detail"""
+        part = Part(name='Filter', part_number='FL001', price=5, quantity=1)
+        db.session.add(part)
+        db.session.commit()
+
+        response = self.client.get('/inventory?fields[part]=id,name')
+        self.assertEqual(response.json, [{'id': part.id, 'name': 'Filter'}])
+        response = self.client.get(f'/inventory/{part.id}?fields[part]=price')
+        self.assertEqual(response.json, {'price': 5.0})
+        response = self.client.get(f'/inventory/{part.id}?fields[part]=cost')
+        self.assertEqual(response.status_code, 400)
+
+    def test_conditional_get_on_parts(self):
+        """Test ETag revalidation of part listings"""
+        part = Part(name='Belt', part_number='BT001', price=7, quantity=3)
+        db.session.add(part)
+        db.session.commit()
+
+        response = self.client.get('/inventory')
+        etag = response.headers['ETag']
+        self.assertNotIn('Last-Modified', response.headers)
+        self.assertEqual(self.client.get('/inventory', headers={'If-None-Match': etag}).status_code, 304)
+        # Validators are per query string
+        self.assertEqual(
+            self.client.get('/inventory?fields[part]=id', headers={'If-None-Match': etag}).status_code, 200
+        )
+
+        part.quantity = 2
+        db.session.commit()
+        response = self.client.get('/inventory', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json[0]['quantity'], 2)
+
+    def test_delete_then_revalidate_parts(self):
+        """Test revalidating a listing after a delete returns the new list"""
+        old = datetime.utcnow() - timedelta(minutes=5)
+        parts = [Part(name=name, part_number=name, price=1, quantity=1, updated_at=old) for name in ('A', 'B')]
+        db.session.add_all(parts)
+        db.session.commit()
+
+        etag = self.client.get('/inventory').headers['ETag']
+        db.session.delete(parts[0])
+        db.session.commit()
+
+        response = self.client.get('/inventory', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['name'] for p in response.json], ['B'])
+        # The surviving part is still the newest, so a date cannot see the delete
+        response = self.client.get('/inventory', headers={'If-Modified-Since': http_date(datetime.now(timezone.utc))})
+        self.assertEqual(response.status_code, 200)
+
+    def test_last_modified_on_part(self):
+        """Test If-Modified-Since on a single part, withheld while its second is current"""
+        part = Part(name='Belt', part_number='BT001', price=7, quantity=3)
+        db.session.add(part)
+        db.session.commit()
+        url = f'/inventory/{part.id}'
+        self.assertNotIn('Last-Modified', self.client.get(url).headers)
+
+        part.updated_at = datetime.utcnow() - timedelta(minutes=5)
+        db.session.commit()
+        response = self.client.get(url)
+        last_modified = response.headers['Last-Modified']
+        self.assertEqual(self.client.get(url, headers={'If-Modified-Since': last_modified}).status_code, 304)
+        # If-None-Match decides alone when both are sent
+        response = self.client.get(url, headers={'If-None-Match': 'W/"stale"', 'If-Modified-Since': last_modified})
+        self.assertEqual(response.status_code, 200)
+
+        part.quantity = 2
+        db.session.commit()
+        self.assertEqual(self.client.get(url, headers={'If-Modified-Since': last_modified}).status_code, 200)
+
+    def test_part_prefix_search(self):
+        """Test typeahead matches part numbers and names case-insensitively"""
+        for name, number in (('Brake Pad', 'BP-100'), ('brake rotor', 'BR-200'),
+                             ('Battery', 'BT-300'), ('Air Filter', 'AF-400')):
+            db.session.add(Part(name=name, part_number=number, price=1, quantity=1))
+        db.session.commit()
+
+        def names(query):
+            response = self.client.get(f'/inventory/search?{query}')
+            self.assertEqual(response.status_code, 200)
+            return [p['name'] for p in response.json]
+
+        self.assertEqual(names('prefix=BRA'), ['Brake Pad', 'brake rotor'])
+        self.assertEqual(names('prefix=bt-'), ['Battery'])
+        self.assertEqual(names('prefix=b&limit=2'), ['Brake Pad', 'brake rotor'])
+        self.assertEqual(names('prefix=zz'), [])
+        self.assertEqual(self.client.get('/inventory/search').status_code, 400)
+
+    def test_part_prefix_search_non_ascii(self):
+        """Test non-ASCII prefixes are refused where lower() cannot fold them, never scanned"""
+        db.session.add(Part(name='Écrou', part_number='EC-1', price=1, quantity=1))
+        db.session.commit()
+        for prefix in ('é', 'ÉCR', '\U0010ffff'):
+            response = self.client.get('/inventory/search', query_string={'prefix': prefix})
+            self.assertEqual(response.status_code, 400)
+
+    def test_prefix_upper_bound(self):
+        """Test the range end past the last code point and around surrogates"""
+        self.assertEqual(_prefix_upper_bound('abc'), 'abd')
+        self.assertEqual(_prefix_upper_bound('é'), 'ê')
+        self.assertEqual(_prefix_upper_bound('a\U0010ffff'), 'b')
+        self.assertIsNone(_prefix_upper_bound('\U0010ffff\U0010ffff'))
+        self.assertEqual(_prefix_upper_bound('\ud7ff'), '\ue000')
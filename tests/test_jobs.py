@@ -0,0 +1,183 @@
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import func, insert, select
+from app import create_app, db
+from app.models import Job, Mechanic, ServiceTicket, User, mechanic_service_tickets
+from app.utils.jobs import HANDLERS, enqueue, job
+
+attempts = []
+
+def flaky(progress, fail_times):
+    """Reports a quarter done, then fails until it has been tried `fail_times` times"""
+    attempts.append(1)
+    progress(1, 4)
+    if len(attempts) <= fail_times:
+        raise RuntimeError('try again')
+    return {'attempt': len(attempts)}
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.queue = self.app.extensions['job_queue']
+        self.queue.retry_backoff = 0
+        attempts.clear()
+        job('test-flaky', max_attempts=2)(flaky)
+
+        for email, is_admin in (('admin@example.com', True), ('customer@example.com', False)):
+            user = User(name=email, email=email, phone='1', is_admin=is_admin)
+            user.set_password('TestPass123!')
+            db.session.add(user)
+        db.session.commit()
+        self.admin, self.customer = (
+            {'Authorization': 'Bearer ' + self.client.post('/users/login', json={
+                'email': email, 'password': 'TestPass123!'
+            }).json['token']}
+            for email in ('admin@example.com', 'customer@example.com')
+        )
+
+    def tearDown(self):
+        HANDLERS.pop('test-flaky', None)
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_enqueue_returns_202_and_status(self):
+        """Test a queued job is reported, run and visible only to its owner and admins"""
+        self.client.post('/service-tickets', headers=self.customer, json={'title': 'A', 'description': 'B'})
+        response = self.client.post('/jobs/ticket-report', headers=self.customer)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json['job']['status'], 'queued')
+        status_url = response.headers['Location']
+        self.assertEqual(status_url, response.json['status_url'])
+
+        self.assertTrue(self.queue.run_next())
+        self.assertFalse(self.queue.run_next())
+
+        response = self.client.get(status_url, headers=self.customer)
+        self.assertEqual(response.json['status'], 'succeeded')
+        self.assertEqual(response.json['progress'], 100)
+        self.assertEqual(response.json['result']['tickets'], 1)
+        self.assertEqual(response.json['result']['by_status'], {'pending': 1})
+        self.assertEqual(self.client.get(status_url, headers=self.admin).status_code, 200)
+
+        response = self.client.post('/jobs/ticket-report', headers=self.admin)
+        self.assertEqual(self.client.get(response.headers['Location'], headers=self.customer).status_code, 403)
+        self.assertEqual(self.client.get('/jobs/999', headers=self.customer).status_code, 404)
+        self.assertEqual(self.client.post('/jobs/assign-pending', headers=self.customer).status_code, 403)
+
+    def test_ticket_report_reports_progress(self):
+        """Test the report heartbeats before its aggregate and reports each group"""
+        for status in ('pending', 'closed'):
+            self.client.post('/service-tickets', headers=self.customer,
+                             json={'title': 'A', 'description': 'B', 'status': status})
+        reported = []
+        result = HANDLERS['ticket-report'].handler(lambda done, total=None: reported.append((done, total)))
+        self.assertEqual(reported, [(0, None), (1, 2), (2, 2)])
+        self.assertEqual(result['tickets'], 2)
+
+    def test_retries_then_fails(self):
+        """Test a failing job is retried up to max_attempts with its progress kept"""
+        succeeding = enqueue('test-flaky', {'fail_times': 1}).id
+        self.assertTrue(self.queue.run_next())
+        retried = db.session.get(Job, succeeding)
+        db.session.refresh(retried)
+        self.assertEqual((retried.status, retried.attempts, retried.progress), ('queued', 1, 25))
+        self.assertIn('try again', retried.error)
+        self.assertTrue(self.queue.run_next())
+        db.session.refresh(retried)
+        self.assertEqual((retried.status, retried.attempts, retried.error), ('succeeded', 2, None))
+
+        attempts.clear()
+        failing = enqueue('test-flaky', {'fail_times': 5}).id
+        while self.queue.run_next():
+            pass
+        failed = db.session.get(Job, failing)
+        db.session.refresh(failed)
+        self.assertEqual((failed.status, failed.attempts), ('failed', 2))
+        self.assertIsNotNone(failed.finished_at)
+
+    def test_stale_jobs_are_reclaimed_or_failed(self):
+        """Test a job abandoned mid-run is retried, or failed once out of attempts"""
+        abandoned = datetime.utcnow() - timedelta(seconds=self.queue.stale_after + 1)
+        retried, exhausted = (
+            Job(kind='test-flaky', payload='{"fail_times": 0}', status='running', attempts=attempts_made,
+                max_attempts=2, started_at=abandoned, updated_at=abandoned)
+            for attempts_made in (1, 2)
+        )
+        db.session.add_all([retried, exhausted])
+        db.session.commit()
+
+        self.assertTrue(self.queue.run_next())
+        self.assertFalse(self.queue.run_next())
+        db.session.refresh(retried)
+        db.session.refresh(exhausted)
+        self.assertEqual((retried.status, retried.attempts), ('succeeded', 2))
+        self.assertEqual((exhausted.status, exhausted.attempts), ('failed', 2))
+        self.assertIn('last attempt', exhausted.error)
+        self.assertIsNotNone(exhausted.finished_at)
+
+    def test_create_app_never_starts_workers(self):
+        """Test building the app (db_init, migrations, reloader parent) leaves workers to the server process"""
+        app = create_app('testing', {'JOB_AUTOSTART': True})
+        self.assertEqual(app.extensions['job_queue']._threads, [])
+
+
+class TestJobWorkers(unittest.TestCase):
+    def setUp(self):
+        """Use a database file so worker threads get their own connections"""
+        handle, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        self.app = create_app('testing', {
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{self.path}', 'JOB_POLL_INTERVAL': 0.05
+        })
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        admin = User(name='Admin', email='admin@example.com', phone='1', is_admin=True)
+        admin.set_password('TestPass123!')
+        db.session.add_all([admin] + [Mechanic(name=f'M{i}', specialty='', phone='1') for i in range(3)])
+        db.session.commit()
+        db.session.execute(insert(ServiceTicket), [
+            {'title': 'T', 'description': 'D', 'status': 'pending', 'priority': 'normal', 'user_id': admin.id}
+            for _ in range(2500)
+        ])
+        db.session.commit()
+        token = self.client.post('/users/login', json={
+            'email': 'admin@example.com', 'password': 'TestPass123!'
+        }).json['token']
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    def tearDown(self):
+        self.app.extensions['job_queue'].stop(timeout=5)
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+        self.app_context.pop()
+        os.remove(self.path)
+
+    def test_worker_pool_runs_queued_jobs(self):
+        """Test started workers pick up a job and finish it in the background"""
+        self.app.extensions['job_queue'].start()
+        status_url = self.client.post('/jobs/assign-pending', headers=self.headers).headers['Location']
+
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            status = self.client.get(status_url, headers=self.headers).json
+            if status['status'] in ('succeeded', 'failed'):
+                break
+            time.sleep(0.05)
+        self.assertEqual(status['status'], 'succeeded', status)
+        self.assertEqual(status['result']['assigned'], 2500)
+        self.assertEqual(sorted(status['result']['by_mechanic'].values()), [833, 833, 834])
+        count = db.session.scalar(select(func.count()).select_from(mechanic_service_tickets))
+        self.assertEqual(count, 2500)
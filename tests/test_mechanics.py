@@ -148,4 +148,131 @@ class TestMechanicRoutes(unittest.TestCase):
             headers={'Authorization': f'Bearer {token}'}
         )
         self.assertEqual(get_response.status_code, 200)
-        self.assertIn(ticket_id, [t for t in get_response.json.get('tickets', [])])
\ No newline at end of file
+        self.assertIn(ticket_id, [t for t in get_response.json.get('tickets', [])])
+
+    def test_bulk_assignments(self):
+        """Test many pairs go in at once, existing pairs are skipped and unknown ids reject the batch"""
+        token = self.client.post('/users/login', json=self.admin_data).json['token']
+        headers = {'Authorization': f'Bearer {token}'}
+        mechanic_ids = [
+            self.client.post('/mechanics', json={**self.mechanic_data, 'name': f'M{i}'}, headers=headers).json['id']
+            for i in range(2)
+        ]
+        ticket_ids = [
+            self.client.post('/service-tickets', json={'title': 'T', 'description': 'D'}, headers=headers).json['id']
+            for _ in range(3)
+        ]
+        self.client.post(f'/mechanics/{mechanic_ids[0]}/tickets/{ticket_ids[0]}', headers=headers)
+
+        pairs = [{'mechanic_id': m, 'ticket_id': t} for m in mechanic_ids for t in ticket_ids]
+        response = self.client.post('/mechanics/assignments', json={'assignments': pairs + pairs[:1]}, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {'requested': 6, 'created': 5, 'existing': 1})
+        self.assertEqual(len(db.session.get(ServiceTicket, ticket_ids[2]).mechanics), 2)
+
+        response = self.client.post('/mechanics/assignments', json=[
+            {'mechanic_id': mechanic_ids[0], 'ticket_id': 999}, {'mechanic_id': 998, 'ticket_id': ticket_ids[0]}
+        ], headers=headers)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json['ticket_ids'], [999])
+        self.assertEqual(response.json['mechanic_ids'], [998])
+
+        response = self.client.post('/mechanics/assignments', json=[{'mechanic_id': 'x'}], headers=headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_assignments_limited_to_own_tickets(self):
+        """Test customers can only pair their own tickets, and others' look unknown"""
+        admin = {'Authorization': f"Bearer {self.client.post('/users/login', json=self.admin_data).json['token']}"}
+        mechanic_id = self.client.post('/mechanics', json=self.mechanic_data, headers=admin).json['id']
+        admin_ticket = self.client.post('/service-tickets', json={'title': 'T', 'description': 'D'}, headers=admin).json['id']
+
+        customer = User(name='Customer', email='customer@example.com', phone='1')
+        customer.set_password('TestPass123!')
+        db.session.add(customer)
+        db.session.commit()
+        token = self.client.post('/users/login', json={
+            'email': 'customer@example.com', 'password': 'TestPass123!'
+        }).json['token']
+        headers = {'Authorization': f'Bearer {token}'}
+        own_ticket = self.client.post('/service-tickets', json={'title': 'T', 'description': 'D'}, headers=headers).json['id']
+
+        response = self.client.post('/mechanics/assignments', json=[
+            {'mechanic_id': mechanic_id, 'ticket_id': own_ticket}, {'mechanic_id': mechanic_id, 'ticket_id': admin_ticket}
+        ], headers=headers)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json['ticket_ids'], [admin_ticket])
+        self.assertEqual(db.session.get(ServiceTicket, admin_ticket).mechanics, [])
+
+        response = self.client.post('/mechanics/assignments', json=[
+            {'mechanic_id': mechanic_id, 'ticket_id': own_ticket}
+        ], headers=headers)
+        self.assertEqual(response.json['created'], 1)
+
+
+class TestCachedMechanicViews(unittest.TestCase):
+    def setUp(self):
+        """Set up an app with a real cache so stale mechanic views would show"""
+        self.app = create_app('testing', {'CACHE_TYPE': 'SimpleCache'})
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        admin_user = User(name='Admin User', email='admin@example.com', phone='123-456-7890', is_admin=True)
+        admin_user.set_password('AdminPass123!')
+        db.session.add(admin_user)
+        db.session.commit()
+        token = self.client.post('/users/login', json={
+            'email': 'admin@example.com', 'password': 'AdminPass123!'
+        }).json['token']
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.mechanic_data = {'name': 'Test Mechanic', 'phone': '098-765-4321', 'specialty': 'Engine Repair'}
+
+    def tearDown(self):
+        """Clean up after each test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_mechanic_workload(self):
+        """Test per-status counts per mechanic, refreshed after an assignment"""
+        busy_id = self.client.post('/mechanics', json=self.mechanic_data, headers=self.headers).json['id']
+        idle_id = self.client.post('/mechanics', json={**self.mechanic_data, 'name': 'Idle'}, headers=self.headers).json['id']
+        for status in ('open', 'open', 'closed'):
+            ticket_id = self.client.post('/service-tickets', headers=self.headers, json={
+                'title': 'Work', 'description': 'Do it', 'status': status
+            }).json['id']
+            self.client.post(f'/mechanics/{busy_id}/tickets/{ticket_id}', headers=self.headers)
+
+        response = self.client.get('/mechanics/workload', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        workload = {entry['id']: entry for entry in response.json['mechanics']}
+        self.assertEqual(workload[busy_id]['by_status'], {'open': 2, 'closed': 1})
+        self.assertEqual(workload[busy_id]['open_tickets'], 2)
+        self.assertEqual(workload[busy_id]['total_tickets'], 3)
+        self.assertEqual(workload[idle_id]['open_tickets'], 0)
+        self.assertEqual(workload[idle_id]['by_status'], {})
+
+        self.client.post(f'/mechanics/{idle_id}/tickets/{ticket_id}', headers=self.headers)
+        workload = {entry['id']: entry for entry in self.client.get('/mechanics/workload', headers=self.headers).json['mechanics']}
+        self.assertEqual(workload[idle_id]['by_status'], {'closed': 1})
+
+    def test_deleting_user_expires_mechanic_views(self):
+        """Test a cached mechanic stops listing tickets cascaded away with their user"""
+        mechanic_id = self.client.post('/mechanics', json=self.mechanic_data, headers=self.headers).json['id']
+
+        customer = User(name='Customer', email='customer@example.com', phone='1')
+        customer.set_password('TestPass123!')
+        db.session.add(customer)
+        db.session.commit()
+        customer_id = customer.id
+        customer_token = self.client.post('/users/login', json={
+            'email': 'customer@example.com', 'password': 'TestPass123!'
+        }).json['token']
+        ticket_id = self.client.post('/service-tickets', json={'title': 'T', 'description': 'D'},
+                                     headers={'Authorization': f'Bearer {customer_token}'}).json['id']
+        self.client.post(f'/mechanics/{mechanic_id}/tickets/{ticket_id}', headers=self.headers)
+
+        self.assertEqual(self.client.get(f'/mechanics/{mechanic_id}', headers=self.headers).json['tickets'], [ticket_id])
+        self.client.delete(f'/users/{customer_id}', headers=self.headers)
+        self.assertEqual(self.client.get(f'/mechanics/{mechanic_id}', headers=self.headers).json['tickets'], [])
@@ -0,0 +1,78 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import text
+from app import create_app, db
+from app.models import ServiceTicket, User
+from app.utils.search import ranked_search
+
+VERSIONS = os.path.join(os.path.dirname(__file__), os.pardir, 'migrations', 'versions')
+
+
+def load_revision(filename):
+    spec = importlib.util.spec_from_file_location(filename[:-3], os.path.join(VERSIONS, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestCascadeMigration(unittest.TestCase):
+    def setUp(self):
+        """Run the migration against a database file, as flask db upgrade would"""
+        handle, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        self.app = create_app('testing', {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{self.path}'})
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.revision = load_revision('1b5d7f9a3c26_cascade_ticket_deletes.py')
+
+        user = User(name='Owner', email='owner@example.com', phone='1')
+        user.set_password('TestPass123!')
+        db.session.add(user)
+        db.session.commit()
+        self.user_id = user.id
+        self.ticket_id = self.add_ticket('Brake squeal', 'Front pads worn')
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+        self.app_context.pop()
+        os.remove(self.path)
+
+    def add_ticket(self, title, description):
+        ticket = ServiceTicket(title=title, description=description, status='open',
+                               priority='normal', user_id=self.user_id)
+        db.session.add(ticket)
+        db.session.commit()
+        return ticket.id
+
+    def migrate(self, step):
+        db.session.remove()
+        with db.engine.connect() as conn:
+            conn.execute(text('PRAGMA foreign_keys=OFF'))
+            conn.commit()
+            with Operations.context(MigrationContext.configure(conn)):
+                step()
+            conn.commit()
+            conn.execute(text('PRAGMA foreign_keys=ON'))
+
+    def search(self, terms):
+        query = ranked_search(ServiceTicket.query, ServiceTicket, terms, ['title', 'description'])
+        return [ticket.id for ticket in query]
+
+    def test_search_survives_table_rebuild(self):
+        """Test the FTS5 triggers are restored after both directions rebuild service_tickets"""
+        for step in (self.revision.upgrade, self.revision.downgrade):
+            self.migrate(step)
+            self.assertEqual(self.search('brake'), [self.ticket_id])
+
+            ticket_id = self.add_ticket('Coolant leak', 'Radiator hose')
+            self.assertEqual(self.search('radiator'), [ticket_id])
+            db.session.delete(db.session.get(ServiceTicket, ticket_id))
+            db.session.commit()
+            self.assertEqual(self.search('radiator'), [])
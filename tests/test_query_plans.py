@@ -0,0 +1,88 @@
+import re
+import unittest
+from datetime import datetime
+from sqlalchemy import func, select
+from app import create_app, db
+from app.models import Part, ServiceTicket, mechanic_service_tickets, ticket_parts
+from tests.helpers import record_statements
+
+# "SCAN <table>" without "USING ... INDEX" reads every row of the table
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+
+class TestQueryPlans(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def query_plan(self, statement):
+        """EXPLAIN QUERY PLAN rows for `statement` with its real bound parameters"""
+        with record_statements(parameters=True) as executed:
+            db.session.execute(statement).all()
+        sql, parameters = executed[-1]
+        return [row[-1] for row in db.session.connection().exec_driver_sql(
+            f'EXPLAIN QUERY PLAN {sql}', parameters
+        )]
+
+    def assertNoFullScan(self, statement):
+        plan = self.query_plan(statement)
+        scans = [detail for detail in plan if FULL_SCAN.match(detail)]
+        self.assertEqual(scans, [], f'Full table scan in plan: {plan}')
+
+    def test_ticket_queries_use_indexes(self):
+        """Test the ticket list, filter and aggregate queries avoid full scans"""
+        since = datetime(2024, 1, 1)
+        statements = [
+            select(ServiceTicket).where(ServiceTicket.user_id == 1)
+                .order_by(ServiceTicket.created_at, ServiceTicket.id).limit(10),
+            select(ServiceTicket).where(ServiceTicket.status == 'open')
+                .order_by(ServiceTicket.created_at).limit(10),
+            select(ServiceTicket).where(ServiceTicket.priority == 'high')
+                .order_by(ServiceTicket.created_at).limit(10),
+            select(ServiceTicket).where(ServiceTicket.created_at >= since),
+            select(ServiceTicket.user_id, func.count(ServiceTicket.id), func.max(ServiceTicket.created_at))
+                .where(ServiceTicket.user_id.in_([1, 2, 3])).group_by(ServiceTicket.user_id),
+        ]
+        for statement in statements:
+            self.assertNoFullScan(statement)
+
+    def test_ticket_filter_and_sort_use_indexes(self):
+        """Test the ?status= / ?sort= / ?mechanic_id= paths of GET /service-tickets"""
+        mine = ServiceTicket.user_id == 1
+        statements = [
+            select(ServiceTicket).where(mine, ServiceTicket.status.in_(['open', 'pending']))
+                .order_by(ServiceTicket.status, ServiceTicket.id).limit(10),
+            select(ServiceTicket).where(mine).order_by(ServiceTicket.priority_rank.desc(), ServiceTicket.id.desc()).limit(10),
+            select(ServiceTicket).where(mine, ServiceTicket.created_at < datetime(2024, 1, 1))
+                .order_by(ServiceTicket.created_at, ServiceTicket.id).limit(10),
+            select(ServiceTicket).join(mechanic_service_tickets)
+                .where(mine, mechanic_service_tickets.c.mechanic_id == 1),
+        ]
+        for statement in statements:
+            self.assertNoFullScan(statement)
+
+    def test_junction_lookups_use_indexes_both_ways(self):
+        """Test both directions of the junction tables are index searches"""
+        statements = [
+            select(mechanic_service_tickets).where(mechanic_service_tickets.c.mechanic_id == 1),
+            select(mechanic_service_tickets).where(mechanic_service_tickets.c.ticket_id.in_([1, 2])),
+            select(ticket_parts).where(ticket_parts.c.ticket_id.in_([1, 2])),
+            select(ticket_parts).where(ticket_parts.c.part_id == 1),
+        ]
+        for statement in statements:
+            self.assertNoFullScan(statement)
+
+    def test_part_prefix_search_uses_indexes(self):
+        """Test the typeahead range predicates hit the lower() indexes"""
+        for column in (Part.name, Part.part_number):
+            key = func.lower(column)
+            self.assertNoFullScan(
+                select(Part).where(key >= 'bra', key < 'brb').order_by(key).limit(10)
+            )
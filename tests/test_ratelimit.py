@@ -0,0 +1,99 @@
+import threading
+import time
+import unittest
+from limits import parse
+from limits.storage import MemoryStorage
+from limits.strategies import MovingWindowRateLimiter
+from app.utils.ratelimit import BatchedStorage
+
+class CountingStorage(MemoryStorage):
+    """Memory storage that counts round trips to the 'shared' store"""
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def incr(self, *args, **kwargs):
+        self.calls += 1
+        return super().incr(*args, **kwargs)
+
+class TestBatchedStorage(unittest.TestCase):
+    def setUp(self):
+        self.shared = CountingStorage()
+        self.item = parse('100 per minute')
+
+    def worker(self, **options):
+        return BatchedStorage('batched+memory://', inner=self.shared, **options)
+
+    def test_workers_share_one_limit(self):
+        """Test N workers together admit exactly the limit, not N times it"""
+        limiters = [MovingWindowRateLimiter(self.worker()) for _ in range(4)]
+        admitted = []
+
+        def hammer(limiter):
+            admitted.append(sum(limiter.hit(self.item, 'client') for _ in range(100)))
+
+        threads = [threading.Thread(target=hammer, args=(limiter,)) for limiter in limiters]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sum(admitted), 100)
+
+    def test_hot_keys_are_batched(self):
+        """Test a hot key reaches the shared store far less than once per hit"""
+        limiter = MovingWindowRateLimiter(self.worker(batch_size=10))
+        for _ in range(50):
+            self.assertTrue(limiter.hit(self.item, 'client'))
+        self.assertLess(self.shared.calls, 15)
+
+    def test_sync_returns_unused_reservations(self):
+        """Test reserved but unused units go back to the shared count"""
+        storage = self.worker(batch_size=10)
+        limiter = MovingWindowRateLimiter(storage)
+        for _ in range(5):
+            limiter.hit(self.item, 'client')
+
+        storage.sync()
+        self.assertEqual(limiter.get_window_stats(self.item, 'client').remaining, 95)
+
+    def test_small_limits_are_exact_across_workers(self):
+        """Test workers admit every hit of a small limit instead of reserving it away"""
+        item = parse('3 per hour')
+        limiters = [MovingWindowRateLimiter(self.worker(batch_size=10)) for _ in range(3)]
+        self.assertEqual([limiter.hit(item, 'client') for limiter in limiters], [True, True, True])
+        self.assertFalse(limiters[0].hit(item, 'client'))
+
+    def test_idle_reservations_are_released(self):
+        """Test a worker that goes quiet hands its reservation back without a sync() call"""
+        idle = MovingWindowRateLimiter(self.worker(batch_size=10, sync_interval=0.05))
+        for _ in range(5):
+            idle.hit(self.item, 'client')
+
+        other = MovingWindowRateLimiter(self.worker())
+        for _ in range(50):
+            if other.get_window_stats(self.item, 'client').remaining == 95:
+                break
+            time.sleep(0.01)
+        self.assertEqual(other.get_window_stats(self.item, 'client').remaining, 95)
+
+    def test_failed_background_sync_is_logged(self):
+        """Test an unreachable shared store is reported, once per interval, not swallowed"""
+        storage = self.worker(sync_interval=0.01)
+        calls = []
+
+        def fail():
+            calls.append(1)
+            raise ConnectionError('store down')
+
+        storage._sync_idle = fail
+        with self.assertLogs('app.utils.ratelimit', level='ERROR') as logs:
+            storage._start_syncer()
+            for _ in range(200):
+                if len(calls) >= 3:
+                    break
+                time.sleep(0.01)
+        storage._sync_idle = lambda: None
+        self.assertGreaterEqual(len(calls), 3)
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn('store down', logs.output[0])
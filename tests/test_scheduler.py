@@ -0,0 +1,133 @@
+import unittest
+from sqlalchemy import insert, select
+from app import create_app, db
+from app.models import Mechanic, ServiceTicket, User, mechanic_service_tickets
+from app.utils.scheduler import MechanicLoads, least_loaded_mechanic, pending_tickets, save_assignments, schedule
+
+
+class TestAutoAssignment(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        admin = User(name='Admin', email='admin@example.com', phone='1', is_admin=True)
+        admin.set_password('AdminPass123!')
+        db.session.add(admin)
+        self.brakes = Mechanic(name='Brakes A', specialty='Brakes', phone='1')
+        self.engine = Mechanic(name='Engine A', specialty='Engine', phone='2')
+        self.general = Mechanic(name='General', specialty='', phone='3')
+        db.session.add_all([self.brakes, self.engine, self.general])
+        db.session.commit()
+
+        token = self.client.post('/users/login', json={
+            'email': 'admin@example.com', 'password': 'AdminPass123!'
+        }).json['token']
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def add_tickets(self, count, specialty=None, status='pending'):
+        db.session.execute(insert(ServiceTicket), [
+            {'title': 'T', 'description': 'D', 'status': status, 'priority': 'normal',
+             'specialty': specialty, 'user_id': 1}
+            for _ in range(count)
+        ])
+        db.session.commit()
+
+    def test_picks_least_loaded_fitting_mechanic(self):
+        """Test picks follow specialty and balance load, counting only open work"""
+        self.add_tickets(2)
+        self.add_tickets(3, status='closed')
+        db.session.execute(insert(mechanic_service_tickets), [
+            {'ticket_id': 1, 'mechanic_id': self.general.id},
+            {'ticket_id': 2, 'mechanic_id': self.general.id},
+            {'ticket_id': 3, 'mechanic_id': self.brakes.id},
+            {'ticket_id': 4, 'mechanic_id': self.brakes.id},
+            {'ticket_id': 5, 'mechanic_id': self.brakes.id}
+        ])
+
+        loads = MechanicLoads(db.session)
+        self.assertEqual(loads.loads, {self.brakes.id: 0, self.engine.id: 0, self.general.id: 2})
+        self.assertEqual(loads.pick(' brakes '), self.brakes.id)
+        self.assertEqual(loads.pick('Brakes'), self.brakes.id)
+        self.assertIsNone(loads.pick('Paint'))
+        # Anyone can take a ticket without a specialty; ties go to the lowest id
+        self.assertEqual([loads.pick() for _ in range(3)], [self.engine.id, self.engine.id, self.brakes.id])
+        self.assertEqual(loads.loads, {self.brakes.id: 3, self.engine.id: 2, self.general.id: 2})
+
+    def test_least_loaded_mechanic_matches_heap(self):
+        """Test the single-ticket query picks the same mechanic as the batch heap"""
+        self.add_tickets(2, specialty='Brakes')
+        tickets = pending_tickets(db.session)
+        save_assignments(db.session, schedule(MechanicLoads(db.session), tickets)[0])
+        db.session.commit()
+
+        for specialty in ('Brakes', ' engine ', None, '', 'Paint'):
+            self.assertEqual(least_loaded_mechanic(db.session, specialty),
+                             MechanicLoads(db.session).pick(specialty), specialty)
+
+    def test_assign_pending(self):
+        """Test the assign-pending job assigns open unassigned tickets and reports the rest"""
+        self.add_tickets(4, specialty='Engine')
+        self.add_tickets(2, specialty='Paint')
+        self.add_tickets(1, status='closed')
+
+        user = User(name='Customer', email='customer@example.com', phone='2')
+        user.set_password('TestPass123!')
+        db.session.add(user)
+        db.session.commit()
+        token = self.client.post('/users/login', json={
+            'email': 'customer@example.com', 'password': 'TestPass123!'
+        }).json['token']
+        response = self.client.post('/jobs/assign-pending', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 403)
+
+        def assign_pending():
+            status_url = self.client.post('/jobs/assign-pending', headers=self.headers).headers['Location']
+            self.assertTrue(self.app.extensions['job_queue'].run_next())
+            return self.client.get(status_url, headers=self.headers).json['result']
+
+        result = assign_pending()
+        self.assertEqual(result['assigned'], 4)
+        self.assertEqual(result['unmatched'], 2)
+        self.assertEqual(result['by_mechanic'], {str(self.engine.id): 4})
+
+        result = assign_pending()
+        self.assertEqual(result['assigned'], 0)
+        self.assertEqual(result['unmatched'], 2)
+
+    def test_save_assignments_skips_tickets_assigned_meanwhile(self):
+        """Test a ticket assigned by another writer after scheduling keeps its one mechanic"""
+        self.add_tickets(2, specialty='Engine')
+        tickets = pending_tickets(db.session)
+        assignments, _ = schedule(MechanicLoads(db.session), tickets)
+        taken = tickets[0][0]
+        db.session.execute(insert(mechanic_service_tickets), [{'ticket_id': taken, 'mechanic_id': self.general.id}])
+
+        saved = save_assignments(db.session, assignments)
+        db.session.commit()
+        self.assertEqual(saved, {tickets[1][0]: self.engine.id})
+        rows = db.session.execute(
+            select(mechanic_service_tickets.c.mechanic_id).where(mechanic_service_tickets.c.ticket_id == taken)
+        ).scalars().all()
+        self.assertEqual(rows, [self.general.id])
+
+    def test_create_ticket_auto_assign(self):
+        """Test create_ticket assigns on request and leaves tickets alone otherwise"""
+        response = self.client.post('/service-tickets', headers=self.headers, json={
+            'title': 'Squeal', 'description': 'Front brakes', 'specialty': 'Brakes', 'auto_assign': True
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json['specialty'], 'Brakes')
+        self.assertEqual([m['id'] for m in response.json['mechanics']], [self.brakes.id])
+
+        response = self.client.post('/service-tickets', headers=self.headers, json={
+            'title': 'Squeal', 'description': 'Rear brakes', 'specialty': 'Brakes'
+        })
+        self.assertEqual(response.json['mechanics'], [])
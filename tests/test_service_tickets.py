@@ -1,7 +1,11 @@
+import base64
+import json
 import unittest
 from app import create_app, db
-from app.models import User, ServiceTicket
+from app.models import User, ServiceTicket, Mechanic, Inventory, Part
 from datetime import datetime
+from sqlalchemy import insert
+from tests.helpers import record_statements
 
 class TestServiceTicketRoutes(unittest.TestCase):
     def setUp(self):
@@ -115,4 +119,325 @@ class TestServiceTicketRoutes(unittest.TestCase):
             f'/service-tickets/{ticket_id}',
             headers=self.headers
         )
-        self.assertEqual(response.status_code, 204)
\ No newline at end of file
+        self.assertEqual(response.status_code, 204)
+
+    def test_get_tickets_cursor_pagination(self):
+        """Test walking the ticket list with keyset cursors"""
+        for i in range(5):
+            data = dict(self.test_ticket_data, title=f'Ticket {i}')
+            self.client.post('/service-tickets', json=data, headers=self.headers)
+
+        seen = []
+        url = '/service-tickets?limit=2'
+        while url:
+            response = self.client.get(url, headers=self.headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('total', response.json)
+            seen.extend(t['title'] for t in response.json['tickets'])
+            cursor = response.json['next_cursor']
+            url = f'/service-tickets?limit=2&cursor={cursor}' if cursor else None
+
+        self.assertEqual(seen, [f'Ticket {i}' for i in range(5)])
+
+    def test_get_tickets_invalid_cursor(self):
+        """Test that a tampered cursor is rejected"""
+        response = self.client.get('/service-tickets?cursor=not-a-cursor', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+        # Well-formed tokens carrying values of the wrong type never reach SQL
+        for payload in ([{'a': 1}, [1]], ['created_at,id', {'a': 1}, [1]],
+                        ['created_at,id', '2026-01-01T00:00:00', 'x'], ['id', True]):
+            cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+            sort = '&sort=id' if payload[0] == 'id' else ''
+            response = self.client.get(f'/service-tickets?cursor={cursor}{sort}', headers=self.headers)
+            self.assertEqual(response.status_code, 400, payload)
+        cursor = base64.urlsafe_b64encode(json.dumps(['id', {'a': 1}]).encode()).decode().rstrip('=')
+        self.assertEqual(self.client.get(f'/mechanics?cursor={cursor}', headers=self.headers).status_code, 400)
+
+    def test_cursor_is_bound_to_its_sort(self):
+        """Test a cursor issued for one ?sort= is refused under another"""
+        for i in range(3):
+            self.client.post('/service-tickets', json={'title': f'T{i}', 'description': 'D'}, headers=self.headers)
+        cursor = self.client.get('/service-tickets?limit=1&sort=id', headers=self.headers).json['next_cursor']
+        self.assertEqual(self.client.get(f'/service-tickets?sort=id&cursor={cursor}', headers=self.headers).status_code, 200)
+        for sort in ('-id', 'status', 'created_at'):
+            response = self.client.get(f'/service-tickets?sort={sort}&cursor={cursor}', headers=self.headers)
+            self.assertEqual(response.status_code, 400, sort)
+
+
+    def count_queries(self, url):
+        """Return the number of SQL statements issued while serving `url`"""
+        with record_statements() as statements:
+            response = self.client.get(url, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return len(statements)
+
+    def test_ticket_list_query_count_is_constant(self):
+        """Test that dumping a bigger page does not issue more queries"""
+        mechanic = Mechanic(name='Mech', specialty='Brakes', phone='555')
+        part = Inventory(name='Pad', price=10.0)
+        db.session.add_all([mechanic, part])
+        db.session.commit()
+
+        for i in range(12):
+            data = dict(self.test_ticket_data, title=f'Ticket {i}',
+                        mechanic_ids=[mechanic.id], part_ids=[part.id])
+            self.client.post('/service-tickets', json=data, headers=self.headers)
+
+        small = self.count_queries('/service-tickets?per_page=2')
+        large = self.count_queries('/service-tickets?per_page=12')
+        self.assertEqual(small, large)
+        self.assertEqual(
+            self.count_queries('/service-tickets/my-tickets'),
+            self.count_queries('/users/my-tickets')
+        )
+
+    def test_sparse_fieldsets_and_include(self):
+        """Test ?fields[...]= and ?include= trim the response and the SELECT"""
+        mechanic = Mechanic(name='Mech', specialty='Brakes', phone='555')
+        db.session.add(mechanic)
+        db.session.commit()
+        data = dict(self.test_ticket_data, mechanic_ids=[mechanic.id])
+        self.client.post('/service-tickets', json=data, headers=self.headers)
+
+        response = self.client.get('/service-tickets?fields[ticket]=id,status', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json['tickets'][0]), {'id', 'status'})
+
+        response = self.client.get(
+            '/service-tickets/my-tickets?include=mechanics&fields[mechanic]=name',
+            headers=self.headers
+        )
+        ticket = response.json[0]
+        self.assertEqual(ticket['mechanics'], [{'name': 'Mech'}])
+        self.assertNotIn('user', ticket)
+        self.assertNotIn('parts', ticket)
+
+        with record_statements() as statements:
+            self.client.get('/service-tickets/my-tickets?fields[ticket]=id,title', headers=self.headers)
+        ticket_select = next(s for s in statements if 'FROM service_tickets' in s)
+        self.assertNotIn('description', ticket_select)
+
+    def test_invalid_fieldset_rejected(self):
+        """Test unknown field and include names return 400"""
+        for url in ('/service-tickets?fields[ticket]=id,bogus',
+                    '/service-tickets/my-tickets?include=owner'):
+            response = self.client.get(url, headers=self.headers)
+            self.assertEqual(response.status_code, 400)
+
+    def test_conditional_get_on_ticket(self):
+        """Test If-None-Match returns 304 until the ticket or its mechanics change"""
+        ticket_id = self.client.post(
+            '/service-tickets', json=self.test_ticket_data, headers=self.headers
+        ).json['id']
+        url = f'/service-tickets/{ticket_id}'
+
+        response = self.client.get(url, headers=self.headers)
+        etag = response.headers['ETag']
+        self.assertTrue(etag.startswith('W/'))
+        self.assertNotIn('Last-Modified', response.headers)
+
+        revalidate = dict(self.headers, **{'If-None-Match': etag})
+        response = self.client.get(url, headers=revalidate)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b'')
+
+        mechanic = Mechanic(name='Mech', specialty='Brakes', phone='555')
+        db.session.add(mechanic)
+        db.session.commit()
+        self.client.put(f'{url}/edit', json={'add_ids': [mechanic.id]}, headers=self.headers)
+        response = self.client.get(url, headers=revalidate)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+        # List validators change when a ticket is deleted
+        list_etag = self.client.get('/service-tickets/my-tickets', headers=self.headers).headers['ETag']
+        self.client.delete(url, headers=self.headers)
+        response = self.client.get(
+            '/service-tickets/my-tickets', headers=dict(self.headers, **{'If-None-Match': list_etag})
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_filter_and_sort_tickets(self):
+        """Test status/priority/date/mechanic filters and whitelisted sorting"""
+        mechanic = Mechanic(name='Mech', specialty='Brakes', phone='555')
+        db.session.add(mechanic)
+        db.session.commit()
+        for title, status, priority in (('A', 'open', 'low'), ('B', 'closed', 'high'),
+                                        ('C', 'open', 'high'), ('D', 'pending', 'normal')):
+            data = dict(self.test_ticket_data, title=title, status=status, priority=priority)
+            if title in ('B', 'C'):
+                data['mechanic_ids'] = [mechanic.id]
+            self.client.post('/service-tickets', json=data, headers=self.headers)
+
+        def titles(query):
+            response = self.client.get(f'/service-tickets?{query}', headers=self.headers)
+            self.assertEqual(response.status_code, 200, response.json)
+            return [t['title'] for t in response.json['tickets']]
+
+        self.assertEqual(titles('status=open'), ['A', 'C'])
+        self.assertEqual(titles('status=open,pending&priority=high'), ['C'])
+        self.assertEqual(titles(f'mechanic_id={mechanic.id}&sort=-created_at'), ['C', 'B'])
+        self.assertEqual(titles('sort=-id'), ['D', 'C', 'B', 'A'])
+        self.assertEqual(titles('created_before=2000-01-01'), [])
+        self.assertEqual(titles('limit=2&sort=priority'), ['A', 'D'])
+
+        # Cursor pages follow the requested order
+        first = self.client.get('/service-tickets?limit=2&sort=-priority', headers=self.headers).json
+        second = self.client.get(
+            f"/service-tickets?limit=2&sort=-priority&cursor={first['next_cursor']}", headers=self.headers
+        ).json
+        self.assertEqual([t['title'] for t in first['tickets'] + second['tickets']], ['C', 'B', 'D', 'A'])
+
+        for query in ('sort=description', 'created_after=yesterday', 'mechanic_id=x'):
+            response = self.client.get(f'/service-tickets?{query}', headers=self.headers)
+            self.assertEqual(response.status_code, 400)
+
+    def test_sort_by_priority_follows_urgency(self):
+        """Test ?sort=priority orders by urgency and cursor pages keep that order"""
+        for priority in ('urgent', 'low', 'high', 'normal'):
+            data = dict(self.test_ticket_data, title=priority, priority=priority)
+            self.client.post('/service-tickets', json=data, headers=self.headers)
+
+        response = self.client.get('/service-tickets?sort=priority', headers=self.headers)
+        self.assertEqual([t['title'] for t in response.json['tickets']], ['low', 'normal', 'high', 'urgent'])
+
+        seen, cursor = [], ''
+        for _ in range(4):
+            page = self.client.get(f'/service-tickets?limit=1&sort=-priority&cursor={cursor}', headers=self.headers).json
+            seen += [t['title'] for t in page['tickets']]
+            cursor = page['next_cursor']
+        self.assertEqual(seen, ['urgent', 'high', 'normal', 'low'])
+        self.assertIsNone(cursor)
+
+    def test_full_text_search(self):
+        """Test ranked search stays in sync with inserts, updates and deletes"""
+        tickets = [
+            ('Brake squeal', 'Front brakes squealing when stopping'),
+            ('Check engine light', 'Code P0420 catalytic converter'),
+            ('Oil change', 'Routine service, mention brake pads look fine'),
+        ]
+        ids = [
+            self.client.post('/service-tickets', json=dict(self.test_ticket_data, title=title, description=text),
+                             headers=self.headers).json['id']
+            for title, text in tickets
+        ]
+
+        def search(q):
+            response = self.client.get(f'/service-tickets/search?q={q}', headers=self.headers)
+            self.assertEqual(response.status_code, 200)
+            return [t['id'] for t in response.json['tickets']]
+
+        self.assertEqual(search('brake'), [ids[0], ids[2]])
+        self.assertEqual(search('p0420'), [ids[1]])
+        self.assertEqual(search('brake squeal'), [ids[0]])
+        self.assertEqual(search('"NEAR(AND'), [])
+
+        self.client.put(f'/service-tickets/{ids[1]}', json={'description': 'Squeal from the rear'},
+                        headers=self.headers)
+        self.assertEqual(search('p0420'), [])
+        self.assertIn(ids[1], search('squeal'))
+        self.client.delete(f'/service-tickets/{ids[0]}', headers=self.headers)
+        self.assertEqual(search('brake'), [ids[2]])
+
+        response = self.client.get('/service-tickets/search?q=brake&per_page=1', headers=self.headers)
+        self.assertFalse(response.json['has_next'])
+        self.assertEqual(self.client.get('/service-tickets/search', headers=self.headers).status_code, 400)
+
+    def test_ticket_totals(self):
+        """Test totals from the page aggregate, the total endpoint and the materialized column"""
+        pad = Inventory(name='Pad', price=10.0)
+        rotor = Inventory(name='Rotor', price=25.5)
+        fluid = Part(name='Brake Fluid', part_number='BF-1', price=4.0, quantity=10)
+        db.session.add_all([pad, rotor, fluid])
+        db.session.commit()
+
+        data = dict(self.test_ticket_data, part_ids=[pad.id, rotor.id],
+                    reserved_parts=[{'part_id': fluid.id, 'quantity': 3}])
+        ticket = self.client.post('/service-tickets', json=data, headers=self.headers).json
+        self.assertEqual(ticket['total'], 47.5)
+        empty = self.client.post('/service-tickets', json=self.test_ticket_data, headers=self.headers).json
+
+        tickets = self.client.get('/service-tickets', headers=self.headers).json['tickets']
+        self.assertEqual([t['total'] for t in tickets], [47.5, 0.0])
+        response = self.client.get(f"/service-tickets/{ticket['id']}/total", headers=self.headers)
+        self.assertEqual(response.json, {'ticket_id': ticket['id'], 'total': 47.5})
+
+        # A price change reaches the denormalized column too
+        self.client.put(f'/inventory/{fluid.id}', json={'price': 5.0}, headers=self.headers)
+        self.app.config['TICKET_TOTALS_MATERIALIZED'] = True
+        tickets = self.client.get('/service-tickets/my-tickets', headers=self.headers).json
+        self.assertEqual([t['total'] for t in tickets], [50.5, 0.0])
+        response = self.client.get(f"/service-tickets/{empty['id']}/total", headers=self.headers)
+        self.assertEqual(response.json['total'], 0.0)
+
+    def test_update_ticket_mechanics_is_set_based(self):
+        """Test add/remove apply as set differences in a constant number of statements"""
+        db.session.execute(insert(Mechanic), [
+            {'name': f'Mech {i}', 'specialty': 'Brakes', 'phone': str(i)} for i in range(300)
+        ])
+        db.session.commit()
+        url = f"/service-tickets/{self.client.post('/service-tickets', json=self.test_ticket_data, headers=self.headers).json['id']}/edit"
+
+        def edit(body):
+            with record_statements() as statements:
+                response = self.client.put(url, json=body, headers=self.headers)
+            self.assertEqual(response.status_code, 200)
+            return response.json['mechanics'], len(statements)
+
+        mechanics, small = edit({'add_ids': [1, 2], 'remove_ids': []})
+        self.assertEqual([m['id'] for m in mechanics], [1, 2])
+        mechanics, large = edit({'add_ids': list(range(2, 301)) + [999], 'remove_ids': [1]})
+        self.assertEqual(len(mechanics), 299)
+        self.assertEqual(small + 1, large)  # Plus the DELETE
+
+        mechanics, _ = edit({'add_ids': [2], 'remove_ids': list(range(1, 301))})
+        self.assertEqual(mechanics, [{'id': 2, 'name': 'Mech 1'}])
+
+        response = self.client.put(url, json={'add_ids': 'all'}, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+
+class TestCachedTicketViews(unittest.TestCase):
+    def setUp(self):
+        """Set up an app with a real cache so stale ticket views would show"""
+        self.app = create_app('testing', {'CACHE_TYPE': 'SimpleCache'})
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        user_data = {'name': 'Test User', 'email': 'test@example.com', 'password': 'TestPass123!', 'phone': '1'}
+        self.client.post('/users/register', json=user_data)
+        token = self.client.post('/users/login', json=user_data).json['token']
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.test_ticket_data = {'title': 'Test Ticket', 'description': 'Test Description', 'priority': 'high'}
+
+    def tearDown(self):
+        """Clean up after each test"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_ticket_cache_is_per_user_and_invalidated_on_write(self):
+        """Test cached ticket lists vary by identity and expire on writes"""
+        self.assertEqual(self.client.get('/service-tickets/my-tickets', headers=self.headers).json, [])
+
+        create_response = self.client.post(
+            '/service-tickets', json=self.test_ticket_data, headers=self.headers
+        )
+        ticket_id = create_response.json['id']
+        tickets = self.client.get('/service-tickets/my-tickets', headers=self.headers).json
+        self.assertEqual([t['id'] for t in tickets], [ticket_id])
+
+        self.client.put(f'/service-tickets/{ticket_id}', json={'status': 'closed'}, headers=self.headers)
+        detail = self.client.get(f'/service-tickets/{ticket_id}', headers=self.headers)
+        self.assertEqual(detail.json['status'], 'closed')
+
+        other = {'name': 'Other', 'email': 'other@example.com', 'password': 'OtherPass123!', 'phone': '1'}
+        self.client.post('/users/register', json=other)
+        token = self.client.post('/users/login', json=other).json['token']
+        response = self.client.get(
+            '/service-tickets/my-tickets', headers={'Authorization': f'Bearer {token}'}
+        )
+        self.assertEqual(response.json, [])
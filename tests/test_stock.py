@@ -0,0 +1,105 @@
+import os
+import tempfile
+import threading
+import unittest
+from app import create_app, db
+from app.models import Part, PartReservation
+
+
+class TestStockReservation(unittest.TestCase):
+    def setUp(self):
+        """Use a database file so concurrent requests get their own connections"""
+        handle, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        self.app = create_app('testing', {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{self.path}'})
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        user = {'name': 'Writer', 'email': 'writer@example.com', 'password': 'TestPass123!', 'phone': '1'}
+        self.client.post('/users/register', json=user)
+        token = self.client.post('/users/login', json=user).json['token']
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+        self.part = Part(name='Brake Pad', part_number='BP-1', price=40, quantity=5)
+        db.session.add(self.part)
+        db.session.commit()
+        self.part_id = self.part.id
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+        self.app_context.pop()
+        os.remove(self.path)
+
+    def create_ticket(self, client, quantity):
+        return client.post('/service-tickets', headers=self.headers, json={
+            'title': 'Brakes', 'description': 'Replace pads',
+            'reserved_parts': [{'part_id': self.part_id, 'quantity': quantity}]
+        })
+
+    def quantity(self):
+        db.session.expire_all()
+        return db.session.get(Part, self.part_id).quantity
+
+    def test_reserve_and_release(self):
+        """Test tickets take stock, fail fast when short and give it back on delete"""
+        response = self.create_ticket(self.client, 3)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json['reserved_parts'], [{'part_id': self.part_id, 'quantity': 3}])
+        self.assertEqual(self.quantity(), 2)
+
+        response = self.create_ticket(self.client, 3)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.quantity(), 2)
+        self.assertEqual(PartReservation.query.count(), 1)
+
+        response = self.client.post('/service-tickets', headers=self.headers, json={
+            'title': 'X', 'description': 'Y', 'reserved_parts': [{'part_id': 999, 'quantity': 1}]
+        })
+        self.assertEqual(response.status_code, 400)
+
+        ticket_id = PartReservation.query.one().ticket_id
+        self.client.delete(f'/service-tickets/{ticket_id}', headers=self.headers)
+        self.assertEqual(self.quantity(), 5)
+        self.assertEqual(PartReservation.query.count(), 0)
+
+    def test_empty_reservation_list(self):
+        """Test a ticket with no reserved parts is created without touching stock"""
+        response = self.client.post('/service-tickets', headers=self.headers, json={
+            'title': 'Brakes', 'description': 'Inspect only', 'reserved_parts': []
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json['reserved_parts'], [])
+        self.assertEqual(self.quantity(), 5)
+
+    def test_quantity_delta_is_atomic(self):
+        """Test PUT quantity_delta adjusts stock in place and refuses to go negative"""
+        response = self.client.put(f'/inventory/{self.part_id}', json={'quantity_delta': -2}, headers=self.headers)
+        self.assertEqual(response.json['quantity'], 3)
+        response = self.client.put(f'/inventory/{self.part_id}', json={'quantity_delta': -4}, headers=self.headers)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.quantity(), 3)
+
+    def test_concurrent_reservations_never_oversell(self):
+        """Test many threads racing for the same stock"""
+        statuses = []
+        barrier = threading.Barrier(20)
+
+        def worker():
+            client = self.app.test_client()
+            barrier.wait()
+            statuses.append(self.create_ticket(client, 1).status_code)
+
+        threads = [threading.Thread(target=worker) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(statuses.count(201), 5)
+        self.assertEqual(statuses.count(409), 15)
+        self.assertEqual(self.quantity(), 0)
+        self.assertEqual(PartReservation.query.count(), 5)
@@ -1,6 +1,13 @@
 import unittest
 from app import create_app, db
-from app.models import User
+from app.models import (
+    Inventory, Mechanic, Part, PartReservation, ServiceTicket, User, mechanic_service_tickets, ticket_parts
+)
+from sqlalchemy import func, insert, select
+from unittest import mock
+from werkzeug.security import generate_password_hash
+from app.utils.passwords import HashingBusy
+from tests.helpers import record_statements
 
 class TestUserRoutes(unittest.TestCase):
     def setUp(self):
@@ -98,4 +105,138 @@ class TestUserRoutes(unittest.TestCase):
     def test_get_user_unauthorized(self):
         """Test user retrieval without authentication"""
         response = self.client.get('/users/1')
-        self.assertEqual(response.status_code, 401)
\ No newline at end of file
+        self.assertEqual(response.status_code, 401)
+
+    def test_identity_is_cached_between_requests(self):
+        """Test repeat authenticated requests skip the users table"""
+        token = self.register_and_login()
+        headers = {'Authorization': f'Bearer {token}'}
+        self.client.get('/users/my-tickets', headers=headers)
+
+        with record_statements() as statements:
+            response = self.client.get('/users/my-tickets', headers=headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([s for s in statements if 'FROM users' in s])
+
+    def test_deleted_user_token_is_rejected(self):
+        """Test deleting a user drops its cached identity"""
+        token = self.register_and_login()
+        headers = {'Authorization': f'Bearer {token}'}
+        self.assertEqual(self.client.get('/users/my-tickets', headers=headers).status_code, 200)
+
+        self.client.delete('/users/1', headers=headers)
+        self.assertEqual(self.client.get('/users/my-tickets', headers=headers).status_code, 401)
+
+
+    def test_login_upgrades_old_password_hash(self):
+        """Test a hash made with old settings is replaced on successful login"""
+        self.client.post('/users/register', json=self.test_user_data)
+        user = User.query.filter_by(email=self.test_user_data['email']).first()
+        user.password_hash = generate_password_hash(self.test_user_data['password'], 'pbkdf2:sha256:500')
+        db.session.commit()
+
+        response = self.client.post('/users/login', json={
+            'email': self.test_user_data['email'],
+            'password': self.test_user_data['password']
+        })
+        self.assertEqual(response.status_code, 200)
+        db.session.refresh(user)
+        self.assertTrue(user.password_hash.startswith('pbkdf2:sha256:1000$'))
+
+    def test_login_when_hashing_queue_is_full(self):
+        """Test login fails fast with 503 instead of queueing forever"""
+        self.client.post('/users/register', json=self.test_user_data)
+        hasher = self.app.extensions['password_hasher']
+        with mock.patch.object(hasher, 'verify', side_effect=HashingBusy('busy')):
+            response = self.client.post('/users/login', json={
+                'email': self.test_user_data['email'],
+                'password': self.test_user_data['password']
+            })
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response.headers)
+
+    def test_user_list_returns_ticket_summary(self):
+        """Test user lists carry ticket aggregates, not the tickets themselves"""
+        token = self.register_and_login()
+        headers = {'Authorization': f'Bearer {token}'}
+        user = User.query.filter_by(email=self.test_user_data['email']).first()
+        for status in ('open', 'pending', 'closed'):
+            db.session.add(ServiceTicket(title='T', description='D', status=status,
+                                         priority='normal', user_id=user.id))
+        db.session.commit()
+
+        with record_statements() as statements:
+            response = self.client.get('/users', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        item = response.json['items'][0]
+        self.assertNotIn('service_tickets', item)
+        self.assertEqual(item['ticket_count'], 3)
+        self.assertEqual(item['open_ticket_count'], 2)
+        self.assertIsNotNone(item['last_ticket_at'])
+        self.assertEqual(sum('FROM service_tickets' in s for s in statements), 1)
+
+        response = self.client.get('/users?include=service_tickets', headers=headers)
+        self.assertEqual(len(response.json['items'][0]['service_tickets']), 3)
+
+    def test_nested_tickets_carry_totals(self):
+        """Test tickets embedded in user responses include `total` like ticket endpoints do"""
+        token = self.register_and_login()
+        headers = {'Authorization': f'Bearer {token}'}
+        user = User.query.filter_by(email=self.test_user_data['email']).first()
+        ticket = ServiceTicket(title='T', description='D', status='open', priority='normal', user_id=user.id)
+        part = Part(name='Rotor', part_number='R-1', price=25, quantity=5)
+        db.session.add_all([ticket, part])
+        db.session.flush()
+        db.session.add(PartReservation(ticket_id=ticket.id, part_id=part.id, quantity=2))
+        db.session.commit()
+        user_id = user.id
+
+        response = self.client.get(f'/users/{user_id}', headers=headers)
+        self.assertEqual(response.json['service_tickets'][0]['total'], 50.0)
+        response = self.client.get('/users?include=service_tickets', headers=headers)
+        self.assertEqual(response.json['items'][0]['service_tickets'][0]['total'], 50.0)
+        response = self.client.post('/users/login', json={
+            'email': self.test_user_data['email'], 'password': self.test_user_data['password']
+        })
+        self.assertEqual(response.json['user']['service_tickets'][0]['total'], 50.0)
+
+    def test_delete_user_cascades_in_the_database(self):
+        """Test deleting a user never loads tickets and clears every dependent row"""
+        def delete_user_with(tickets):
+            self.client.post('/users/register', json=dict(self.test_user_data, email=f'{tickets}@example.com'))
+            token = self.client.post('/users/login', json={
+                'email': f'{tickets}@example.com', 'password': self.test_user_data['password']
+            }).json['token']
+            user_id = db.session.scalar(select(User.id).where(User.email == f'{tickets}@example.com'))
+            db.session.execute(insert(ServiceTicket), [
+                {'title': 'T', 'description': 'D', 'status': 'open', 'priority': 'normal', 'user_id': user_id}
+                for _ in range(tickets)
+            ])
+            ticket_ids = db.session.scalars(select(ServiceTicket.id).where(ServiceTicket.user_id == user_id)).all()
+            db.session.execute(insert(mechanic_service_tickets), [
+                {'mechanic_id': ids['mechanic'], 'ticket_id': ticket_id} for ticket_id in ticket_ids
+            ])
+            db.session.execute(insert(ticket_parts), [{'part_id': ids['inventory'], 'ticket_id': t} for t in ticket_ids])
+            db.session.execute(insert(PartReservation), [
+                {'part_id': ids['part'], 'ticket_id': ticket_id, 'quantity': 1} for ticket_id in ticket_ids
+            ])
+            db.session.commit()
+            db.session.expunge_all()
+
+            with record_statements() as statements:
+                response = self.client.delete(f'/users/{user_id}', headers={'Authorization': f'Bearer {token}'})
+            self.assertEqual(response.status_code, 200)
+            return len(statements)
+
+        mechanic = Mechanic(name='M', specialty='Brakes', phone='1')
+        inventory = Inventory(name='Pad', price=10.0)
+        part = Part(name='Rotor', part_number='R-1', price=50, quantity=0)
+        db.session.add_all([mechanic, inventory, part])
+        db.session.commit()
+        ids = {'mechanic': mechanic.id, 'inventory': inventory.id, 'part': part.id}
+
+        self.assertEqual(delete_user_with(2), delete_user_with(200))
+        for model in (ServiceTicket, PartReservation, mechanic_service_tickets, ticket_parts):
+            self.assertEqual(db.session.scalar(select(func.count()).select_from(model)), 0)
+        self.assertEqual(db.session.get(Part, ids['part']).quantity, 202)